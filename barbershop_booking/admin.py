@@ -18,10 +18,21 @@ class AppointmentAdmin(admin.ModelAdmin):
     list_filter = ('status', 'date', 'barbershop')
     search_fields = ('client__name', 'employee__user__username', 'service__name')
     date_hierarchy = 'date'
+    ordering = ('-date', '-time')
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('client', 'employee', 'service', 'barbershop')
 
 
 admin.site.register(Review)
-admin.site.register(Notification)
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('type', 'client', 'appointment', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'type')
+    search_fields = ('client__name', 'client__phone')
+    readonly_fields = ('claim_token', 'claimed_at', 'last_error')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('client', 'appointment__service')
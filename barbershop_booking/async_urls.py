@@ -0,0 +1,24 @@
+"""
+Rotas de agendamento para o servidor ASGI.
+
+São as rotas de ``urls.py`` com as APIs de horários e agenda trocadas pelas
+versões ``async`` de ``async_views.py``; nomes e caminhos não mudam, então
+``reverse`` e os templates funcionam igual sob WSGI e ASGI.
+"""
+from django.urls import URLPattern
+
+from . import async_views, views
+from .urls import app_name, urlpatterns as sync_urlpatterns  # noqa: F401
+
+ASYNC_VIEWS = {
+    views.get_available_slots: async_views.get_available_slots,
+    views.get_availability_calendar: async_views.get_availability_calendar,
+    views.get_any_employee_slots: async_views.get_any_employee_slots,
+    views.employee_schedule: async_views.employee_schedule,
+}
+
+urlpatterns = [
+    URLPattern(pattern.pattern, ASYNC_VIEWS[pattern.callback], pattern.default_args, pattern.name)
+    if pattern.callback in ASYNC_VIEWS else pattern
+    for pattern in sync_urlpatterns
+]
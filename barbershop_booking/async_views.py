@@ -0,0 +1,132 @@
+"""
+Versões ``async`` das APIs públicas de horários e agenda.
+
+Atendem as mesmas URLs e respostas das views em ``views.py`` quando o
+projeto roda sob ASGI (``setup.middleware`` usa ``setup.asgi_urls``). O cache
+e o banco são acessados pelas APIs assíncronas do Django, de modo que um
+worker continua aceitando requisições enquanto outras esperam pelo banco.
+
+A página de apresentação continua síncrona: ela é um template que avalia
+as consultas durante a renderização.
+"""
+import json
+from datetime import timedelta
+
+from django.db.models import Count, Max
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_GET
+
+from barbershop_management.models import Employee
+from .availability import aget_barbershop_availability, aget_day_availability, aget_range_availability
+from .cache import aget_cached_availability
+from .models import Appointment
+from .tenancy import barbershop_view
+from .views import (SCHEDULE_ITEM_FIELDS, SCHEDULE_PAGE_SIZE, _any_employee_payload,
+                    _calendar_payload, _day_payload, _parse_calendar_window, _parse_day,
+                    _parse_schedule_window,
+                    _schedule_etag_key, _schedule_item, _service_query, schedule_page_query)
+
+
+async def _aservice_duration(request):
+    query = _service_query(request)
+    if query is None:
+        return None
+    return timedelta(minutes=(await aget_object_or_404(query)).duration)
+
+
+@require_GET
+@barbershop_view
+async def get_available_slots(request, barbershop_name, employee_id, date):
+    """Versão ``async`` de ``views.get_available_slots``."""
+    barbershop = request.barbershop
+    try:
+        selected_date = _parse_day(date)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    service_id = request.GET.get('service')
+
+    async def compute():
+        employee = await aget_object_or_404(Employee, id=employee_id, barbershop=barbershop)
+        availability = await aget_day_availability(
+            barbershop, employee, selected_date, await _aservice_duration(request))
+        return _day_payload(availability)
+
+    return JsonResponse(await aget_cached_availability(
+        barbershop.id, employee_id, selected_date, service_id, compute))
+
+
+@require_GET
+@barbershop_view
+async def get_availability_calendar(request, barbershop_name, employee_id):
+    """Versão ``async`` de ``views.get_availability_calendar``."""
+    barbershop = request.barbershop
+    employee = await aget_object_or_404(Employee, id=employee_id, barbershop=barbershop)
+    try:
+        start_date, end_date = _parse_calendar_window(request)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    availability = await aget_range_availability(
+        barbershop, employee, start_date, end_date, await _aservice_duration(request))
+    return JsonResponse(_calendar_payload(start_date, end_date, availability))
+
+
+@require_GET
+@barbershop_view
+async def get_any_employee_slots(request, barbershop_name, date):
+    """Versão ``async`` de ``views.get_any_employee_slots``."""
+    try:
+        selected_date = _parse_day(date)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    employees, matrix, message = await aget_barbershop_availability(
+        request.barbershop, selected_date, await _aservice_duration(request))
+    return JsonResponse(_any_employee_payload(employees, matrix, message))
+
+
+async def _astream_schedule(appointments, start_date, end_date, limit):
+    yield '{"start": "%s", "end": "%s", "appointments": [' % (start_date, end_date)
+    next_cursor = None
+    index = 0
+    async for row in appointments.aiterator(chunk_size=SCHEDULE_PAGE_SIZE):
+        if index == limit:
+            next_cursor = last_cursor
+            break
+        item = _schedule_item(row['date'], row['time'], row['service__name'])
+        yield item if index == 0 else ',' + item
+        last_cursor = f'{row["date"].isoformat()},{row["time"].strftime("%H:%M:%S")},{row["id"]}'
+        index += 1
+    yield '], "next": %s}' % json.dumps(next_cursor)
+
+
+@require_GET
+@barbershop_view
+async def employee_schedule(request, barbershop_name, employee_id):
+    """
+    Versão ``async`` de ``views.employee_schedule``: mesma paginação por
+    cursor, resposta em streaming e ETag.
+    """
+    try:
+        start_date, end_date, cursor, limit = _parse_schedule_window(request)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    page = schedule_page_query(request.barbershop, employee_id, start_date, end_date, cursor)
+    summary = await Appointment.objects.filter(id__in=page.values('id')[:limit + 1]).aaggregate(
+        count=Count('id'), last_update=Max('updated_at'))
+    etag = quote_etag(_schedule_etag_key(
+        request.barbershop.pk, employee_id, start_date, end_date, cursor, limit, summary))
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        # values(), não values_list(): no Django 5.1, aiterator() sobre values_list()
+        # executa a consulta fora da thread do ORM
+        appointments = page.values(*SCHEDULE_ITEM_FIELDS)[:limit + 1]
+        response = StreamingHttpResponse(
+            _astream_schedule(appointments, start_date, end_date, limit),
+            content_type='application/json')
+    response.headers.setdefault('ETag', etag)
+    return response
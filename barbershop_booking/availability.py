@@ -0,0 +1,269 @@
+"""
+Motor de disponibilidade de horários para agendamento.
+
+Cada agendamento é tratado como um intervalo ``[início, fim)``, com o fim
+calculado a partir de ``Service.duration``. Os agendamentos do funcionário na
+data são carregados em uma única consulta, ordenados e mesclados; os horários
+candidatos são então verificados com uma varredura linear sobre esses
+intervalos, sem uma consulta por horário.
+
+As funções com prefixo ``a`` são as versões assíncronas usadas pelas views
+``async`` (``async_views.py``): fazem as mesmas consultas com o ORM
+assíncrono e compartilham o cálculo dos horários livres.
+"""
+from collections import defaultdict, namedtuple
+from datetime import datetime, timedelta
+
+from barbershop_management.models import Employee
+from barbershop_management.schedule import aget_schedule, get_schedule
+from .models import Appointment
+
+DEFAULT_SLOT_DURATION = timedelta(minutes=30)
+
+DayAvailability = namedtuple('DayAvailability', ['slots', 'message'])
+
+
+class Interval(namedtuple('Interval', ['start', 'end'])):
+    """Intervalo semiaberto ``[start, end)`` entre dois ``datetime``."""
+
+    __slots__ = ()
+
+    def overlaps(self, other):
+        return self.start < other.end and other.start < self.end
+
+
+def get_slot_duration(barbershop):
+    """Retorna o intervalo entre horários configurado para a barbearia."""
+    if barbershop.slot_duration:
+        return timedelta(minutes=barbershop.slot_duration)
+    return DEFAULT_SLOT_DURATION
+
+
+def busy_by_day_query(employee, start_date, end_date, exclude_id=None):
+    appointments = (
+        Appointment.objects.filter(employee=employee, date__range=(start_date, end_date))
+        .exclude(status='cancelled')
+    )
+    if exclude_id is not None:
+        appointments = appointments.exclude(id=exclude_id)
+    return appointments.values_list('date', 'time', 'service__duration')
+
+
+def _busy_by_day(rows):
+    busy = defaultdict(list)
+    for date, time, duration in rows:
+        start = datetime.combine(date, time)
+        busy[date].append(Interval(start, start + timedelta(minutes=duration)))
+    return busy
+
+
+def busy_by_employee_query(employee_ids, date):
+    return (
+        Appointment.objects.filter(employee_id__in=employee_ids, date=date)
+        .exclude(status='cancelled')
+        .values_list('employee_id', 'time', 'service__duration')
+    )
+
+
+def _busy_by_employee(date, rows):
+    busy = defaultdict(list)
+    for employee_id, time, duration in rows:
+        start = datetime.combine(date, time)
+        busy[employee_id].append(Interval(start, start + timedelta(minutes=duration)))
+    return busy
+
+
+def get_busy_intervals_by_day(employee, start_date, end_date, exclude_id=None):
+    """
+    Retorna ``{data: [Interval]}`` com a agenda ocupada do funcionário no período.
+
+    Todo o período é carregado em uma consulta. Agendamentos cancelados não
+    ocupam a agenda.
+    """
+    return _busy_by_day(busy_by_day_query(employee, start_date, end_date, exclude_id))
+
+
+def get_busy_intervals_by_employee(employee_ids, date):
+    """Retorna ``{id_funcionário: [Interval]}`` para vários funcionários na data, em uma consulta."""
+    return _busy_by_employee(date, busy_by_employee_query(employee_ids, date))
+
+
+def get_busy_intervals(employee, date, exclude_id=None):
+    """Retorna os intervalos ocupados do funcionário na data, em uma consulta."""
+    return get_busy_intervals_by_day(employee, date, date, exclude_id)[date]
+
+
+def merge_intervals(intervals):
+    """Ordena os intervalos e une os que se sobrepõem ou se tocam."""
+    merged = []
+    for interval in sorted(intervals):
+        if merged and interval.start <= merged[-1].end:
+            if interval.end > merged[-1].end:
+                merged[-1] = Interval(merged[-1].start, interval.end)
+        else:
+            merged.append(interval)
+    return merged
+
+
+def compute_free_slots(opening, busy_intervals, slot_duration=DEFAULT_SLOT_DURATION, duration=None):
+    """
+    Retorna os horários de início livres dentro de ``opening``.
+
+    Um horário é oferecido apenas se o atendimento inteiro (``duration``,
+    por padrão o próprio intervalo entre horários) couber antes do fim do
+    expediente sem sobrepor nenhum intervalo ocupado.
+    """
+    duration = duration or slot_duration
+    busy = merge_intervals(busy_intervals)
+    index = 0
+    free_slots = []
+    start = opening.start
+    while start + duration <= opening.end:
+        candidate = Interval(start, start + duration)
+        # Os intervalos estão ordenados: descarta os que terminam antes do candidato
+        while index < len(busy) and busy[index].end <= candidate.start:
+            index += 1
+        if index == len(busy) or not busy[index].overlaps(candidate):
+            free_slots.append(start.time())
+        start += slot_duration
+    return free_slots
+
+
+def _availability_for_day(date, schedule, busy_intervals, slot_duration, duration):
+    message = schedule.closed_message(date)
+    if message:
+        return DayAvailability([], message)
+
+    free_slots = []
+    for interval in schedule.intervals_on(date):
+        opening = Interval(
+            datetime.combine(date, interval.start_time), datetime.combine(date, interval.end_time))
+        free_slots.extend(compute_free_slots(opening, busy_intervals, slot_duration, duration))
+    return DayAvailability(free_slots, None)
+
+
+def get_day_availability(barbershop, employee, date, duration=None):
+    """
+    Calcula os horários livres de um funcionário em uma data.
+
+    Executa um número constante de consultas, independente de quanto tempo a
+    barbearia fica aberta.
+
+    Args:
+        duration (timedelta): duração do serviço escolhido; quando omitida,
+            cada horário ocupa apenas o intervalo configurado na barbearia.
+
+    Returns:
+        DayAvailability: horários livres (``datetime.time``) e uma mensagem
+        opcional quando a barbearia não atende no dia.
+    """
+    schedule = get_schedule(barbershop)
+    if schedule.closed_message(date):
+        return _availability_for_day(date, schedule, [], None, None)
+    return _availability_for_day(
+        date, schedule, get_busy_intervals(employee, date),
+        get_slot_duration(barbershop), duration)
+
+
+async def aget_day_availability(barbershop, employee, date, duration=None):
+    """Versão assíncrona de ``get_day_availability``, para views ``async``."""
+    schedule = await aget_schedule(barbershop)
+    if schedule.closed_message(date):
+        return _availability_for_day(date, schedule, [], None, None)
+    busy = _busy_by_day([row async for row in busy_by_day_query(employee, date, date)])
+    return _availability_for_day(
+        date, schedule, busy[date], get_slot_duration(barbershop), duration)
+
+
+def get_range_availability(barbershop, employee, start_date, end_date, duration=None):
+    """
+    Calcula a disponibilidade de um funcionário para cada dia de um período.
+
+    Usa a agenda compilada da barbearia e uma consulta para os agendamentos
+    de todo o período, qualquer que seja o número de dias.
+
+    Returns:
+        dict: ``{data: DayAvailability}`` em ordem cronológica.
+    """
+    schedule = get_schedule(barbershop)
+    busy = get_busy_intervals_by_day(employee, start_date, end_date)
+    return _range_availability(barbershop, schedule, busy, start_date, end_date, duration)
+
+
+async def aget_range_availability(barbershop, employee, start_date, end_date, duration=None):
+    """Versão assíncrona de ``get_range_availability``, para views ``async``."""
+    schedule = await aget_schedule(barbershop)
+    busy = _busy_by_day(
+        [row async for row in busy_by_day_query(employee, start_date, end_date)])
+    return _range_availability(barbershop, schedule, busy, start_date, end_date, duration)
+
+
+def _range_availability(barbershop, schedule, busy, start_date, end_date, duration):
+    slot_duration = get_slot_duration(barbershop)
+    availability = {}
+    date = start_date
+    while date <= end_date:
+        availability[date] = _availability_for_day(
+            date, schedule, busy.get(date, []), slot_duration, duration)
+        date += timedelta(days=1)
+    return availability
+
+
+def get_barbershop_availability(barbershop, date, duration=None):
+    """
+    Calcula a matriz horário × funcionário para todos os funcionários ativos.
+
+    Usa um número fixo de consultas (funcionários, agenda compilada quando
+    fora do cache e agendamentos do dia), independente de quantos
+    funcionários a barbearia tem.
+
+    Returns:
+        tuple: (lista de funcionários ativos, ``{horário: [ids livres]}`` em
+        ordem cronológica, mensagem opcional quando a barbearia não atende).
+    """
+    employees = list(active_employees_query(barbershop))
+    schedule = get_schedule(barbershop)
+    if schedule.closed_message(date) or not employees:
+        day = _availability_for_day(date, schedule, [], None, None)
+        return employees, {}, day.message
+
+    busy = get_busy_intervals_by_employee([employee.id for employee in employees], date)
+    return employees, _availability_matrix(barbershop, schedule, employees, busy, date, duration), None
+
+
+async def aget_barbershop_availability(barbershop, date, duration=None):
+    """Versão assíncrona de ``get_barbershop_availability``, para views ``async``."""
+    employees = [employee async for employee in active_employees_query(barbershop)]
+    schedule = await aget_schedule(barbershop)
+    if schedule.closed_message(date) or not employees:
+        day = _availability_for_day(date, schedule, [], None, None)
+        return employees, {}, day.message
+
+    busy = _busy_by_employee(date, [
+        row async for row in busy_by_employee_query([employee.id for employee in employees], date)])
+    return employees, _availability_matrix(barbershop, schedule, employees, busy, date, duration), None
+
+
+def active_employees_query(barbershop):
+    return Employee.objects.filter(barbershop=barbershop, is_active=True).only('id', 'name')
+
+
+def _availability_matrix(barbershop, schedule, employees, busy, date, duration):
+    slot_duration = get_slot_duration(barbershop)
+    matrix = defaultdict(list)
+    for employee in employees:
+        day = _availability_for_day(
+            date, schedule, busy.get(employee.id, []), slot_duration, duration)
+        for slot in day.slots:
+            matrix[slot].append(employee.id)
+    return dict(sorted(matrix.items()))
+
+
+def is_interval_free(employee, date, time, duration, exclude_id=None):
+    """Verifica se ``[time, time + duration)`` não conflita com a agenda do funcionário."""
+    start = datetime.combine(date, time)
+    candidate = Interval(start, start + duration)
+    return not any(
+        busy.overlaps(candidate)
+        for busy in get_busy_intervals(employee, date, exclude_id=exclude_id)
+    )
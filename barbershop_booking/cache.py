@@ -0,0 +1,148 @@
+"""
+Cache da disponibilidade de horários por (barbearia, funcionário, data).
+
+As entradas não são apagadas na invalidação: cada chave inclui a versão
+global, a versão da barbearia e a versão do dia do funcionário, e os sinais em
+``signals.py`` apenas incrementam essas versões. A versão global, incrementada
+quando os dias da semana mudam, invalida todas as barbearias de uma vez. Assim, um cálculo iniciado antes de uma
+alteração nunca sobrescreve o cache com dados antigos, pois é gravado sob
+uma versão que não será mais lida.
+
+A página pública de apresentação da barbearia usa o mesmo esquema: o
+fragmento renderizado é gravado sob as versões de apresentação global e da
+barbearia, incrementadas quando os dias da semana, serviços, funcionários,
+horários ou dados da barbearia mudam.
+"""
+import threading
+
+from django.core.cache import cache
+
+from barbershop_management.versioning import aget_versions, bump_version, get_versions
+
+AVAILABILITY_CACHE_TIMEOUT = 60 * 60
+PRESENTATION_CACHE_TIMEOUT = 60 * 60 * 24
+
+GLOBAL_VERSION_KEY = 'availability:version'
+GLOBAL_PRESENTATION_VERSION_KEY = 'presentation:version'
+
+
+class CacheStats:
+    """Contadores de acertos e falhas do cache, por processo."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def snapshot(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / total if total else 0.0,
+            }
+
+
+stats = CacheStats()
+
+
+def _barbershop_version_key(barbershop_id):
+    return f'availability:version:{barbershop_id}'
+
+
+def _day_version_key(barbershop_id, employee_id, date):
+    return f'availability:version:{barbershop_id}:{employee_id}:{date.isoformat()}'
+
+
+def invalidate_barbershop(barbershop_id=None):
+    """
+    Invalida toda a disponibilidade da barbearia (horários, funcionários,
+    serviços), ou de todas as barbearias quando ``barbershop_id`` não é
+    informado.
+    """
+    bump_version(GLOBAL_VERSION_KEY if barbershop_id is None else _barbershop_version_key(barbershop_id))
+
+
+def invalidate_day(barbershop_id, employee_id, date):
+    """Invalida a disponibilidade de um funcionário em uma data."""
+    bump_version(_day_version_key(barbershop_id, employee_id, date))
+
+
+def _availability_key(barbershop_id, employee_id, date, service_id, versions):
+    return 'availability:{}:{}:{}:{}:{}:{}:{}'.format(
+        versions[GLOBAL_VERSION_KEY], barbershop_id, versions[_barbershop_version_key(barbershop_id)],
+        employee_id,
+        date.isoformat(), versions[_day_version_key(barbershop_id, employee_id, date)],
+        service_id or 0)
+
+
+def get_cached_availability(barbershop_id, employee_id, date, service_id, compute):
+    """
+    Retorna a disponibilidade em cache ou a calcula com ``compute()``.
+
+    ``compute`` deve devolver um objeto serializável; exceções (por exemplo
+    ``Http404``) não são armazenadas.
+    """
+    versions = get_versions(GLOBAL_VERSION_KEY, _barbershop_version_key(barbershop_id),
+                            _day_version_key(barbershop_id, employee_id, date))
+    key = _availability_key(barbershop_id, employee_id, date, service_id, versions)
+
+    result = cache.get(key)
+    stats.record(result is not None)
+    if result is None:
+        result = compute()
+        cache.set(key, result, AVAILABILITY_CACHE_TIMEOUT)
+    return result
+
+
+async def aget_cached_availability(barbershop_id, employee_id, date, service_id, compute):
+    """Versão assíncrona de ``get_cached_availability``; ``compute`` é uma corrotina."""
+    versions = await aget_versions(
+        GLOBAL_VERSION_KEY, _barbershop_version_key(barbershop_id),
+        _day_version_key(barbershop_id, employee_id, date))
+    key = _availability_key(barbershop_id, employee_id, date, service_id, versions)
+
+    result = await cache.aget(key)
+    stats.record(result is not None)
+    if result is None:
+        result = await compute()
+        await cache.aset(key, result, AVAILABILITY_CACHE_TIMEOUT)
+    return result
+
+
+def get_cache_stats():
+    """Retorna os contadores de acertos e falhas do cache de disponibilidade."""
+    return stats.snapshot()
+
+
+def _presentation_version_key(barbershop_id):
+    return f'presentation:version:{barbershop_id}'
+
+
+def invalidate_presentation(barbershop_id=None):
+    """
+    Invalida o fragmento em cache da página de apresentação da barbearia, ou
+    de todas as barbearias quando ``barbershop_id`` não é informado.
+    """
+    bump_version(GLOBAL_PRESENTATION_VERSION_KEY if barbershop_id is None
+                 else _presentation_version_key(barbershop_id))
+
+
+def get_presentation_version(barbershop_id):
+    """Versão atual da página de apresentação, usada na chave do fragmento em cache."""
+    key = _presentation_version_key(barbershop_id)
+    versions = get_versions(GLOBAL_PRESENTATION_VERSION_KEY, key)
+    return f'{versions[GLOBAL_PRESENTATION_VERSION_KEY]}:{versions[key]}'
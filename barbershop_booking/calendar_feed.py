@@ -0,0 +1,119 @@
+"""
+Feeds iCalendar (ICS) com os agendamentos de um funcionário ou da barbearia.
+
+Os feeds são públicos, mas cada URL traz um token derivado do ``code`` da
+barbearia (e do funcionário, no feed individual) com ``salted_hmac``; trocar
+o ``code`` invalida todos os links. Os eventos são gerados a partir de um
+``.iterator()``, então a memória não depende do tamanho da agenda, e as
+views respondem 304 quando nada mudou desde a última consulta do cliente.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Count, Max
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .models import Appointment
+
+FEED_KEY_SALT = 'barbershop_booking.calendar_feed'
+
+# Agendamentos mais antigos que isso não entram no feed
+FEED_PAST_DAYS = 30
+
+FEED_CHUNK_SIZE = 500
+
+ICS_DATETIME_FORMAT = '%Y%m%dT%H%M%SZ'
+
+
+def feed_token(barbershop, employee_id=None):
+    """Token do feed da barbearia ou, com ``employee_id``, do feed do funcionário."""
+    scope = f'employee:{employee_id}' if employee_id is not None else 'barbershop'
+    return salted_hmac(FEED_KEY_SALT, f'{barbershop.code}:{scope}').hexdigest()[:32]
+
+
+def is_valid_token(barbershop, token, employee_id=None):
+    return constant_time_compare(token, feed_token(barbershop, employee_id))
+
+
+def barbershop_feed_url(barbershop):
+    return reverse('barbershop_booking:barbershop_calendar_feed', kwargs={
+        'barbershop_name': barbershop.slug, 'token': feed_token(barbershop)})
+
+
+def employee_feed_url(barbershop, employee_id):
+    return reverse('barbershop_booking:employee_calendar_feed', kwargs={
+        'barbershop_name': barbershop.slug, 'employee_id': employee_id,
+        'token': feed_token(barbershop, employee_id)})
+
+
+def feed_appointments(barbershop, employee_id=None):
+    """Agendamentos do feed, a partir de ``FEED_PAST_DAYS`` dias atrás."""
+    appointments = Appointment.objects.filter(
+        barbershop=barbershop, date__gte=timezone.localdate() - timedelta(days=FEED_PAST_DAYS))
+    if employee_id is not None:
+        appointments = appointments.filter(employee_id=employee_id)
+    return appointments
+
+
+def feed_summary(appointments):
+    """Retorna ``(quantidade, última alteração)`` dos agendamentos do feed."""
+    summary = appointments.aggregate(count=Count('id'), last_modified=Max('updated_at'))
+    return summary['count'], summary['last_modified']
+
+
+def escape_text(value):
+    """Escapa um valor de texto conforme a RFC 5545."""
+    return (value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def fold_line(line):
+    """Quebra linhas com mais de 75 octetos, como exige a RFC 5545."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Não corta no meio de um caractere UTF-8
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+        limit = 74
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _utc(value):
+    return value.astimezone(dt_timezone.utc).strftime(ICS_DATETIME_FORMAT)
+
+
+def iter_calendar(appointments, calendar_name, host):
+    """Gera o documento ICS, um evento por agendamento."""
+    yield fold_line('BEGIN:VCALENDAR')
+    yield fold_line('VERSION:2.0')
+    yield fold_line('PRODID:-//app_portal//Agenda da barbearia//PT')
+    yield fold_line('CALSCALE:GREGORIAN')
+    yield fold_line(f'X-WR-CALNAME:{escape_text(calendar_name)}')
+
+    rows = appointments.order_by('date', 'time', 'id').values_list(
+        'id', 'date', 'time', 'status', 'updated_at', 'service__name', 'service__duration',
+        'client__name', 'employee__name')
+    current_timezone = timezone.get_current_timezone()
+    for (appointment_id, date, time, status, updated_at, service_name, duration,
+         client_name, employee_name) in rows.iterator(chunk_size=FEED_CHUNK_SIZE):
+        start = timezone.make_aware(datetime.combine(date, time), current_timezone)
+        yield ''.join((
+            fold_line('BEGIN:VEVENT'),
+            fold_line(f'UID:appointment-{appointment_id}@{host}'),
+            fold_line(f'DTSTAMP:{_utc(updated_at)}'),
+            fold_line(f'DTSTART:{_utc(start)}'),
+            fold_line(f'DTEND:{_utc(start + timedelta(minutes=duration))}'),
+            fold_line(f'SUMMARY:{escape_text(f"{service_name} - {client_name}")}'),
+            fold_line(f'DESCRIPTION:{escape_text(f"Profissional: {employee_name}")}'),
+            fold_line('STATUS:CANCELLED' if status == 'cancelled' else 'STATUS:CONFIRMED'),
+            fold_line('END:VEVENT'),
+        ))
+    yield fold_line('END:VCALENDAR')
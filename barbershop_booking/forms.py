@@ -1,6 +1,10 @@
+from datetime import datetime, timedelta
+
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+
+from barbershop_management.schedule import get_schedule
 from .models import Client, Appointment
 
 
@@ -43,22 +47,26 @@ class AppointmentForm(forms.ModelForm):
         date = cleaned_data.get('date')
         time = cleaned_data.get('time')
         employee = cleaned_data.get('employee')
+        service = cleaned_data.get('service')
 
         if date and time and employee:
-            barbershop = employee.barbershop
-            day_of_week = date.weekday()
+            # Agenda compilada em cache: nenhuma consulta ao banco
+            schedule = get_schedule(employee.barbershop_id)
 
             # Verificar se a barbearia está aberta neste dia
-            if not barbershop.working_days.filter(day=day_of_week).exists():
+            if not schedule.is_open_on(date):
                 raise forms.ValidationError("A barbearia está fechada neste dia.")
 
             # Verificar o horário de funcionamento
-            working_hours = barbershop.working_hours.filter(day_of_week__day=day_of_week).first()
-            if working_hours:
-                if time < working_hours.start_time or time > working_hours.end_time:
-                    raise forms.ValidationError("O horário selecionado está fora do horário de funcionamento.")
-            else:
+            if not schedule.intervals_on(date):
                 raise forms.ValidationError("Não há horário de funcionamento definido para este dia.")
+            interval = schedule.interval_at(date, time)
+            if interval is None:
+                raise forms.ValidationError("O horário selecionado está fora do horário de funcionamento.")
+            if service:
+                end = datetime.combine(date, time) + timedelta(minutes=service.duration)
+                if end > datetime.combine(date, interval.end_time):
+                    raise forms.ValidationError("O serviço selecionado termina após o horário de funcionamento.")
 
         return cleaned_data
     def save(self, commit=True):
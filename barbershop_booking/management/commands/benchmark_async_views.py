@@ -0,0 +1,134 @@
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+
+from barbershop_booking.models import Appointment, Client
+from barbershop_booking.tenancy import barbershop_cache
+from barbershop_management.models import Barbershop, DayOfWeek, Employee, Service, WorkingHours
+
+URLCONFS = (('síncronas', 'setup.urls'), ('async', 'setup.asgi_urls'))
+
+
+def create_barbershop(employees, days):
+    """Barbearia aberta todos os dias das 8h às 20h, com agenda parcialmente ocupada."""
+    owner = User.objects.create_user(username=f'benchmark-async-{time.time_ns()}')
+    barbershop = Barbershop.objects.create(
+        name=f'Benchmark {owner.username}', owner=owner, address='-', phone='0',
+        email='benchmark@example.com')
+    for day_number, day_name in Barbershop.DAYS_OF_WEEK:
+        day, _ = DayOfWeek.objects.get_or_create(day=day_number, defaults={'name': day_name})
+        barbershop.working_days.add(day)
+        WorkingHours.objects.create(
+            barbershop=barbershop, day_of_week=day, start_time='08:00', end_time='20:00')
+    service = Service.objects.create(
+        barbershop=barbershop, name='Corte', description='', price=30, duration=30)
+    client = Client.objects.create(name='Cliente', phone='11900000000', barbershop=barbershop)
+    staff = [
+        Employee.objects.create(
+            name=f'Funcionário {index}', phone=f'+55119{index:08d}', barbershop=barbershop,
+            role='barber', hire_date=date(2000, 1, 1))
+        for index in range(employees)
+    ]
+    start = date.today()
+    Appointment.objects.bulk_create(
+        Appointment(client=client, employee=employee, service=service, barbershop=barbershop,
+                    date=start + timedelta(days=offset), time=f'{hour:02d}:00')
+        for employee in staff for offset in range(days) for hour in range(8, 20, 3))
+    return barbershop, staff, service
+
+
+def customer_urls(barbershop, staff, service, days, customer):
+    """Sequência de requisições de um cliente navegando pela página de agendamento."""
+    start = date.today()
+    employee = staff[customer % len(staff)]
+    day = (start + timedelta(days=customer % days)).isoformat()
+    name = barbershop.slug
+    return [
+        reverse('barbershop_booking:any_employee_slots',
+                kwargs={'barbershop_name': name, 'date': day}) + f'?service={service.pk}',
+        reverse('barbershop_booking:availability_calendar',
+                kwargs={'barbershop_name': name, 'employee_id': employee.pk})
+        + f'?start={start.isoformat()}&end={(start + timedelta(days=days - 1)).isoformat()}',
+        reverse('barbershop_booking:get_available_slots',
+                kwargs={'barbershop_name': name, 'employee_id': employee.pk, 'date': day})
+        + f'?service={service.pk}',
+        reverse('barbershop_booking:employee_schedule',
+                kwargs={'barbershop_name': name, 'employee_id': employee.pk})
+        + f'?start={start.isoformat()}',
+    ]
+
+
+async def simulate_customer(urls, rounds, latencies):
+    client = AsyncClient()
+    for _ in range(rounds):
+        for url in urls:
+            started = time.perf_counter()
+            response = await client.get(url)
+            if response.streaming and response.is_async:
+                async for _chunk in response.streaming_content:
+                    pass
+            elif response.streaming:
+                # Como o servidor ASGI, consome iteradores síncronos fora do event loop
+                await sync_to_async(list)(response.streaming_content)
+            if response.status_code != 200:
+                raise CommandError(f'{url} respondeu {response.status_code}.')
+            latencies.append(time.perf_counter() - started)
+
+
+async def run_load(customers, rounds):
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(simulate_customer(urls, rounds, latencies) for urls in customers))
+    return time.perf_counter() - started, latencies
+
+
+class Command(BaseCommand):
+    help = ('Compara a vazão das APIs públicas de horários nas versões síncronas e async, '
+            'com clientes simultâneos pelo AsyncClient. Os dados são criados em uma '
+            'transação desfeita ao final.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=200,
+                            help='Clientes simultâneos simulados')
+        parser.add_argument('--rounds', type=int, default=3,
+                            help='Vezes que cada cliente percorre as APIs')
+        parser.add_argument('--employees', type=int, default=5)
+        parser.add_argument('--days', type=int, default=14,
+                            help='Dias de agenda consultados')
+
+    def handle(self, *args, **options):
+        if min(options['clients'], options['rounds'], options['employees'], options['days']) < 1:
+            raise CommandError('Os parâmetros devem ser positivos.')
+
+        with transaction.atomic():
+            barbershop, staff, service = create_barbershop(options['employees'], options['days'])
+            customers = [
+                customer_urls(barbershop, staff, service, options['days'], index)
+                for index in range(options['clients'])
+            ]
+            for label, urlconf in URLCONFS:
+                cache.clear()
+                barbershop_cache.clear()
+                # O AsyncClient faz requisições ASGI, que usam ASGI_URLCONF
+                with override_settings(ASGI_URLCONF=urlconf,
+                                       ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                    # async_to_sync na thread principal: o ORM das views roda na
+                    # mesma conexão da transação
+                    elapsed, latencies = async_to_sync(run_load)(customers, options['rounds'])
+                latencies.sort()
+                self.stdout.write(
+                    f'Views {label}: {len(latencies)} requisições em {elapsed:.2f}s '
+                    f'({len(latencies) / elapsed:.0f} req/s); latência p50 '
+                    f'{statistics.median(latencies) * 1000:.0f} ms, p95 '
+                    f'{latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f} ms')
+            transaction.set_rollback(True)
@@ -0,0 +1,216 @@
+import multiprocessing
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from django.db.utils import ConnectionRouter
+
+from barbershop_booking.models import Appointment, Client
+from barbershop_management.models import Barbershop, Employee, Service
+from setup.database import sqlite_database
+from setup.routers import ReadWriteRouter
+
+MODES = (('padrão', False), ('produção', True))
+
+# Os processos herdam a configuração do Django e as conexões registradas
+FORK = multiprocessing.get_context('fork')
+
+
+def register_database(alias, settings_dict):
+    """Registra ``alias`` em ``connections``, com os valores padrão do Django."""
+    connections.settings[alias] = connections.configure_settings(
+        {DEFAULT_DB_ALIAS: settings_dict})[DEFAULT_DB_ALIAS]
+
+
+def unregister_database(alias):
+    connections[alias].close()
+    del connections[alias]
+    del connections.settings[alias]
+
+
+def seed(alias):
+    """Cria a barbearia, o cliente, o serviço e os funcionários usados nos agendamentos."""
+    owner = User.objects.db_manager(alias).create_user(username='benchmark')
+    barbershop = Barbershop.objects.using(alias).create(
+        name='Benchmark', owner=owner, address='-', phone='0', email='benchmark@example.com')
+    client = Client.objects.using(alias).create(
+        name='Cliente', phone='11900000000', barbershop=barbershop)
+    service = Service.objects.using(alias).create(
+        barbershop=barbershop, name='Corte', description='', price=30, duration=15)
+    employees = [
+        Employee.objects.using(alias).create(
+            name=f'Funcionário {index}', phone=f'+55119{index:08d}', barbershop=barbershop,
+            role='barber', hire_date=date(2000, 1, 1)).pk
+        for index in range(4)
+    ]
+    return barbershop.pk, client.pk, service.pk, employees
+
+
+class Worker:
+    """
+    Repete ``operation`` até ``deadline`` em um processo próprio, como um worker do
+    servidor, medindo latência e contando falhas por bloqueio. Em threads, a espera
+    pelo GIL entraria na latência medida e esconderia a espera pelo banco.
+    """
+
+    def __init__(self, operation, deadline):
+        self.latencies = []
+        self.failures = 0
+        self._results, sender = FORK.Pipe(duplex=False)
+        self._process = FORK.Process(
+            target=self._run, args=(operation, deadline, sender), daemon=True)
+        self._sender = sender
+
+    @staticmethod
+    def _run(operation, deadline, sender):
+        latencies, failures = [], 0
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                operation(len(latencies) + failures)
+            except OperationalError:
+                failures += 1
+            else:
+                latencies.append(time.perf_counter() - started)
+        connections.close_all()
+        sender.send((latencies, failures))
+
+    def start(self):
+        self._process.start()
+        # Só o processo filho escreve; fechada aqui, a leitura não espera um filho que falhou
+        self._sender.close()
+
+    def join(self):
+        try:
+            self.latencies, self.failures = self._results.recv()
+        except EOFError:
+            raise CommandError('Um dos processos do benchmark falhou.')
+        finally:
+            self._process.join()
+
+
+class Command(BaseCommand):
+    help = ('Compara leituras durante rajadas de agendamentos no SQLite padrão e no modo de '
+            'produção (WAL, busy_timeout e conexão de leitura), com as consultas roteadas pelo '
+            'ReadWriteRouter e um processo por leitor ou escritor. Falha se o modo de produção '
+            'tiver falhas por bloqueio ou leituras mais lentas (p99) que o padrão. Usa bancos '
+            'temporários.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5, help='Duração de cada modo')
+        parser.add_argument('--writers', type=int, default=4,
+                            help='Processos fazendo agendamentos')
+        parser.add_argument('--readers', type=int, default=8,
+                            help='Processos consultando a agenda')
+        parser.add_argument('--hold-ms', type=float, default=5,
+                            help='Tempo de cada transação de agendamento entre a gravação '
+                                 'e o commit')
+
+    def handle(self, *args, **options):
+        if min(options['seconds'], options['writers'], options['readers']) <= 0:
+            raise CommandError('Os parâmetros devem ser positivos.')
+
+        directory = Path(tempfile.mkdtemp(prefix='benchmark-sqlite-'))
+        try:
+            template = directory / 'template.sqlite3'
+            register_database('benchmark_template', sqlite_database(template))
+            try:
+                call_command('migrate', database='benchmark_template', verbosity=0)
+                fixtures = seed('benchmark_template')
+            finally:
+                unregister_database('benchmark_template')
+
+            results = {}
+            for label, production in MODES:
+                path = directory / f'{label}.sqlite3'
+                shutil.copy(template, path)
+                results[label] = self.run_mode(path, production, fixtures, options)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+        default, production = results['padrão'], results['produção']
+        if production['read_failures'] or production['write_failures']:
+            raise CommandError('Operações falharam por bloqueio no modo de produção.')
+        self.stdout.write(self.style.SUCCESS('Nenhuma operação falhou por bloqueio no modo de produção'))
+        # O objetivo do modo de produção: leitores não esperam pelos escritores
+        comparison = (f"p99 de {production['read_p99'] * 1000:.1f} ms no modo de produção e "
+                      f"{default['read_p99'] * 1000:.1f} ms no padrão")
+        if production['read_p99'] > default['read_p99']:
+            raise CommandError(f'Leituras mais lentas no modo de produção: {comparison}.')
+        self.stdout.write(self.style.SUCCESS(f'Leituras durante as rajadas: {comparison}'))
+
+    def run_mode(self, path, production, fixtures, options):
+        write_alias, read_alias = 'benchmark_write', 'benchmark_read'
+        register_database(write_alias, sqlite_database(path, production=production))
+        register_database(read_alias, sqlite_database(path, production=production, read_only=True))
+        barbershop_id, client_id, service_id, employees = fixtures
+        hold = options['hold_ms'] / 1000
+        start_day = date(2030, 1, 1)
+
+        # As consultas escolhem a conexão pelo ReadWriteRouter, como no modo de produção
+        routing = ConnectionRouter([ReadWriteRouter(write_alias, read_alias)])
+
+        def book(writer, attempt):
+            # Verifica o horário e grava o agendamento na mesma transação, como a reserva;
+            # dentro dela, a leitura do router fica na conexão de escrita
+            employee_id = employees[writer % len(employees)]
+            day = start_day + timedelta(days=attempt // 40)
+            at = f'{8 + attempt % 40 // 4:02d}:{attempt % 4 * 15:02d}'
+            with transaction.atomic(using=routing.db_for_write(Appointment)):
+                taken = Appointment.objects.using(routing.db_for_read(Appointment)).filter(
+                    employee_id=employee_id, date=day, time=at).exists()
+                if not taken:
+                    Appointment.objects.using(routing.db_for_write(Appointment)).bulk_create([
+                        Appointment(barbershop_id=barbershop_id, client_id=client_id,
+                                    service_id=service_id, employee_id=employee_id,
+                                    date=day, time=at)])
+                time.sleep(hold)
+
+        def read(reader, attempt):
+            list(Appointment.objects.using(routing.db_for_read(Appointment)).filter(
+                employee_id=employees[reader % len(employees)],
+                date=start_day + timedelta(days=attempt % 7),
+            ).values_list('time', 'service__duration'))
+
+        deadline = time.monotonic() + options['seconds']
+        writers = [
+            Worker(lambda attempt, index=index: book(index, attempt), deadline)
+            for index in range(options['writers'])
+        ]
+        readers = [
+            Worker(lambda attempt, index=index: read(index, attempt), deadline)
+            for index in range(options['readers'])
+        ]
+        # Cada processo abre as próprias conexões
+        connections.close_all()
+        try:
+            for worker in writers + readers:
+                worker.start()
+            for worker in writers + readers:
+                worker.join()
+        finally:
+            unregister_database(write_alias)
+            unregister_database(read_alias)
+
+        bookings = sum(len(worker.latencies) for worker in writers)
+        write_failures = sum(worker.failures for worker in writers)
+        reads = sorted(latency for worker in readers for latency in worker.latencies)
+        read_failures = sum(worker.failures for worker in readers)
+        label = 'produção' if production else 'padrão'
+        summary = (f'SQLite {label}: {bookings} agendamentos ({write_failures} falhas por bloqueio); '
+                   f'{len(reads)} leituras ({read_failures} falhas)')
+        if not reads:
+            raise CommandError(f'Nenhuma leitura concluída no SQLite {label}.')
+        read_p99 = reads[max(int(len(reads) * 0.99) - 1, 0)]
+        summary += (f', latência p50 {statistics.median(reads) * 1000:.1f} ms, '
+                    f'p99 {read_p99 * 1000:.1f} ms, máxima {reads[-1] * 1000:.1f} ms')
+        self.stdout.write(summary)
+        return {'reads': len(reads), 'read_failures': read_failures,
+                'write_failures': write_failures, 'read_p99': read_p99}
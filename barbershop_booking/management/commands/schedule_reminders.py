@@ -0,0 +1,32 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from barbershop_booking.reminders import get_reminder_lead, schedule_reminders
+from barbershop_management.sharding import tenant_databases, use_shard
+
+
+class Command(BaseCommand):
+    help = ('Cria os lembretes dos agendamentos que entraram na janela de lembrete desde a '
+            'última execução; pode ser executado a cada minuto')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lead-hours', type=float,
+                            help='Antecedência do lembrete, em horas (padrão: '
+                                 'NOTIFICATION_REMINDER_LEAD_HOURS)')
+
+    def handle(self, *args, **options):
+        lead = get_reminder_lead()
+        if options['lead_hours'] is not None:
+            if options['lead_hours'] <= 0:
+                raise CommandError('--lead-hours deve ser positivo.')
+            lead = timedelta(hours=options['lead_hours'])
+        started = time.monotonic()
+        count = 0
+        # Cada banco tem a sua marca d'água
+        for alias in tenant_databases():
+            with use_shard(alias):
+                count += schedule_reminders(lead=lead)
+        self.stdout.write(self.style.SUCCESS(
+            f'{count} lembrete(s) agendado(s) em {(time.monotonic() - started) * 1000:.1f} ms'))
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from barbershop_booking.notifications import NOTIFICATION_BATCH_SIZE, get_transport, process_queue
+from barbershop_management.sharding import tenant_databases, use_shard
+
+
+class Command(BaseCommand):
+    help = ('Envia as notificações pendentes em lotes, pelo transporte configurado em '
+            'NOTIFICATION_TRANSPORT; com --loop, continua consultando a fila')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=NOTIFICATION_BATCH_SIZE,
+                            help='Notificações reservadas por lote')
+        parser.add_argument('--max-batches', type=int,
+                            help='Para depois de enviar esta quantidade de lotes (em cada '
+                                 'banco, com sharding)')
+        parser.add_argument('--transport', help='Caminho da classe de transporte (substitui a configuração)')
+        parser.add_argument('--loop', action='store_true',
+                            help='Continua em execução, consultando a fila periodicamente')
+        parser.add_argument('--interval', type=float, default=10,
+                            help='Segundos entre consultas à fila vazia, com --loop')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size deve ser positivo.')
+        try:
+            transport = import_string(options['transport'])() if options['transport'] else get_transport()
+        except ImportError as error:
+            raise CommandError(f'Transporte inválido: {error}')
+
+        while True:
+            sent = failed = 0
+            for alias in tenant_databases():
+                with use_shard(alias):
+                    shard_sent, shard_failed = process_queue(
+                        transport, options['batch_size'], options['max_batches'])
+                sent += shard_sent
+                failed += shard_failed
+            if sent or failed or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'{sent} notificação(ões) enviada(s), {failed} falha(s)'))
+            if not options['loop']:
+                break
+            if not sent and not failed:
+                time.sleep(options['interval'])
@@ -0,0 +1,33 @@
+# Generated by Django 5.1 on 2026-10-18 16:09
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def cancel_duplicate_slots(apps, schema_editor):
+    # Agendamentos ativos repetidos no mesmo horário: mantém o mais antigo e cancela os demais
+    Appointment = apps.get_model('barbershop_booking', 'Appointment')
+    active = Appointment.objects.using(schema_editor.connection.alias).exclude(status='cancelled')
+    duplicates = (
+        active.order_by().values('employee', 'date', 'time')
+        .annotate(first=Min('pk'), count=Count('pk')).filter(count__gt=1)
+    )
+    for slot in duplicates:
+        active.filter(employee=slot['employee'], date=slot['date'], time=slot['time']).exclude(
+            pk=slot['first']).update(status='cancelled')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barbershop_booking', '0003_remove_appointment_updated_at'),
+        ('barbershop_management', '0003_barbershop_slot_duration'),
+    ]
+
+    operations = [
+        migrations.RunPython(cancel_duplicate_slots, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'cancelled'), _negated=True), fields=('employee', 'date', 'time'), name='unique_active_appointment_slot'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1 on 2026-10-18 16:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barbershop_booking', '0004_appointment_unique_active_slot'),
+        ('barbershop_management', '0003_barbershop_slot_duration'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='appointment',
+            options={},
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['employee', 'date', 'time'], name='appointment_employee_slot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['barbershop', 'date'], name='appointment_shop_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['employee', 'status', 'date', 'time'], name='appointment_employee_next_idx'),
+        ),
+    ]
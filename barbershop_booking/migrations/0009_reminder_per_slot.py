@@ -0,0 +1,22 @@
+# Generated by Django 5.1 on 2026-10-18 17:47
+
+import django.db.models.fields.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barbershop_booking', '0008_appointment_reminders'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='notification',
+            name='unique_appointment_reminder',
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(models.F('appointment'), django.db.models.fields.json.KeyTextTransform('date', 'payload'), django.db.models.fields.json.KeyTextTransform('time', 'payload'), condition=models.Q(('type', 'appointment_reminder')), name='unique_appointment_reminder'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1 on 2026-10-18 18:25
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_completed_prices(apps, schema_editor):
+    # Sem histórico, os agendamentos já concluídos ficam com o preço atual do serviço
+    Appointment = apps.get_model('barbershop_booking', 'Appointment')
+    Service = apps.get_model('barbershop_management', 'Service')
+    Appointment.objects.using(schema_editor.connection.alias).filter(status='completed').update(
+        price=Subquery(Service.objects.filter(pk=OuterRef('service_id')).values('price')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barbershop_booking', '0009_reminder_per_slot'),
+        ('barbershop_management', '0008_barbershop_old_slugs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True),
+        ),
+        migrations.RunPython(fill_completed_prices, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,10 @@
+from datetime import datetime, timedelta
+
 from django.db import models
+from django.db.models.fields.json import KT
 from django.contrib.auth.models import User
-from barbershop_management.models import Employee, Service, Barbershop
+from django.utils import timezone
+from barbershop_management.models import Employee, Service, Barbershop, load_stored_values
 
 
 class Client(models.Model):
@@ -75,14 +79,71 @@ class Appointment(models.Model):
     date = models.DateField()
     time = models.TimeField()  # Certifique-se de que este campo existe
     created_at = models.DateTimeField(auto_now_add=True)
+    # Usado no ETag da agenda do funcionário
+    updated_at = models.DateTimeField(auto_now=True)
     status = models.CharField(
         max_length=20, choices=STATUS_CHOICES, default='scheduled')
+    # Preço do serviço no momento da conclusão, usado pelos consolidados financeiros
+    price = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
 
     def __str__(self):
         return f"{self.service} with {self.employee} on {self.date} at {self.time}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Valores carregados do banco, usados pelos sinais para detectar remarcações
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        # O preço é fixado na conclusão (ou na troca do serviço); uma nova conclusão
+        # usa o preço da época
+        load_stored_values(self, kwargs)
+        loaded = getattr(self, '_loaded_values', None) or {}
+        if self.status != 'completed':
+            self.price = None
+        elif self.price is None or self.service_id != loaded.get('service_id', self.service_id):
+            self.price = self.service.price
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'status', 'service', 'service_id'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'price'}
+        super().save(*args, **kwargs)
+        # Os sinais já usaram os valores anteriores; os salvos passam a ser os carregados
+        self._loaded_values = {field.attname: getattr(self, field.attname)
+                               for field in self._meta.concrete_fields}
+
+    @property
+    def start(self):
+        """Data e hora de início do atendimento."""
+        return datetime.combine(self.date, self.time)
+
+    @property
+    def end(self):
+        """Data e hora de término, calculada a partir de ``Service.duration``."""
+        return self.start + timedelta(minutes=self.service.duration)
+
     class Meta:
-        ordering = ['-date', '-time']
+        # Sem ordenação padrão: cada consulta ordena apenas quando precisa,
+        # evitando um ORDER BY (e uma ordenação) em toda leitura de agendamentos.
+        indexes = [
+            # Agenda do funcionário no dia / período (disponibilidade, reservas)
+            models.Index(fields=['employee', 'date', 'time'], name='appointment_employee_slot_idx'),
+            # Agendamentos da barbearia por data (dashboard, relatórios)
+            models.Index(fields=['barbershop', 'date'], name='appointment_shop_date_idx'),
+            # Próximos agendamentos por status (lista de funcionários)
+            models.Index(fields=['employee', 'status', 'date', 'time'], name='appointment_employee_next_idx'),
+            # Agendamentos que entram na janela de lembrete (reminders.py)
+            models.Index(fields=['status', 'date', 'time'], name='appointment_status_slot_idx'),
+        ]
+        constraints = [
+            # Um funcionário não pode ter dois agendamentos ativos no mesmo horário
+            models.UniqueConstraint(
+                fields=['employee', 'date', 'time'],
+                condition=~models.Q(status='cancelled'),
+                name='unique_active_appointment_slot',
+            ),
+        ]
 
 
 class Review(models.Model):
@@ -108,28 +169,93 @@ class Notification(models.Model):
     """
     Representa uma notificação enviada a um cliente.
 
+    As notificações são criadas pendentes pelos sinais de agendamento e
+    enviadas pelo comando ``send_notifications`` (veja ``notifications.py``),
+    fora do ciclo da requisição.
+
     Attributes:
         client (ForeignKey): Cliente que receberá a notificação.
         appointment (ForeignKey): Agendamento associado à notificação.
-        type (CharField): Tipo de notificação (lembrete, confirmação, cancelamento).
-        message (TextField): Conteúdo da notificação.
+        type (CharField): Tipo de notificação (lembrete, confirmação, remarcação, cancelamento).
+        message (TextField): Conteúdo da notificação, preenchido no envio.
+        payload (JSONField): Dados do evento usados na mensagem (por exemplo,
+            a data e o horário anteriores de uma remarcação).
+        status (CharField): Situação na fila de envio; ``skipped`` indica um lembrete
+            descartado porque o agendamento não está mais marcado.
+        attempts (PositiveSmallIntegerField): Tentativas de envio já feitas.
+        next_attempt_at (DateTimeField): Momento a partir do qual o envio pode ser tentado.
+        claim_token (UUIDField): Identifica o lote do processo que está enviando a notificação.
+        claimed_at (DateTimeField): Momento em que a notificação foi reservada para envio.
+        last_error (TextField): Erro da última tentativa que falhou.
+        created_at (DateTimeField): Data e hora de criação da notificação.
         sent_at (DateTimeField): Data e hora de envio da notificação.
         is_read (BooleanField): Indica se a notificação foi lida pelo cliente.
     """
     TYPE_CHOICES = [
         ('appointment_reminder', 'Appointment Reminder'),
         ('appointment_confirmation', 'Appointment Confirmation'),
+        ('appointment_reschedule', 'Appointment Reschedule'),
         ('appointment_cancellation', 'Appointment Cancellation'),
     ]
 
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('skipped', 'Skipped'),
+        ('failed', 'Failed'),
+    ]
+
     client = models.ForeignKey(
         Client, on_delete=models.CASCADE, related_name='notifications')
     appointment = models.ForeignKey(
         Appointment, on_delete=models.CASCADE, related_name='notifications')
     type = models.CharField(max_length=30, choices=TYPE_CHOICES)
-    message = models.TextField()
-    sent_at = models.DateTimeField(auto_now_add=True)
+    message = models.TextField(blank=True)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.UUIDField(null=True, blank=True, editable=False)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
     is_read = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Fila de envio: pendentes cujo horário de tentativa já chegou
+            models.Index(fields=['status', 'next_attempt_at'], name='notification_queue_idx'),
+            models.Index(fields=['claim_token'], name='notification_claim_idx'),
+        ]
+        constraints = [
+            # Um lembrete por horário do agendamento (a data e o horário ficam no
+            # payload), mesmo com execuções sobrepostas do agendador; remarcado, o
+            # agendamento recebe um lembrete do novo horário
+            models.UniqueConstraint(
+                'appointment', KT('payload__date'), KT('payload__time'),
+                condition=models.Q(type='appointment_reminder'),
+                name='unique_appointment_reminder',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.type} for {self.client} - {self.appointment}"
+
+
+class SchedulerWatermark(models.Model):
+    """
+    Marca até onde uma tarefa periódica já processou os dados.
+
+    Attributes:
+        name (CharField): Nome da tarefa (por exemplo, ``appointment_reminders``).
+        value (DateTimeField): Momento até o qual a tarefa já foi executada.
+        updated_at (DateTimeField): Data e hora da última atualização.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    value = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
@@ -0,0 +1,284 @@
+"""
+Fila de notificações de agendamento.
+
+Criar, remarcar ou cancelar um agendamento apenas grava linhas pendentes de
+``Notification`` (com ``bulk_create``, depois do commit da transação); o
+envio é feito pelo comando ``send_notifications``, fora do ciclo da
+requisição, de modo que a latência do agendamento não depende da entrega.
+
+O worker reserva lotes de notificações pendentes com um ``claim_token``
+(um ``UPDATE`` condicionado a ``status='pending'``, seguro com vários
+workers), monta as mensagens a partir dos templates em
+``templates/barbearia/notifications/`` e as entrega pelo transporte
+configurado em ``NOTIFICATION_TRANSPORT``. Falhas são repetidas com espera
+exponencial até ``NOTIFICATION_MAX_ATTEMPTS``; reservas de um worker que
+parou são liberadas depois de ``CLAIM_TIMEOUT``.
+
+Agendamentos gravados em massa (por exemplo, pela importação de CSV) não
+disparam sinais e, portanto, não geram notificações.
+"""
+import random
+import sys
+import uuid
+from datetime import date, time, timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.mail import get_connection, send_mail
+from django.db import router, transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Notification
+from .reminders import is_stale_reminder
+
+NOTIFICATION_BATCH_SIZE = 100
+
+# Uma reserva mais antiga que isso pertence a um worker que parou
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# Espera antes da tentativa n: RETRY_BACKOFF * 2 ** (n - 1), com variação aleatória
+RETRY_BACKOFF = timedelta(seconds=30)
+MAX_RETRY_DELAY = timedelta(hours=6)
+
+
+def build_notification(appointment, notification_type, **payload):
+    """Notificação pendente de ``appointment`` (não gravada)."""
+    return Notification(
+        client_id=appointment.client_id, appointment=appointment, type=notification_type,
+        # Datas e horários são gravados em ISO, para caber no JSON
+        payload={key: value.isoformat() if hasattr(value, 'isoformat') else value
+                 for key, value in payload.items()})
+
+
+def enqueue(notifications):
+    """
+    Grava ``notifications`` com um ``bulk_create`` depois do commit da
+    transação atual no banco do agendamento (imediatamente, fora de uma
+    transação). Se a transação for desfeita, nada é enfileirado.
+    """
+    by_db = {}
+    for notification in notifications:
+        using = router.db_for_write(Notification, instance=notification.appointment)
+        by_db.setdefault(using, []).append(notification)
+    for using, pending in by_db.items():
+        transaction.on_commit(
+            partial(Notification.objects.using(using).bulk_create, pending), using=using)
+
+
+def notify_appointments(appointments, notification_type, **payload):
+    """Enfileira uma notificação ``notification_type`` para cada agendamento."""
+    enqueue(build_notification(appointment, notification_type, **payload)
+            for appointment in appointments)
+
+
+# Transportes
+
+class BaseTransport:
+    """
+    Entrega notificações. ``send`` deve levantar uma exceção quando a entrega
+    falha; a notificação é então tentada novamente mais tarde.
+
+    O transporte é usado como gerenciador de contexto em cada lote, para que
+    conexões possam ser reaproveitadas entre as mensagens.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def send(self, notification):
+        raise NotImplementedError
+
+
+class ConsoleTransport(BaseTransport):
+    """Escreve as mensagens na saída padrão; útil em desenvolvimento."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, notification):
+        self.stream.write(
+            f'[{notification.type}] {notification.client.phone}: {notification.message}\n')
+        self.stream.flush()
+
+
+class FileTransport(BaseTransport):
+    """Acrescenta as mensagens a ``NOTIFICATION_FILE_PATH``, uma por bloco."""
+
+    def __init__(self, path=None):
+        self.path = path or getattr(settings, 'NOTIFICATION_FILE_PATH', 'notifications.log')
+
+    def __enter__(self):
+        self.file = open(self.path, 'a', encoding='utf-8')
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.close()
+        return False
+
+    def send(self, notification):
+        self.file.write(
+            f'{timezone.now().isoformat()} [{notification.type}] {notification.client.phone}\n'
+            f'{notification.message}\n\n')
+        self.file.flush()
+
+
+class EmailTransport(BaseTransport):
+    """
+    Envia pelo backend de e-mail do Django (``EMAIL_BACKEND``), para o
+    endereço ``NOTIFICATION_EMAIL_ADDRESS`` formatado com o telefone do
+    cliente (por exemplo, um gateway de SMS: ``'{phone}@sms.exemplo.com'``).
+    """
+
+    def __init__(self, address=None):
+        self.address = address or settings.NOTIFICATION_EMAIL_ADDRESS
+
+    def __enter__(self):
+        self.connection = get_connection()
+        self.connection.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.connection.close()
+        return False
+
+    def send(self, notification):
+        send_mail(
+            subject=f'{notification.appointment.barbershop.name}: {notification.get_type_display()}',
+            message=notification.message,
+            from_email=None,
+            recipient_list=[self.address.format(phone=notification.client.phone)],
+            connection=self.connection,
+        )
+
+
+def get_transport():
+    """Instancia o transporte configurado em ``NOTIFICATION_TRANSPORT``."""
+    return import_string(getattr(
+        settings, 'NOTIFICATION_TRANSPORT', 'barbershop_booking.notifications.ConsoleTransport'))()
+
+
+# Worker
+
+def render_message(notification):
+    appointment = notification.appointment
+    payload = dict(notification.payload)
+    if payload.get('previous_date'):
+        payload['previous_date'] = date.fromisoformat(payload['previous_date'])
+    if payload.get('previous_time'):
+        payload['previous_time'] = time.fromisoformat(payload['previous_time'])
+    return render_to_string(f'barbearia/notifications/{notification.type}.txt', {
+        'notification': notification,
+        'appointment': appointment,
+        'client': notification.client,
+        'barbershop': appointment.barbershop,
+        'payload': payload,
+    }).strip()
+
+
+def release_stale_claims(now=None):
+    """Devolve à fila as notificações reservadas por um worker que parou."""
+    now = now or timezone.now()
+    return Notification.objects.filter(
+        status='sending', claimed_at__lt=now - CLAIM_TIMEOUT,
+    ).update(status='pending', claim_token=None, claimed_at=None)
+
+
+def claim_batch(batch_size=NOTIFICATION_BATCH_SIZE, now=None):
+    """
+    Reserva até ``batch_size`` notificações pendentes para este worker.
+
+    Returns:
+        list: as notificações reservadas, com agendamento, cliente e
+        barbearia carregados.
+    """
+    now = now or timezone.now()
+    token = uuid.uuid4()
+    with transaction.atomic(using=router.db_for_write(Notification)):
+        ids = list(
+            Notification.objects.filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return []
+        # Condicionado ao status: um id reservado por outro worker não é alterado
+        Notification.objects.filter(id__in=ids, status='pending').update(
+            status='sending', claim_token=token, claimed_at=now)
+    return list(
+        Notification.objects.filter(claim_token=token, status='sending')
+        .select_related('client', 'appointment__barbershop', 'appointment__service',
+                        'appointment__employee')
+        .order_by('id'))
+
+
+def retry_delay(attempts):
+    delay = RETRY_BACKOFF * 2 ** (attempts - 1) * (0.5 + random.random())
+    return min(delay, MAX_RETRY_DELAY)
+
+
+def deliver_batch(notifications, transport):
+    """
+    Envia as notificações reservadas e grava o resultado de todas com um
+    ``bulk_update``. Lembretes de agendamentos que não estão mais marcados,
+    ou de um horário anterior à remarcação, são descartados (``skipped``).
+
+    Returns:
+        tuple: quantidade de notificações enviadas e de falhas.
+    """
+    max_attempts = getattr(settings, 'NOTIFICATION_MAX_ATTEMPTS', 5)
+    sent = failed = 0
+    with transport:
+        for notification in notifications:
+            notification.claim_token = None
+            notification.claimed_at = None
+            if notification.type == 'appointment_reminder' and (
+                    notification.appointment.status != 'scheduled'
+                    or is_stale_reminder(notification)):
+                notification.status = 'skipped'
+                continue
+            notification.attempts += 1
+            try:
+                notification.message = render_message(notification)
+                transport.send(notification)
+            except Exception as error:
+                failed += 1
+                notification.last_error = f'{type(error).__name__}: {error}'
+                if notification.attempts >= max_attempts:
+                    notification.status = 'failed'
+                else:
+                    notification.status = 'pending'
+                    notification.next_attempt_at = timezone.now() + retry_delay(notification.attempts)
+            else:
+                sent += 1
+                notification.status = 'sent'
+                notification.sent_at = timezone.now()
+                notification.last_error = ''
+    Notification.objects.bulk_update(notifications, [
+        'message', 'status', 'attempts', 'next_attempt_at', 'claim_token', 'claimed_at',
+        'last_error', 'sent_at'])
+    return sent, failed
+
+
+def process_queue(transport=None, batch_size=NOTIFICATION_BATCH_SIZE, max_batches=None):
+    """
+    Envia notificações pendentes em lotes até esvaziar a fila (ou até
+    ``max_batches`` lotes).
+
+    Returns:
+        tuple: total de notificações enviadas e de falhas.
+    """
+    transport = transport or get_transport()
+    release_stale_claims()
+    sent = failed = batches = 0
+    while max_batches is None or batches < max_batches:
+        notifications = claim_batch(batch_size)
+        if not notifications:
+            break
+        batch_sent, batch_failed = deliver_batch(notifications, transport)
+        sent += batch_sent
+        failed += batch_failed
+        batches += 1
+    return sent, failed
@@ -0,0 +1,126 @@
+"""
+Agendador de lembretes ("seu horário é amanhã").
+
+A cada execução, o agendador procura os agendamentos marcados que entraram
+na janela de lembrete desde a execução anterior: os que começam depois da
+marca d'água (``SchedulerWatermark``) e até ``agora + REMINDER_LEAD``. A
+busca é uma varredura de intervalo no índice ``(status, date, time)``,
+limitada à janela, e os lembretes são criados com um único ``bulk_create``.
+
+O lembrete guarda no payload a data e o horário a que se refere, e a
+restrição ``unique_appointment_reminder`` garante um lembrete por horário
+do agendamento; com ``ignore_conflicts``, execuções sobrepostas (ou
+repetidas depois de uma falha) não duplicam nada. Agendamentos marcados já
+dentro da janela recebem apenas a confirmação, não um lembrete.
+
+Um agendamento remarcado recebe um lembrete do novo horário: pela varredura,
+quando o novo horário está adiante da marca d'água, ou logo na remarcação
+(``remind_rescheduled``), quando a marca d'água já passou por ele. O
+lembrete do horário antigo que ainda não saiu é descartado no envio.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Appointment, Notification, SchedulerWatermark
+
+WATERMARK_NAME = 'appointment_reminders'
+
+
+def get_reminder_lead():
+    return timedelta(hours=getattr(settings, 'NOTIFICATION_REMINDER_LEAD_HOURS', 24))
+
+
+def _starts_after(moment):
+    return Q(date__gt=moment.date()) | Q(date=moment.date(), time__gt=moment.time())
+
+
+def _starts_until(moment):
+    return Q(date__lt=moment.date()) | Q(date=moment.date(), time__lte=moment.time())
+
+
+def entering_window(start, end):
+    """
+    Agendamentos marcados que começam no intervalo ``(start, end]``.
+
+    ``start`` e ``end`` são datetimes com fuso; as datas e horários dos
+    agendamentos estão no fuso local.
+    """
+    start, end = timezone.localtime(start), timezone.localtime(end)
+    return Appointment.objects.filter(
+        _starts_after(start), _starts_until(end),
+        status='scheduled', date__range=(start.date(), end.date()))
+
+
+def build_reminder(appointment_id, client_id, date, time):
+    """Lembrete pendente do agendamento no horário ``date`` e ``time`` (não gravado)."""
+    return Notification(
+        client_id=client_id, appointment_id=appointment_id, type='appointment_reminder',
+        payload={'date': date.isoformat(), 'time': time.isoformat()})
+
+
+def is_stale_reminder(notification):
+    """Indica se o lembrete é de um horário que o agendamento não tem mais."""
+    appointment = notification.appointment
+    slot = (notification.payload.get('date'), notification.payload.get('time'))
+    # Lembretes gravados antes de o payload guardar o horário valem para o atual
+    if slot == (None, None):
+        return False
+    return slot != (appointment.date.isoformat(), appointment.time.isoformat())
+
+
+def schedule_reminders(now=None, lead=None):
+    """
+    Cria os lembretes dos agendamentos que entraram na janela desde a última
+    execução e avança a marca d'água.
+
+    Returns:
+        int: quantidade de agendamentos encontrados na janela (inclui os que
+        já tinham lembrete, em execuções sobrepostas).
+    """
+    now = now or timezone.now()
+    horizon = now + (lead or get_reminder_lead())
+    watermark, _ = SchedulerWatermark.objects.get_or_create(
+        name=WATERMARK_NAME, defaults={'value': now})
+    # Agendamentos que já começaram não recebem lembrete, mesmo depois de uma pausa longa
+    start = max(watermark.value, now)
+    if horizon <= start:
+        return 0
+
+    reminders = [
+        build_reminder(*row) for row in entering_window(start, horizon).values_list(
+            'id', 'client_id', 'date', 'time')
+    ]
+    Notification.objects.bulk_create(reminders, ignore_conflicts=True)
+    # Só avança: uma execução mais lenta não recua a marca de outra mais recente
+    SchedulerWatermark.objects.filter(name=WATERMARK_NAME, value__lt=horizon).update(
+        value=horizon, updated_at=now)
+    return len(reminders)
+
+
+def remind_rescheduled(appointment, now=None):
+    """
+    Enfileira, depois do commit, o lembrete do novo horário de um agendamento
+    remarcado para dentro de uma janela pela qual a marca d'água já passou
+    (e que a varredura, portanto, não vai rever).
+
+    Returns:
+        bool: se um lembrete foi enfileirado.
+    """
+    using = appointment._state.db
+    now = now or timezone.now()
+    watermark = SchedulerWatermark.objects.using(using).filter(
+        name=WATERMARK_NAME).values_list('value', flat=True).first()
+    if watermark is None or appointment.status != 'scheduled':
+        return False
+    start = timezone.make_aware(datetime.combine(appointment.date, appointment.time))
+    if not now < start <= watermark:
+        return False
+    reminder = build_reminder(appointment.pk, appointment.client_id, appointment.date, appointment.time)
+    transaction.on_commit(
+        lambda: Notification.objects.using(using).bulk_create([reminder], ignore_conflicts=True),
+        using=using)
+    return True
@@ -0,0 +1,83 @@
+"""
+Reserva atômica de horários.
+
+A verificação de disponibilidade e a gravação do agendamento acontecem na
+mesma transação. Em bancos com ``SELECT ... FOR UPDATE`` a linha do
+funcionário é bloqueada para serializar reservas concorrentes; no SQLite a
+própria transação serializa as escritas e a transação perdedora é repetida.
+A restrição ``unique_active_appointment_slot`` garante, no banco, que dois
+agendamentos ativos nunca comecem no mesmo horário de um funcionário.
+
+A restrição cobre apenas horários de início idênticos: agendamentos que se
+sobrepõem com inícios diferentes só são barrados pela verificação dentro da
+transação. No SQLite, essa garantia depende de a transação começar com
+``BEGIN IMMEDIATE`` (modo de produção, veja ``setup/database.py``), que
+obtém o bloqueio de escrita antes da verificação; com transações
+``DEFERRED``, duas reservas podem verificar o mesmo intervalo antes de
+qualquer uma gravar.
+"""
+import random
+import time as _time
+from datetime import timedelta
+
+from django.db import IntegrityError, OperationalError, router, transaction
+
+from barbershop_management.models import Employee
+from .availability import is_interval_free
+from .models import Appointment
+
+# Tentativas quando o banco está bloqueado por outra reserva em andamento
+RESERVATION_ATTEMPTS = 10
+RESERVATION_BACKOFF = 0.005
+
+
+SLOT_CONSTRAINT = 'unique_active_appointment_slot'
+
+
+class SlotUnavailable(Exception):
+    """O horário solicitado conflita com outro agendamento ativo."""
+
+
+def _violates_slot_constraint(error):
+    """Indica se ``error`` foi causado pela restrição de horário único."""
+    message = str(error)
+    # O PostgreSQL cita o nome da restrição; o SQLite, as colunas
+    table = Appointment._meta.db_table
+    columns = ', '.join(f'{table}.{column}' for column in ('employee_id', 'date', 'time'))
+    return SLOT_CONSTRAINT in message or message == f'UNIQUE constraint failed: {columns}'
+
+
+def reserve_appointment(appointment):
+    """
+    Grava ``appointment`` se o intervalo do serviço estiver livre.
+
+    Raises:
+        SlotUnavailable: se o horário já estiver ocupado, inclusive quando a
+            disputa é decidida pela restrição de unicidade do banco.
+        IntegrityError: para as demais violações de integridade (chaves
+            estrangeiras, campos obrigatórios).
+    """
+    duration = timedelta(minutes=appointment.service.duration)
+    # O banco da barbearia, quando os dados estão em um shard
+    using = router.db_for_write(type(appointment), instance=appointment)
+    for attempt in range(RESERVATION_ATTEMPTS):
+        try:
+            with transaction.atomic(using=using):
+                # Serializa as reservas do mesmo funcionário (ignorado no SQLite)
+                list(Employee.objects.select_for_update()
+                     .filter(pk=appointment.employee_id).values_list('pk', flat=True))
+                if not is_interval_free(appointment.employee_id, appointment.date,
+                                        appointment.time, duration, exclude_id=appointment.pk):
+                    raise SlotUnavailable()
+                appointment.save()
+            return appointment
+        except IntegrityError as error:
+            if not _violates_slot_constraint(error):
+                raise
+            raise SlotUnavailable() from error
+        except OperationalError:
+            # "database is locked": outra reserva venceu a disputa pela escrita
+            if attempt == RESERVATION_ATTEMPTS - 1:
+                raise
+            # Espera exponencial com variação aleatória para espalhar as novas tentativas
+            _time.sleep(RESERVATION_BACKOFF * 2 ** attempt * (0.5 + random.random()))
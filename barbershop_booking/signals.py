@@ -0,0 +1,99 @@
+"""
+Sinais que mantêm o cache de disponibilidade consistente.
+
+Alterações em agendamentos invalidam apenas o dia do funcionário afetado
+(e o dia original, no caso de remarcação). Alterações no horário de
+funcionamento, nos dias de funcionamento, nos funcionários, nos serviços ou
+na própria barbearia invalidam toda a disponibilidade da barbearia e a
+página de apresentação em cache; alterações nos dias da semana invalidam as
+de todas as barbearias.
+Salvar ou excluir uma barbearia também a remove do cache de resolução de
+tenants.
+
+Criar, remarcar ou cancelar um agendamento enfileira a notificação do
+cliente (``notifications.py``); o envio é feito fora da requisição.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from barbershop_management.models import Barbershop, DayOfWeek, Employee, Service, WorkingHours
+from .cache import invalidate_barbershop, invalidate_day, invalidate_presentation
+from .tenancy import barbershop_cache
+from .models import Appointment
+from .notifications import notify_appointments
+from .reminders import remind_rescheduled
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def invalidate_appointment_day(sender, instance, **kwargs):
+    invalidate_day(instance.barbershop_id, instance.employee_id, instance.date)
+
+    loaded = getattr(instance, '_loaded_values', None)
+    if loaded and all(field in loaded for field in ('barbershop_id', 'employee_id', 'date')):
+        original = (loaded['barbershop_id'], loaded['employee_id'], loaded['date'])
+        if original != (instance.barbershop_id, instance.employee_id, instance.date):
+            invalidate_day(*original)
+
+
+@receiver(post_save, sender=Appointment)
+def enqueue_appointment_notification(sender, instance, created, **kwargs):
+    if created:
+        if instance.status != 'cancelled':
+            notify_appointments([instance], 'appointment_confirmation')
+        return
+    loaded = getattr(instance, '_loaded_values', None)
+    if not loaded or 'status' not in loaded:
+        return
+    if instance.status == 'cancelled':
+        if loaded['status'] != 'cancelled':
+            notify_appointments([instance], 'appointment_cancellation')
+    elif instance.status == 'scheduled' and (loaded.get('date'), loaded.get('time')) != (
+            instance.date, instance.time):
+        notify_appointments([instance], 'appointment_reschedule',
+                            previous_date=loaded.get('date'), previous_time=loaded.get('time'))
+        remind_rescheduled(instance)
+
+
+@receiver(post_save, sender=WorkingHours)
+@receiver(post_delete, sender=WorkingHours)
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+def invalidate_related_barbershop(sender, instance, **kwargs):
+    invalidate_barbershop(instance.barbershop_id)
+    invalidate_presentation(instance.barbershop_id)
+
+
+@receiver(post_save, sender=Barbershop)
+def invalidate_saved_barbershop(sender, instance, **kwargs):
+    invalidate_barbershop(instance.pk)
+    invalidate_presentation(instance.pk)
+
+
+@receiver(post_save, sender=Barbershop)
+@receiver(post_delete, sender=Barbershop)
+def invalidate_resolved_barbershop(sender, instance, **kwargs):
+    barbershop_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=DayOfWeek)
+@receiver(post_delete, sender=DayOfWeek)
+def invalidate_all_barbershops(sender, instance, **kwargs):
+    invalidate_barbershop()
+    invalidate_presentation()
+
+
+@receiver(m2m_changed, sender=Barbershop.working_days.through)
+def invalidate_working_days(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse and not pk_set:
+        # post_clear a partir de DayOfWeek: pk_set não é informado
+        invalidate_barbershop()
+        invalidate_presentation()
+        return
+    for barbershop_id in pk_set if reverse else [instance.pk]:
+        invalidate_barbershop(barbershop_id)
+        invalidate_presentation(barbershop_id)
@@ -0,0 +1,188 @@
+"""
+Resolução da barbearia (tenant) a partir do identificador das URLs públicas.
+
+O identificador pode ser o ``code`` (UUID) ou o ``slug`` da barbearia; links
+antigos que usam o nome continuam funcionando porque o nome é normalizado
+com ``slugify`` e o slug é regenerado quando a barbearia é renomeada. Os
+slugs anteriores ficam em ``BarbershopSlug``, e ``barbershop_view``
+redireciona as requisições GET feitas com eles para a URL com o slug atual.
+Os campos consultados são únicos e indexados, então a consulta nunca varre a
+tabela. O resultado fica em um cache LRU limitado, por processo, invalidado
+quando a barbearia é salva ou excluída.
+
+Com sharding, ``barbershop_view`` também ativa o shard da barbearia para o
+restante da requisição (veja ``barbershop_management/sharding.py``).
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.http import Http404, HttpResponsePermanentRedirect
+from django.urls import reverse
+from django.utils.text import slugify
+
+from barbershop_management.models import Barbershop
+from barbershop_management.sharding import activate_shard, ashard_for, shard_for
+
+DEFAULT_CACHE_SIZE = 1024
+
+
+class BarbershopLRUCache:
+    """
+    Cache LRU limitado de identificador -> barbearia.
+
+    Guarda apenas os valores dos campos e cria uma instância nova a cada
+    leitura, para que requisições concorrentes não compartilhem o mesmo objeto.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, identifier):
+        with self._lock:
+            entry = self._entries.get(identifier)
+            if entry is None:
+                return None
+            self._entries.move_to_end(identifier)
+        db, field_names, values = entry
+        return Barbershop.from_db(db, field_names, values)
+
+    def set(self, identifier, barbershop):
+        field_names = [field.attname for field in Barbershop._meta.concrete_fields]
+        values = [getattr(barbershop, name) for name in field_names]
+        with self._lock:
+            self._entries[identifier] = (barbershop._state.db, field_names, values)
+            self._entries.move_to_end(identifier)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, barbershop_id):
+        with self._lock:
+            stale = [
+                identifier for identifier, (_, field_names, values) in self._entries.items()
+                if values[field_names.index('id')] == barbershop_id
+            ]
+            for identifier in stale:
+                del self._entries[identifier]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+barbershop_cache = BarbershopLRUCache(
+    getattr(settings, 'BARBERSHOP_RESOLVER_CACHE_SIZE', DEFAULT_CACHE_SIZE))
+
+
+def _is_code(identifier):
+    try:
+        uuid.UUID(identifier)
+    except ValueError:
+        return False
+    return True
+
+
+def lookup_queries(identifier):
+    """Consultas tentadas em ordem: pelo ``code``, ou pelo slug atual e pelos anteriores."""
+    if _is_code(identifier):
+        return [Barbershop.objects.filter(code=uuid.UUID(identifier))]
+    slug = slugify(identifier)
+    return [Barbershop.objects.filter(slug=slug), Barbershop.objects.filter(old_slugs__slug=slug)]
+
+
+def _lookup(identifier):
+    for queryset in lookup_queries(identifier):
+        barbershop = queryset.first()
+        if barbershop is not None:
+            return barbershop
+    return None
+
+
+async def _alookup(identifier):
+    for queryset in lookup_queries(identifier):
+        barbershop = await queryset.afirst()
+        if barbershop is not None:
+            return barbershop
+    return None
+
+
+def resolve_barbershop(identifier):
+    """
+    Retorna a barbearia identificada por ``code``, ``slug`` (atual ou
+    anterior) ou nome.
+
+    Raises:
+        Http404: se nenhuma barbearia corresponder ao identificador.
+    """
+    barbershop = barbershop_cache.get(identifier)
+    if barbershop is None:
+        barbershop = _lookup(identifier)
+        if barbershop is None:
+            raise Http404('Barbearia não encontrada.')
+        barbershop_cache.set(identifier, barbershop)
+    return barbershop
+
+
+async def aresolve_barbershop(identifier):
+    """Versão assíncrona de ``resolve_barbershop``, para views ``async``."""
+    barbershop = barbershop_cache.get(identifier)
+    if barbershop is None:
+        barbershop = await _alookup(identifier)
+        if barbershop is None:
+            raise Http404('Barbearia não encontrada.')
+        barbershop_cache.set(identifier, barbershop)
+    return barbershop
+
+
+def _renamed_redirect(request, barbershop_name, barbershop):
+    """
+    Redirecionamento permanente para a URL com o slug atual, quando uma
+    requisição GET usa um slug (ou nome) de antes de a barbearia ser renomeada.
+    """
+    if request.method not in ('GET', 'HEAD') or _is_code(barbershop_name):
+        return None
+    if slugify(barbershop_name) == barbershop.slug:
+        return None
+    match = request.resolver_match
+    url = reverse(match.view_name, args=match.args,
+                  kwargs={**match.kwargs, 'barbershop_name': barbershop.slug})
+    if request.META.get('QUERY_STRING'):
+        url = f"{url}?{request.META['QUERY_STRING']}"
+    return HttpResponsePermanentRedirect(url)
+
+
+def barbershop_view(view):
+    """
+    Resolve ``barbershop_name`` da URL uma única vez, anexa a barbearia em
+    ``request.barbershop`` e ativa o shard dela. Requisições GET com o slug
+    anterior de uma barbearia renomeada são redirecionadas para o atual.
+    Aceita views síncronas e ``async``.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, barbershop_name, *args, **kwargs):
+            request.barbershop = await aresolve_barbershop(barbershop_name)
+            redirect = _renamed_redirect(request, barbershop_name, request.barbershop)
+            if redirect is not None:
+                return redirect
+            activate_shard(await ashard_for(request.barbershop.pk))
+            return await view(request, barbershop_name, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, barbershop_name, *args, **kwargs):
+        request.barbershop = resolve_barbershop(barbershop_name)
+        redirect = _renamed_redirect(request, barbershop_name, request.barbershop)
+        if redirect is not None:
+            return redirect
+        activate_shard(shard_for(request.barbershop.pk))
+        return view(request, barbershop_name, *args, **kwargs)
+    return wrapper
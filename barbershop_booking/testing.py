@@ -0,0 +1,78 @@
+"""
+Dados de teste comuns às suítes de agendamento e de gestão.
+
+As funções ``create_*`` criam cada objeto com os valores usados em todas as
+suítes; os campos informados substituem os padrões. ``BarbershopFixturesMixin``
+monta a barbearia de teste completa em ``setUp`` e marca agendamentos com
+``book()``.
+"""
+from datetime import date, time
+
+from django.contrib.auth.models import User
+
+from barbershop_management.models import Barbershop, DayOfWeek, Employee, Service, WorkingHours
+from .models import Appointment, Client
+
+PASSWORD = '12345'
+
+
+def create_owner(username='owner'):
+    return User.objects.create_user(username=username, password=PASSWORD)
+
+
+def create_barbershop(owner, name='Test Barbershop', **fields):
+    fields = {
+        'address': '123 Test St', 'phone': '1234567890', 'email': 'shop@example.com', **fields,
+    }
+    return Barbershop.objects.create(name=name, owner=owner, **fields)
+
+
+def create_days_of_week():
+    """Cria os sete dias da semana: ``{número do dia: DayOfWeek}``."""
+    return {
+        day: DayOfWeek.objects.create(day=day, name=name) for day, name in DayOfWeek.DAYS_OF_WEEK
+    }
+
+
+def open_on(barbershop, day_of_week, start_time=time(8, 0), end_time=time(20, 0)):
+    """Abre a barbearia no dia da semana, com o horário de funcionamento informado."""
+    barbershop.working_days.add(day_of_week)
+    return WorkingHours.objects.create(
+        barbershop=barbershop, day_of_week=day_of_week, start_time=start_time, end_time=end_time)
+
+
+def create_employee(barbershop, name='John Doe', phone='+5511999999999', **fields):
+    fields = {'role': 'barber', 'hire_date': date(2024, 1, 1), **fields}
+    return Employee.objects.create(name=name, phone=phone, barbershop=barbershop, **fields)
+
+
+def create_service(barbershop, name='Haircut', price=20, duration=30, **fields):
+    fields = {'description': 'Corte', **fields}
+    return Service.objects.create(
+        barbershop=barbershop, name=name, price=price, duration=duration, **fields)
+
+
+def create_client(barbershop, name='Client', phone='11988887777'):
+    return Client.objects.create(name=name, phone=phone, barbershop=barbershop)
+
+
+class BarbershopFixturesMixin:
+    """
+    ``set_up_barbershop()`` cria ``user``, ``barbershop``, ``employee``,
+    ``service`` e ``client_profile``; ``book()`` marca agendamentos com eles.
+    """
+
+    def set_up_barbershop(self, client_name='Client', **service_fields):
+        self.user = create_owner()
+        self.barbershop = create_barbershop(self.user)
+        self.employee = create_employee(self.barbershop)
+        self.service = create_service(self.barbershop, **service_fields)
+        self.client_profile = create_client(self.barbershop, client_name)
+
+    def book(self, day, at=time(10, 0), **fields):
+        """Agendamento em ``day`` às ``at``; ``fields`` substitui os valores de teste."""
+        fields = {
+            'client': self.client_profile, 'employee': self.employee, 'service': self.service,
+            'barbershop': self.barbershop, **fields,
+        }
+        return Appointment.objects.create(date=day, time=at, **fields)
@@ -0,0 +1,124 @@
+import io
+import json
+from datetime import date, time
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+from django.urls import resolve, reverse
+
+from barbershop_booking import async_views
+from barbershop_booking.tenancy import barbershop_cache
+from barbershop_booking.testing import (BarbershopFixturesMixin, create_days_of_week,
+                                        create_employee, open_on)
+from barbershop_management.models import Barbershop, DayOfWeek
+from setup.middleware import AsgiUrlconfMiddleware
+
+
+class AsyncViewsTestCase(BarbershopFixturesMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        barbershop_cache.clear()
+        self.set_up_barbershop(duration=60)
+        create_days_of_week()
+        open_on(self.barbershop, DayOfWeek.objects.get(day=0), end_time=time(12, 0))
+        create_employee(self.barbershop, 'Jane Roe', '+5511988888888')
+        for at in (time(9, 0), time(10, 30)):
+            self.book(date(2024, 9, 2), at)
+        self.book(date(2024, 9, 3), time(9, 0))
+
+    async def _asgi_get(self, url, data, headers):
+        response = await self.async_client.get(url, data, headers=headers)
+        if response.streaming:
+            response.body = b''.join([chunk async for chunk in response.streaming_content])
+        else:
+            response.body = response.content
+        return response
+
+    def compare(self, url, **data):
+        """Retorna as respostas síncrona e async de ``url``, com o cache limpo antes de cada uma."""
+        response = self.client.get(url, data)
+        sync_body = b''.join(response.streaming_content) if response.streaming else response.content
+        cache.clear()
+        asgi_response = async_to_sync(self._asgi_get)(url, data, {})
+        self.assertEqual(asgi_response.status_code, response.status_code)
+        self.assertEqual(json.loads(asgi_response.body), json.loads(sync_body))
+        return asgi_response
+
+    def test_asgi_routes_use_async_views(self):
+        url = reverse('barbershop_booking:get_available_slots', kwargs={
+            'barbershop_name': self.barbershop.name, 'employee_id': self.employee.id,
+            'date': '2024-09-02'})
+        self.assertIs(resolve(url, urlconf='setup.asgi_urls').func, async_views.get_available_slots)
+        self.assertIsNot(resolve(url).func, async_views.get_available_slots)
+        # Rotas sem versão async continuam as mesmas
+        presentation = reverse('barbershop_booking:barbershop_presentation',
+                               args=[self.barbershop.name])
+        self.assertIs(resolve(presentation, urlconf='setup.asgi_urls').func, resolve(presentation).func)
+
+    def test_asgi_requests_select_asgi_urls(self):
+        middleware = AsgiUrlconfMiddleware(lambda request: request)
+        self.assertEqual(middleware(AsyncRequestFactory().get('/')).urlconf, 'setup.asgi_urls')
+        self.assertFalse(hasattr(middleware(RequestFactory().get('/')), 'urlconf'))
+        with override_settings(ASGI_URLCONF=None):
+            self.assertFalse(hasattr(middleware(AsyncRequestFactory().get('/')), 'urlconf'))
+
+    def test_slots_match_sync_views(self):
+        for day in ('2024-09-02', '2024-09-08'):
+            url = reverse('barbershop_booking:get_available_slots', kwargs={
+                'barbershop_name': self.barbershop.name, 'employee_id': self.employee.id,
+                'date': day})
+            self.compare(url)
+            self.compare(url, service=self.service.id)
+        response = self.compare(url.replace('2024-09-08', '2024-09-02'))
+        self.assertEqual(json.loads(response.body)['available_slots'],
+                         ['08:00', '08:30', '10:00', '11:30'])
+
+        url = reverse('barbershop_booking:any_employee_slots', kwargs={
+            'barbershop_name': self.barbershop.name, 'date': '2024-09-02'})
+        self.compare(url, service=self.service.id)
+        self.compare(url.replace('2024-09-02', 'amanha'))
+
+        url = reverse('barbershop_booking:availability_calendar', kwargs={
+            'barbershop_name': self.barbershop.name, 'employee_id': self.employee.id})
+        self.compare(url, start='2024-09-01', end='2024-09-10', service=self.service.id)
+        self.compare(url, start='2024-09-10', end='2024-09-01')
+
+    def test_invalid_slot_parameters_are_client_errors(self):
+        url = reverse('barbershop_booking:get_available_slots', kwargs={
+            'barbershop_name': self.barbershop.slug, 'employee_id': self.employee.id,
+            'date': '2024-09-02'})
+        get = async_to_sync(self.async_client.get)
+        self.assertEqual(get(url.replace('2024-09-02', '2024-13-45')).status_code, 400)
+        self.assertEqual(get(url, {'service': 999}).status_code, 404)
+        self.assertEqual(get(url.replace(f'/{self.employee.id}/', '/999/')).status_code, 404)
+
+    def test_unknown_barbershop_is_404(self):
+        url = reverse('barbershop_booking:any_employee_slots', kwargs={
+            'barbershop_name': 'inexistente', 'date': '2024-09-02'})
+        response = async_to_sync(self.async_client.get)(url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_employee_schedule_streams_pages_and_etag(self):
+        url = reverse('barbershop_booking:employee_schedule', kwargs={
+            'barbershop_name': self.barbershop.slug, 'employee_id': self.employee.id})
+        response = self.compare(url, start='2024-09-01', end='2024-09-30', limit=2)
+        page = json.loads(response.body)
+        self.assertEqual(len(page['appointments']), 2)
+        self.compare(url, start='2024-09-01', end='2024-09-30', limit=2, after=page['next'])
+        self.compare(url, start='2024-09-30', end='2024-09-01')
+
+        self.assertEqual(response['ETag'], self.client.get(
+            url, {'start': '2024-09-01', 'end': '2024-09-30', 'limit': 2})['ETag'])
+        not_modified = async_to_sync(self._asgi_get)(
+            url, {'start': '2024-09-01', 'end': '2024-09-30', 'limit': 2},
+            {'If-None-Match': response['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_benchmark_command(self):
+        out = io.StringIO()
+        call_command('benchmark_async_views', clients=3, rounds=1, employees=2, days=2, stdout=out)
+        self.assertIn('Views síncronas: 12 requisições', out.getvalue())
+        self.assertIn('Views async: 12 requisições', out.getvalue())
+        self.assertFalse(Barbershop.objects.filter(name__startswith='Benchmark').exists())
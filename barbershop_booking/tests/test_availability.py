@@ -0,0 +1,158 @@
+from datetime import date, datetime, time, timedelta
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from barbershop_booking.availability import Interval, compute_free_slots
+from barbershop_booking.tenancy import barbershop_cache
+from barbershop_booking.testing import (BarbershopFixturesMixin, create_days_of_week,
+                                        create_employee, create_service, open_on)
+from barbershop_management.models import DayOfWeek
+
+
+class AvailabilityTestCase(BarbershopFixturesMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        barbershop_cache.clear()
+        self.set_up_barbershop()
+        create_days_of_week()
+        # Segunda-feira aberta, domingo fechado
+        self.monday = DayOfWeek.objects.get(day=0)
+        open_on(self.barbershop, self.monday)
+        self.date = date(2024, 9, 2)  # segunda-feira
+
+    def book(self, at, **kwargs):
+        return super().book(self.date, at, **kwargs)
+
+    def slots_url(self, day=None):
+        return reverse('barbershop_booking:get_available_slots', kwargs={
+            'barbershop_name': self.barbershop.name,
+            'employee_id': self.employee.id,
+            'date': (day or self.date).isoformat(),
+        })
+
+    def test_booked_slots_are_excluded(self):
+        self.book(time(9, 0))
+        self.book(time(14, 30))
+        response = self.client.get(self.slots_url())
+        self.assertEqual(response.status_code, 200)
+        slots = response.json()['available_slots']
+        self.assertEqual(len(slots), 24 - 2)
+        self.assertEqual(slots[0], '08:00')
+        self.assertNotIn('09:00', slots)
+        self.assertNotIn('14:30', slots)
+
+    def test_invalid_parameters_are_client_errors(self):
+        response = self.client.get(self.slots_url().replace(self.date.isoformat(), '2024-13-45'))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'Data deve estar no formato AAAA-MM-DD.')
+        self.assertEqual(self.client.get(self.slots_url(), {'service': 999}).status_code, 404)
+        url = self.slots_url().replace(f'/{self.employee.id}/', '/999/')
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_closed_day_returns_message(self):
+        response = self.client.get(self.slots_url(date(2024, 9, 8)))
+        data = response.json()
+        self.assertEqual(data['available_slots'], [])
+        self.assertIn('fechada', data['message'])
+
+    def test_query_count_does_not_depend_on_opening_hours(self):
+        for hour in range(8, 20):
+            self.book(time(hour, 0))
+        with self.assertNumQueries(4):
+            response = self.client.get(self.slots_url())
+        self.assertEqual(len(response.json()['available_slots']), 12)
+
+    def test_service_duration_blocks_following_slots(self):
+        long_service = create_service(
+            self.barbershop, 'Barba e cabelo', price=50, duration=60, description='Completo')
+        self.book(time(10, 0), service=long_service)
+        slots = self.client.get(self.slots_url()).json()['available_slots']
+        self.assertIn('09:30', slots)
+        self.assertNotIn('10:00', slots)
+        self.assertNotIn('10:30', slots)
+        self.assertIn('11:00', slots)
+
+    def test_chosen_service_must_fit_before_closing_and_next_booking(self):
+        long_service = create_service(
+            self.barbershop, 'Barba e cabelo', price=50, duration=60, description='Completo')
+        self.book(time(12, 0))
+        response = self.client.get(self.slots_url(), {'service': long_service.id})
+        slots = response.json()['available_slots']
+        self.assertEqual(slots[-1], '19:00')
+        self.assertNotIn('11:30', slots)
+        self.assertIn('11:00', slots)
+        self.assertIn('12:30', slots)
+
+    def test_cancelled_appointments_do_not_block(self):
+        self.book(time(9, 0), status='cancelled')
+        slots = self.client.get(self.slots_url()).json()['available_slots']
+        self.assertIn('09:00', slots)
+
+    def test_slot_duration_is_configurable_per_barbershop(self):
+        self.barbershop.slot_duration = 15
+        self.barbershop.save()
+        slots = self.client.get(self.slots_url()).json()['available_slots']
+        self.assertEqual(slots[:3], ['08:00', '08:15', '08:30'])
+        self.assertEqual(len(slots), 48)
+
+    def calendar_url(self):
+        return reverse('barbershop_booking:availability_calendar', kwargs={
+            'barbershop_name': self.barbershop.name,
+            'employee_id': self.employee.id,
+        })
+
+    def test_calendar_returns_every_day_of_the_range(self):
+        for hour in range(8, 20):
+            for minutes in (0, 30):
+                self.book(time(hour, minutes))
+        with self.assertNumQueries(4):
+            response = self.client.get(
+                self.calendar_url(), {'start': '2024-09-01', 'end': '2024-09-30'})
+        days = response.json()['days']
+        self.assertEqual(len(days), 30)
+        # Segunda-feira lotada, demais segundas livres, outros dias fechados
+        self.assertEqual(days['2024-09-02']['available_slots'], [])
+        self.assertEqual(len(days['2024-09-09']['available_slots']), 24)
+        self.assertEqual(days['2024-09-03']['available_slots'], [])
+        self.assertIn('fechada', days['2024-09-03']['message'])
+
+    def test_calendar_rejects_invalid_ranges(self):
+        response = self.client.get(
+            self.calendar_url(), {'start': '2024-09-30', 'end': '2024-09-01'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(
+            self.calendar_url(), {'start': '2024-01-01', 'end': '2024-12-31'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_any_employee_matrix_uses_fixed_number_of_queries(self):
+        others = [
+            create_employee(self.barbershop, f'Barber {index}', f'+55119000000{index:02d}')
+            for index in range(10)
+        ]
+        create_employee(self.barbershop, 'Inactive', '+5511900000099', is_active=False)
+        self.book(time(8, 0))
+        self.book(time(8, 0), employee=others[0])
+
+        url = reverse('barbershop_booking:any_employee_slots', kwargs={
+            'barbershop_name': self.barbershop.name, 'date': self.date.isoformat()})
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        data = response.json()
+        self.assertEqual(len(data['employees']), 11)
+        first_slot = data['slots'][0]
+        self.assertEqual(first_slot['time'], '08:00')
+        self.assertEqual(len(first_slot['employees']), 9)
+        self.assertNotIn(self.employee.id, first_slot['employees'])
+        self.assertEqual(len(data['slots'][1]['employees']), 11)
+
+
+class IntervalSweepTestCase(SimpleTestCase):
+    def test_overlapping_busy_intervals_are_merged(self):
+        day = date(2024, 9, 2)
+        at = lambda hour, minute=0: datetime.combine(day, time(hour, minute))
+        opening = Interval(at(9), at(12))
+        busy = [Interval(at(10), at(10, 45)), Interval(at(9, 30), at(10, 15))]
+        slots = compute_free_slots(opening, busy, timedelta(minutes=30))
+        self.assertEqual(slots, [time(9, 0), time(11, 0), time(11, 30)])
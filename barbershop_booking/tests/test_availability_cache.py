@@ -0,0 +1,72 @@
+from datetime import date, time
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from barbershop_booking.cache import get_cache_stats, stats
+from barbershop_booking.tenancy import barbershop_cache
+from barbershop_booking.models import Appointment
+from barbershop_booking.testing import BarbershopFixturesMixin, open_on
+from barbershop_management.models import DayOfWeek, WorkingHours
+
+
+class AvailabilityCacheTestCase(BarbershopFixturesMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        barbershop_cache.clear()
+        stats.reset()
+        self.set_up_barbershop()
+        open_on(self.barbershop, DayOfWeek.objects.create(day=0, name='Segunda-feira'))
+        self.date = date(2024, 9, 2)
+        self.url = reverse('barbershop_booking:get_available_slots', kwargs={
+            'barbershop_name': self.barbershop.name,
+            'employee_id': self.employee.id,
+            'date': self.date.isoformat(),
+        })
+
+    def slots(self):
+        return self.client.get(self.url).json()['available_slots']
+
+    def test_repeated_requests_are_served_from_cache(self):
+        self.slots()
+        # Barbearia e disponibilidade em cache: nenhuma consulta ao banco
+        with self.assertNumQueries(0):
+            self.slots()
+        self.assertEqual(get_cache_stats()['hits'], 1)
+        self.assertEqual(get_cache_stats()['misses'], 1)
+
+    def test_appointment_changes_invalidate_the_day(self):
+        self.assertIn('09:00', self.slots())
+        appointment = self.book(self.date, time(9, 0))
+        self.assertNotIn('09:00', self.slots())
+
+        # Remarcação para outro dia libera o horário original
+        appointment = Appointment.objects.get(pk=appointment.pk)
+        appointment.date = date(2024, 9, 9)
+        appointment.save()
+        self.assertIn('09:00', self.slots())
+
+        self.book(self.date, time(10, 0)).delete()
+        self.assertIn('10:00', self.slots())
+
+    def test_schedule_changes_invalidate_the_barbershop(self):
+        self.assertEqual(self.slots()[0], '08:00')
+        working_hours = WorkingHours.objects.get(barbershop=self.barbershop)
+        working_hours.start_time = time(9, 0)
+        working_hours.save()
+        self.assertEqual(self.slots()[0], '09:00')
+
+        self.barbershop.working_days.remove(DayOfWeek.objects.get(day=0))
+        self.assertEqual(self.slots(), [])
+
+    def test_day_of_week_changes_invalidate_every_barbershop(self):
+        self.assertEqual(self.slots()[0], '08:00')
+        monday = DayOfWeek.objects.get(day=0)
+        monday.day = 1
+        monday.save()
+        self.assertEqual(self.slots(), [])
+
+        monday.delete()
+        self.url = self.url.replace('2024-09-02', '2024-09-03')
+        self.assertEqual(self.slots(), [])
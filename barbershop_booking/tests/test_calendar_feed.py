@@ -0,0 +1,74 @@
+from datetime import time, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from barbershop_booking.calendar_feed import (barbershop_feed_url, employee_feed_url, escape_text,
+                                              fold_line)
+from barbershop_booking.tenancy import barbershop_cache
+from barbershop_booking.testing import BarbershopFixturesMixin, create_employee
+
+
+class CalendarFeedTestCase(BarbershopFixturesMixin, TestCase):
+    def setUp(self):
+        barbershop_cache.clear()
+        self.set_up_barbershop(client_name='Cliente', name='Corte, barba', duration=45)
+        self.other_employee = create_employee(self.barbershop, 'Jane Roe', '+5511988888888')
+        self.day = timezone.localdate() + timedelta(days=1)
+
+    def book(self, employee, at, status='scheduled'):
+        return super().book(self.day, at, employee=employee, status=status)
+
+    def get_feed(self, url, **headers):
+        response = self.client.get(url, **headers)
+        if response.status_code == 200:
+            return response, b''.join(response.streaming_content).decode()
+        return response, None
+
+    def test_employee_feed_streams_only_their_events(self):
+        self.book(self.employee, time(10, 0))
+        self.book(self.employee, time(11, 0), status='cancelled')
+        self.book(self.other_employee, time(10, 0))
+
+        response, body = self.get_feed(employee_feed_url(self.barbershop, self.employee.id))
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertTrue(body.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertEqual(body.count('BEGIN:VEVENT'), 2)
+        self.assertIn('SUMMARY:Corte\\, barba - Cliente\r\n', body)
+        self.assertIn('STATUS:CANCELLED\r\n', body)
+        self.assertIn('DTSTART:{}T130000Z'.format(self.day.strftime('%Y%m%d')), body)
+        self.assertIn('DTEND:{}T134500Z'.format(self.day.strftime('%Y%m%d')), body)
+
+        _, body = self.get_feed(barbershop_feed_url(self.barbershop))
+        self.assertEqual(body.count('BEGIN:VEVENT'), 3)
+
+    def test_invalid_token_is_rejected(self):
+        url = employee_feed_url(self.barbershop, self.employee.id)
+        forged = url.replace(f'/employee/{self.employee.id}/',
+                             f'/employee/{self.other_employee.id}/')
+        self.assertEqual(self.client.get(forged).status_code, 404)
+        self.assertEqual(self.client.get(barbershop_feed_url(self.barbershop)[:-8] + 'x.ics').status_code, 404)
+
+    def test_conditional_get(self):
+        appointment = self.book(self.employee, time(10, 0))
+        url = barbershop_feed_url(self.barbershop)
+        response, _ = self.get_feed(url)
+        etag, last_modified = response['ETag'], response['Last-Modified']
+
+        with self.assertNumQueries(1):
+            response, _ = self.get_feed(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response, _ = self.get_feed(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        appointment.delete()
+        response, body = self.get_feed(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('BEGIN:VEVENT', body)
+
+    def test_text_is_escaped_and_folded(self):
+        self.assertEqual(escape_text('a;b,c\\d\ne'), 'a\\;b\\,c\\\\d\\ne')
+        folded = fold_line('DESCRIPTION:' + 'ç' * 80)
+        lines = folded.split('\r\n')
+        self.assertTrue(all(len(line.encode()) <= 75 for line in lines))
+        self.assertEqual(''.join(line.lstrip(' ') for line in lines), 'DESCRIPTION:' + 'ç' * 80)
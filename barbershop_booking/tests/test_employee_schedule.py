@@ -0,0 +1,86 @@
+import json
+from datetime import date, time
+
+from django.test import TestCase
+from django.urls import reverse
+
+from barbershop_booking.tenancy import barbershop_cache, resolve_barbershop
+from barbershop_booking.testing import BarbershopFixturesMixin, create_barbershop, create_service
+
+
+class EmployeeScheduleTestCase(BarbershopFixturesMixin, TestCase):
+    def setUp(self):
+        barbershop_cache.clear()
+        self.set_up_barbershop(name='Serviço 0')
+        self.services = [self.service] + [
+            create_service(self.barbershop, f'Serviço {index}') for index in range(1, 3)]
+        self.url = reverse('barbershop_booking:employee_schedule', kwargs={
+            'barbershop_name': self.barbershop.slug, 'employee_id': self.employee.id})
+
+    def book(self, day, at, status='scheduled', service_index=0):
+        return super().book(day, at, status=status, service=self.services[service_index])
+
+    def get(self, **params):
+        response = self.client.get(self.url, params)
+        return response, json.loads(b''.join(response.streaming_content))
+
+    def test_window_filters_appointments(self):
+        self.book(date(2024, 8, 31), time(9, 0))
+        self.book(date(2024, 9, 2), time(10, 0), service_index=1)
+        self.book(date(2024, 10, 5), time(9, 0))
+
+        response, data = self.get(start='2024-09-01', end='2024-09-30')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(data, {
+            'start': '2024-09-01', 'end': '2024-09-30', 'next': None,
+            'appointments': [{'date': '02/09/2024', 'time': '10:00', 'service': 'Serviço 1'}],
+        })
+
+    def test_keyset_pagination_walks_every_appointment(self):
+        for hour in range(8, 18):
+            self.book(date(2024, 9, 2), time(hour, 0), service_index=hour % 3)
+        # Mesmo horário, ids diferentes: o cursor desempata pelo id
+        self.book(date(2024, 9, 2), time(12, 0), status='cancelled')
+
+        # A barbearia da URL já está no cache do processo
+        resolve_barbershop(self.barbershop.slug)
+        seen = []
+        params = {'start': '2024-09-01', 'end': '2024-09-30', 'limit': 4}
+        while True:
+            with self.assertNumQueries(2):
+                _, data = self.get(**params)
+            seen.extend(data['appointments'])
+            if data['next'] is None:
+                break
+            params['after'] = data['next']
+        self.assertEqual(len(seen), 11)
+        self.assertEqual([item['time'] for item in seen][4:6], ['12:00', '12:00'])
+
+    def test_unchanged_schedule_returns_not_modified(self):
+        appointment = self.book(date(2024, 9, 2), time(10, 0))
+        params = {'start': '2024-09-01', 'end': '2024-09-30'}
+        etag = self.client.get(self.url, params)['ETag']
+
+        response = self.client.get(self.url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        appointment.status = 'completed'
+        appointment.save()
+        response = self.client.get(self.url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_other_barbershop_employee_is_not_listed(self):
+        self.book(date(2024, 9, 2), time(10, 0))
+        other = create_barbershop(
+            self.user, 'Other Barbershop', address='456 Test St', email='other@example.com')
+        url = reverse('barbershop_booking:employee_schedule', kwargs={
+            'barbershop_name': other.slug, 'employee_id': self.employee.id})
+        response = self.client.get(url, {'start': '2024-09-01', 'end': '2024-09-30'})
+        self.assertEqual(json.loads(b''.join(response.streaming_content))['appointments'], [])
+
+    def test_invalid_parameters_are_rejected(self):
+        for params in ({'start': '02/09/2024'}, {'start': '2024-01-01', 'end': '2025-06-01'},
+                       {'limit': 0}, {'after': 'abc'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400)
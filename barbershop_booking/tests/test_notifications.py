@@ -0,0 +1,123 @@
+import io
+from datetime import date, time, timedelta
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from barbershop_booking.models import Appointment, Notification
+from barbershop_booking.notifications import (CLAIM_TIMEOUT, BaseTransport, EmailTransport,
+                                              claim_batch, process_queue)
+from barbershop_booking.testing import BarbershopFixturesMixin
+
+
+class RecordingTransport(BaseTransport):
+    def __init__(self, fail_times=0):
+        self.fail_times = fail_times
+        self.sent = []
+
+    def send(self, notification):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise ConnectionError('gateway indisponível')
+        self.sent.append(notification.message)
+
+
+class NotificationQueueTestCase(BarbershopFixturesMixin, TestCase):
+    def setUp(self):
+        self.set_up_barbershop(client_name='Ana', name='Corte')
+
+    def book(self, at=time(10, 0)):
+        with self.captureOnCommitCallbacks(execute=True):
+            return super().book(date(2030, 3, 1), at)
+
+    def test_appointment_events_enqueue_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            appointment = Appointment.objects.create(
+                client=self.client_profile, employee=self.employee, service=self.service,
+                barbershop=self.barbershop, date=date(2030, 3, 1), time=time(10, 0))
+        # Nada é gravado antes do commit
+        self.assertFalse(Notification.objects.exists())
+        for callback in callbacks:
+            callback()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment.time = time(11, 0)
+            appointment.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment.status = 'cancelled'
+            appointment.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment.save()
+
+        self.assertEqual(list(Notification.objects.order_by('id').values_list('type', 'status')), [
+            ('appointment_confirmation', 'pending'),
+            ('appointment_reschedule', 'pending'),
+            ('appointment_cancellation', 'pending'),
+        ])
+        self.assertEqual(Notification.objects.get(type='appointment_reschedule').payload,
+                         {'previous_date': '2030-03-01', 'previous_time': '10:00:00'})
+
+        transport = RecordingTransport()
+        process_queue(transport)
+        self.assertIn('de 01/03/2030 às 10:00 foi remarcado para 01/03/2030 às 11:00',
+                      transport.sent[1])
+
+    def test_worker_renders_and_sends_in_batches(self):
+        for hour in range(9, 14):
+            self.book(time(hour, 0))
+        transport = RecordingTransport()
+        self.assertEqual(process_queue(transport, batch_size=2), (5, 0))
+        self.assertEqual(len(transport.sent), 5)
+        self.assertIn('Olá, Ana!', transport.sent[0])
+        self.assertIn('01/03/2030 às 09:00', transport.sent[0])
+        self.assertFalse(Notification.objects.exclude(status='sent').exists())
+        self.assertFalse(Notification.objects.filter(sent_at__isnull=True).exists())
+
+    @override_settings(NOTIFICATION_MAX_ATTEMPTS=2)
+    def test_failures_are_retried_with_backoff(self):
+        self.book()
+        notification = Notification.objects.get()
+
+        self.assertEqual(process_queue(RecordingTransport(fail_times=1)), (0, 1))
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), ('pending', 1))
+        self.assertIn('gateway indisponível', notification.last_error)
+        self.assertGreater(notification.next_attempt_at, timezone.now())
+        # Ainda não chegou a hora da nova tentativa
+        self.assertEqual(process_queue(RecordingTransport()), (0, 0))
+
+        Notification.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(process_queue(RecordingTransport(fail_times=1)), (0, 1))
+        notification.refresh_from_db()
+        self.assertEqual((notification.status, notification.attempts), ('failed', 2))
+
+    def test_claimed_rows_are_not_claimed_twice(self):
+        self.book(time(9, 0))
+        self.book(time(10, 0))
+        first = claim_batch(batch_size=1)
+        second = claim_batch(batch_size=5)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(second), 1)
+        self.assertNotEqual(first[0].pk, second[0].pk)
+        self.assertEqual(claim_batch(), [])
+
+        # Reserva de um worker que parou volta para a fila
+        Notification.objects.filter(pk=first[0].pk).update(
+            claimed_at=timezone.now() - CLAIM_TIMEOUT - timedelta(minutes=1))
+        self.assertEqual(process_queue(RecordingTransport()), (1, 0))
+
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_email_transport_and_command(self):
+        self.book()
+        process_queue(EmailTransport(address='{phone}@sms.example.com'))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['11988887777@sms.example.com'])
+
+        self.book(time(11, 0))
+        out = io.StringIO()
+        call_command('send_notifications',
+                     transport='barbershop_booking.notifications.EmailTransport', stdout=out)
+        self.assertIn('1 notificação(ões) enviada(s)', out.getvalue())
+        self.assertEqual(len(mail.outbox), 2)
@@ -0,0 +1,80 @@
+from datetime import time
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from barbershop_booking.tenancy import barbershop_cache
+from barbershop_booking.testing import (create_barbershop, create_days_of_week, create_employee,
+                                        create_owner, create_service, open_on)
+from barbershop_management.models import DayOfWeek, Employee, WorkingHours
+
+
+class BarbershopPresentationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        barbershop_cache.clear()
+        self.barbershop = create_barbershop(create_owner())
+        for day, day_of_week in create_days_of_week().items():
+            if day < 5:
+                open_on(self.barbershop, day_of_week, time(9, 0), time(19, 0))
+        self.url = reverse('barbershop_booking:barbershop_presentation',
+                           kwargs={'barbershop_name': self.barbershop.slug})
+
+    def add_staff(self, count):
+        start = Employee.objects.count()
+        for index in range(start, start + count):
+            create_employee(self.barbershop, f'Barbeiro {index}', f'+55119999{index:05d}')
+            create_service(self.barbershop, f'Serviço {index}')
+
+    def test_query_count_does_not_depend_on_staff(self):
+        self.add_staff(1)
+        # Barbearia, agenda compilada, serviços e funcionários
+        with self.assertNumQueries(4):
+            self.client.get(self.url)
+
+        cache.clear()
+        barbershop_cache.clear()
+        self.add_staff(10)
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Barbeiro 10')
+        self.assertContains(response, '09:00 - 19:00', count=5)
+
+    def test_cached_page_runs_no_queries(self):
+        self.add_staff(3)
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Serviço 2')
+        self.assertContains(response, '09:00 - 19:00', count=5)
+        # O formulário de telefone fica fora do fragmento em cache
+        self.assertContains(response, 'csrfmiddlewaretoken')
+
+    def test_changes_invalidate_cached_page(self):
+        self.add_staff(1)
+        self.client.get(self.url)
+
+        create_service(self.barbershop, 'Barba', price=15, duration=20, description='Barba')
+        self.assertContains(self.client.get(self.url), 'Barba')
+
+        Employee.objects.filter(barbershop=self.barbershop).update(name='Ignorado')
+        Employee.objects.get(barbershop=self.barbershop).save()
+        self.assertContains(self.client.get(self.url), 'Ignorado')
+
+        WorkingHours.objects.filter(barbershop=self.barbershop).update(end_time=time(20, 0))
+        WorkingHours.objects.filter(barbershop=self.barbershop).first().save()
+        self.assertContains(self.client.get(self.url), '09:00 - 20:00')
+
+        self.barbershop.description = 'Desde 1990'
+        self.barbershop.save()
+        self.assertContains(self.client.get(self.url), 'Desde 1990')
+
+    def test_day_of_week_changes_invalidate_cached_page(self):
+        self.assertContains(self.client.get(self.url), 'Segunda-feira')
+        # Abre espaço para o domingo (update não envia sinais)
+        DayOfWeek.objects.filter(day=6).update(day=7)
+        monday = DayOfWeek.objects.get(day=0)
+        monday.day = 6
+        monday.save()
+        self.assertNotContains(self.client.get(self.url), 'Segunda-feira')
@@ -0,0 +1,115 @@
+import io
+from datetime import date, datetime, time, timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from barbershop_booking.models import Notification, SchedulerWatermark
+from barbershop_booking.notifications import BaseTransport, process_queue
+from barbershop_booking.reminders import WATERMARK_NAME, entering_window, schedule_reminders
+from barbershop_booking.testing import BarbershopFixturesMixin
+
+
+class RecordingTransport(BaseTransport):
+    def __init__(self):
+        self.sent = []
+
+    def send(self, notification):
+        self.sent.append(notification.message)
+
+
+class ReminderSchedulerTestCase(BarbershopFixturesMixin, TestCase):
+    def setUp(self):
+        self.set_up_barbershop(client_name='Ana', name='Corte')
+        self.now = timezone.make_aware(datetime(2030, 3, 1, 23, 50))
+
+    def reminded(self):
+        return set(Notification.objects.filter(type='appointment_reminder')
+                   .values_list('appointment__date', 'appointment__time'))
+
+    def test_window_crosses_midnight(self):
+        self.book(date(2030, 3, 1), time(23, 0))   # já começou
+        self.book(date(2030, 3, 2), time(9, 0))
+        self.book(date(2030, 3, 2), time(23, 50))  # exatamente no limite
+        self.book(date(2030, 3, 2), time(23, 55))  # fora da janela
+        self.book(date(2030, 3, 2), time(10, 0), status='cancelled')
+
+        self.assertEqual(schedule_reminders(self.now), 2)
+        self.assertEqual(self.reminded(), {
+            (date(2030, 3, 2), time(9, 0)), (date(2030, 3, 2), time(23, 50))})
+
+    def test_runs_advance_the_watermark_without_duplicates(self):
+        schedule_reminders(self.now)
+        self.book(date(2030, 3, 2), time(23, 55))
+        self.book(date(2030, 3, 3), time(0, 10))
+
+        self.assertEqual(schedule_reminders(self.now + timedelta(minutes=10)), 1)
+        self.assertEqual(schedule_reminders(self.now + timedelta(minutes=10)), 0)
+        self.assertEqual(
+            SchedulerWatermark.objects.get(name=WATERMARK_NAME).value,
+            self.now + timedelta(hours=24, minutes=10))
+
+        # Uma execução sobreposta que relê a mesma janela não duplica os lembretes
+        SchedulerWatermark.objects.filter(name=WATERMARK_NAME).update(value=self.now)
+        with self.assertNumQueries(4):
+            self.assertEqual(schedule_reminders(self.now + timedelta(minutes=30)), 2)
+        self.assertEqual(Notification.objects.filter(type='appointment_reminder').count(), 2)
+
+    def test_window_query_uses_the_status_slot_index(self):
+        plan = entering_window(self.now, self.now + timedelta(hours=24)).explain()
+        self.assertIn('appointment_status_slot_idx', plan)
+
+    def test_cancelled_after_scheduling_is_skipped(self):
+        appointment = self.book(date(2030, 3, 2), time(9, 0))
+        schedule_reminders(self.now)
+        appointment.status = 'cancelled'
+        appointment.save()
+
+        transport = RecordingTransport()
+        process_queue(transport)
+        self.assertEqual(transport.sent, [])
+        self.assertEqual(Notification.objects.get(type='appointment_reminder').status, 'skipped')
+
+    def reminder_slots(self):
+        return sorted((reminder.payload['date'], reminder.payload['time'], reminder.status)
+                      for reminder in Notification.objects.filter(type='appointment_reminder'))
+
+    def test_rescheduled_ahead_of_watermark_is_reminded_again(self):
+        appointment = self.book(date(2030, 3, 2), time(9, 0))
+        schedule_reminders(self.now)
+        appointment.date, appointment.time = date(2030, 3, 3), time(10, 0)
+        appointment.save()
+
+        self.assertEqual(schedule_reminders(self.now + timedelta(hours=12)), 1)
+        transport = RecordingTransport()
+        process_queue(transport)
+        self.assertEqual(len(transport.sent), 1)
+        self.assertIn('03/03/2030 às 10:00', transport.sent[0])
+        # O lembrete do horário antigo não sai
+        self.assertEqual(self.reminder_slots(), [
+            ('2030-03-02', '09:00:00', 'skipped'), ('2030-03-03', '10:00:00', 'sent')])
+
+    def test_rescheduled_behind_watermark_is_reminded_on_reschedule(self):
+        appointment = self.book(date(2030, 3, 2), time(9, 0))
+        schedule_reminders(self.now)
+        process_queue(RecordingTransport())
+
+        # A marca d'água já passou pelo novo horário: a varredura não o revê
+        appointment.time = time(15, 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            appointment.save()
+        self.assertEqual(schedule_reminders(self.now + timedelta(minutes=10)), 0)
+
+        transport = RecordingTransport()
+        process_queue(transport)
+        self.assertIn('02/03/2030 às 15:00', transport.sent[-1])
+        self.assertEqual(self.reminder_slots(), [
+            ('2030-03-02', '09:00:00', 'sent'), ('2030-03-02', '15:00:00', 'sent')])
+
+    def test_command(self):
+        tomorrow = timezone.localtime() + timedelta(hours=3)
+        self.book(tomorrow.date(), tomorrow.time().replace(second=0, microsecond=0))
+        out = io.StringIO()
+        call_command('schedule_reminders', stdout=out)
+        self.assertIn('1 lembrete(s) agendado(s)', out.getvalue())
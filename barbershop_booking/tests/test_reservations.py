@@ -0,0 +1,141 @@
+import threading
+from datetime import date, time
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from barbershop_booking.models import Appointment, Client
+from barbershop_booking.reservations import SlotUnavailable, reserve_appointment
+from barbershop_booking.tenancy import barbershop_cache
+from barbershop_booking.testing import (BarbershopFixturesMixin, create_barbershop, create_client,
+                                        create_employee, create_owner, create_service, open_on)
+from barbershop_management.models import DayOfWeek
+
+
+def create_open_barbershop():
+    barbershop = create_barbershop(create_owner())
+    open_on(barbershop, DayOfWeek.objects.create(day=0, name='Segunda-feira'))
+    return barbershop, create_employee(barbershop), create_service(barbershop)
+
+
+class ReservationTestCase(BarbershopFixturesMixin, TestCase):
+    def setUp(self):
+        barbershop_cache.clear()
+        self.set_up_barbershop()
+        open_on(self.barbershop, DayOfWeek.objects.create(day=0, name='Segunda-feira'))
+        self.date = date(2024, 9, 2)
+
+    def new_appointment(self, at, service=None):
+        return Appointment(
+            client=self.client_profile, employee=self.employee, service=service or self.service,
+            barbershop=self.barbershop, date=self.date, time=at)
+
+    def test_overlapping_reservation_is_rejected(self):
+        long_service = create_service(
+            self.barbershop, 'Completo', price=50, duration=60, description='Completo')
+        reserve_appointment(self.new_appointment(time(10, 0), long_service))
+        with self.assertRaises(SlotUnavailable):
+            reserve_appointment(self.new_appointment(time(10, 30)))
+
+    def test_database_rejects_duplicate_active_slot(self):
+        self.book(self.date, time(9, 0))
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.book(self.date, time(9, 0))
+
+    def test_duplicate_slot_is_unavailable_and_other_errors_propagate(self):
+        self.book(self.date, time(9, 0))
+        # A verificação é contornada para que a disputa chegue à restrição do banco
+        with mock.patch('barbershop_booking.reservations.is_interval_free', return_value=True):
+            with self.assertRaises(SlotUnavailable):
+                reserve_appointment(self.new_appointment(time(9, 0)))
+        appointment = self.new_appointment(time(11, 0))
+        appointment.status = None
+        with self.assertRaises(IntegrityError):
+            reserve_appointment(appointment)
+
+    def test_cancelled_appointment_frees_the_slot(self):
+        self.book(self.date, time(9, 0), status='cancelled')
+        reserve_appointment(self.new_appointment(time(9, 0)))
+        self.assertEqual(Appointment.objects.filter(time=time(9, 0)).count(), 2)
+
+    def test_client_booking_returns_conflict(self):
+        url = reverse('barbershop_booking:client_booking', kwargs={
+            'barbershop_name': self.barbershop.name, 'phone': self.client_profile.phone})
+        data = {'service': self.service.id, 'employee': self.employee.id,
+                'date': self.date.isoformat(), 'time': '09:00'}
+        self.assertEqual(self.client.post(url, data).json()['success'], True)
+        response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['success'], False)
+
+
+class ConcurrentReservationTestCase(TransactionTestCase):
+    THREADS = 200
+
+    def test_exactly_one_concurrent_booking_wins(self):
+        barbershop, employee, service = create_open_barbershop()
+        clients = Client.objects.bulk_create([
+            Client(name=f'Client {index}', phone=f'1190000{index:04d}', barbershop=barbershop)
+            for index in range(self.THREADS)
+        ])
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+        errors = []
+
+        def book(client):
+            appointment = Appointment(
+                client=client, employee=employee, service=service, barbershop=barbershop,
+                date=date(2024, 9, 2), time=time(10, 0))
+            try:
+                barrier.wait()
+                reserve_appointment(appointment)
+                results.append('booked')
+            except SlotUnavailable:
+                results.append('conflict')
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=book, args=(client,)) for client in clients]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(results.count('booked'), 1)
+        self.assertEqual(results.count('conflict'), self.THREADS - 1)
+        self.assertEqual(Appointment.objects.filter(employee=employee).count(), 1)
+
+
+class DuplicateSlotMigrationTestCase(TransactionTestCase):
+    migrate_from = ('barbershop_booking', '0003_remove_appointment_updated_at')
+    migrate_to = ('barbershop_booking', '0004_appointment_unique_active_slot')
+
+    def tearDown(self):
+        call_command('migrate', 'barbershop_booking', verbosity=0)
+
+    def test_duplicate_active_slots_are_cancelled_keeping_the_earliest(self):
+        barbershop, employee, service = create_open_barbershop()
+        client = create_client(barbershop)
+        executor = MigrationExecutor(connection)
+        executor.migrate([self.migrate_from])
+        Appointment = executor.loader.project_state(self.migrate_from).apps.get_model(
+            'barbershop_booking', 'Appointment')
+        slot = {'client_id': client.pk, 'employee_id': employee.pk, 'service_id': service.pk,
+                'barbershop_id': barbershop.pk, 'date': date(2024, 9, 2), 'time': time(9, 0)}
+        first, second, third = (Appointment.objects.create(**slot) for _ in range(3))
+        cancelled = Appointment.objects.create(**slot, status='cancelled')
+        other = Appointment.objects.create(**{**slot, 'time': time(10, 0)})
+
+        executor = MigrationExecutor(connection)
+        executor.migrate([self.migrate_to])
+        self.assertEqual(
+            dict(Appointment.objects.values_list('pk', 'status')),
+            {first.pk: 'scheduled', second.pk: 'cancelled', third.pk: 'cancelled',
+             cancelled.pk: 'cancelled', other.pk: 'scheduled'})
@@ -0,0 +1,83 @@
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, TransactionTestCase
+
+from barbershop_booking.models import Appointment
+from barbershop_management.models import Barbershop
+from setup.database import SQLITE_BUSY_TIMEOUT_MS, sqlite_database
+from setup.routers import READ_DB_ALIAS, ReadWriteRouter
+
+
+class SQLiteProductionSettingsTestCase(TransactionTestCase):
+    def open(self, path, **kwargs):
+        settings_dict = {
+            'ATOMIC_REQUESTS': False, 'AUTOCOMMIT': True, 'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': False, 'TIME_ZONE': None, 'OPTIONS': {},
+            **sqlite_database(path, **kwargs),
+        }
+        connection = DatabaseWrapper(settings_dict, alias='sqlite-production-test')
+        self.addCleanup(connection.close)
+        return connection
+
+    def pragma(self, connection, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_development_mode_is_untouched(self):
+        self.assertEqual(sqlite_database('db.sqlite3'),
+                         {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'db.sqlite3'})
+
+    def test_production_pragmas(self):
+        path = Path(tempfile.mkdtemp()) / 'db.sqlite3'
+        writer = self.open(path, production=True)
+        self.assertEqual(self.pragma(writer, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(writer, 'synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma(writer, 'busy_timeout'), SQLITE_BUSY_TIMEOUT_MS)
+        self.assertGreater(self.pragma(writer, 'mmap_size'), 0)
+        self.assertEqual(writer.transaction_mode, 'IMMEDIATE')
+        with writer.cursor() as cursor:
+            cursor.execute('CREATE TABLE slot (id INTEGER PRIMARY KEY)')
+
+        reader = self.open(path, production=True, read_only=True)
+        self.assertEqual(self.pragma(reader, 'query_only'), 1)
+        with self.assertRaises(sqlite3.OperationalError):
+            with reader.cursor() as cursor:
+                cursor.connection.execute('INSERT INTO slot DEFAULT VALUES')
+
+
+class ReadWriteRouterTestCase(TransactionTestCase):
+    def test_reads_outside_transactions_use_read_connection(self):
+        router = ReadWriteRouter()
+        self.assertEqual(router.db_for_read(Appointment), READ_DB_ALIAS)
+        self.assertEqual(router.db_for_write(Appointment), DEFAULT_DB_ALIAS)
+        with transaction.atomic():
+            # Dentro da transação, a leitura enxerga as próprias escritas
+            self.assertEqual(router.db_for_read(Appointment), DEFAULT_DB_ALIAS)
+        self.assertFalse(router.allow_migrate(READ_DB_ALIAS, 'barbershop_booking'))
+        self.assertIsNone(router.allow_migrate(DEFAULT_DB_ALIAS, 'barbershop_booking'))
+
+        barbershop, other = Barbershop(), Barbershop()
+        barbershop._state.db, other._state.db = READ_DB_ALIAS, DEFAULT_DB_ALIAS
+        self.assertTrue(router.allow_relation(barbershop, other))
+
+
+class SQLiteConcurrencyBenchmarkTestCase(SimpleTestCase):
+    def test_command(self):
+        # Em outro processo: o comando registra conexões próprias, que os testes bloqueiam
+        result = subprocess.run(
+            [sys.executable, 'manage.py', 'benchmark_sqlite_concurrency',
+             '--seconds', '0.3', '--writers', '2', '--readers', '2'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=120)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn('SQLite padrão:', result.stdout)
+        self.assertIn('SQLite produção:', result.stdout)
+        self.assertIn('Nenhuma operação falhou por bloqueio', result.stdout)
+        self.assertIn('Leituras durante as rajadas: p99', result.stdout)
@@ -0,0 +1,86 @@
+import contextlib
+import io
+
+from django.http import Http404
+from django.test import TestCase
+from django.urls import reverse
+
+from barbershop_booking.tenancy import BarbershopLRUCache, barbershop_cache, resolve_barbershop
+from barbershop_booking.testing import create_barbershop, create_owner
+
+
+class TenantResolverTestCase(TestCase):
+    def setUp(self):
+        barbershop_cache.clear()
+        self.barbershop = create_barbershop(create_owner(), 'Barbearia do Zé', address='Rua A')
+
+    def test_resolves_by_slug_code_and_legacy_name(self):
+        self.assertEqual(resolve_barbershop('barbearia-do-ze'), self.barbershop)
+        self.assertEqual(resolve_barbershop(str(self.barbershop.code)), self.barbershop)
+        self.assertEqual(resolve_barbershop('Barbearia do Zé'), self.barbershop)
+        with self.assertRaises(Http404):
+            resolve_barbershop('outra-barbearia')
+
+    def test_resolved_barbershop_is_cached_until_saved(self):
+        resolve_barbershop('barbearia-do-ze')
+        with self.assertNumQueries(0):
+            cached = resolve_barbershop('barbearia-do-ze')
+        self.assertEqual(cached.name, 'Barbearia do Zé')
+        # Cada leitura devolve uma instância nova
+        self.assertIsNot(cached, resolve_barbershop('barbearia-do-ze'))
+
+        self.barbershop.description = 'Desde 1990'
+        self.barbershop.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(resolve_barbershop('barbearia-do-ze').description, 'Desde 1990')
+
+    def test_rename_regenerates_slug_and_redirects_old_links(self):
+        resolve_barbershop('barbearia-do-ze')
+        self.barbershop.name = 'Barbearia Nova'
+        self.barbershop.save()
+        self.assertEqual(self.barbershop.slug, 'barbearia-nova')
+        # Nome novo, slug antigo e nome antigo resolvem para a mesma barbearia
+        for identifier in ('Barbearia Nova', 'barbearia-do-ze', 'Barbearia do Zé'):
+            self.assertEqual(resolve_barbershop(identifier), self.barbershop)
+
+        response = self.client.get(
+            reverse('barbershop_booking:barbershop_presentation', args=['barbearia-do-ze']),
+            {'ref': 'qr'})
+        self.assertRedirects(
+            response,
+            reverse('barbershop_booking:barbershop_presentation', args=['barbearia-nova']) + '?ref=qr',
+            status_code=301)
+
+        # Voltar ao nome antigo recupera o slug antigo
+        self.barbershop.name = 'Barbearia do Zé'
+        self.barbershop.save()
+        self.assertEqual(self.barbershop.slug, 'barbearia-do-ze')
+        self.assertEqual(list(self.barbershop.old_slugs.values_list('slug', flat=True)),
+                         ['barbearia-nova'])
+
+    def test_slug_is_unique_across_current_and_old_slugs(self):
+        self.barbershop.name = 'Barbearia Nova'
+        self.barbershop.save()
+        other = create_barbershop(
+            self.barbershop.owner, 'Barbearia do Zé', address='Rua B', email='other@example.com')
+        self.assertEqual(other.slug, 'barbearia-do-ze-2')
+        self.assertEqual(create_barbershop(
+            self.barbershop.owner, 'Barbearia Nova', address='Rua C', email='new@example.com').slug,
+            'barbearia-nova-2')
+
+    def test_client_phone_is_not_logged(self):
+        stdout = io.StringIO()
+        with self.assertLogs('barbershop_booking.views', 'DEBUG') as logs, \
+                contextlib.redirect_stdout(stdout):
+            response = self.client.get(reverse(
+                'barbershop_booking:appointment_details', args=[self.barbershop.slug, '11988887777']))
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('11988887777', stdout.getvalue() + '\n'.join(logs.output))
+
+    def test_cache_is_bounded(self):
+        lru = BarbershopLRUCache(maxsize=2)
+        for identifier in ('a', 'b', 'c'):
+            lru.set(identifier, self.barbershop)
+        self.assertEqual(len(lru), 2)
+        self.assertIsNone(lru.get('a'))
+        self.assertEqual(lru.get('c'), self.barbershop)
@@ -11,13 +11,11 @@ urlpatterns = [
     path('employees/', views.employee_list, name='employee_list'),
     # Ajustar
     path('employees/<int:employee_id>/services/', views.employee_services, name='employee_services'),
-    # API agendamentos
-    path('employees/<int:employee_id>/schedule/', views.employee_schedule, name='employee_schedule'),
     # Pagina inicial barbearia cliente
     path('barbershop/<str:barbershop_name>/',
          views.barbershop_presentation, name='barbershop_presentation'),
-    # API agendamentos por ID funcionario
-    path('barbershop/employee/<int:employee_id>/schedule/',
+    # API agendamentos do funcionario da barbearia
+    path('barbershop/<str:barbershop_name>/employee/<int:employee_id>/schedule/',
          views.employee_schedule, name='employee_schedule'),
     # modelo de visualização dos agendamentos Calendario views.booking_process
     path('barbershop/<str:barbershop_name>/booking/',
@@ -37,6 +35,19 @@ urlpatterns = [
     # Novas URLs para o processo de agendamento
     path('barbershop/<str:barbershop_name>/slots/<int:employee_id>/<str:date>/',
          views.get_available_slots, name='get_available_slots'),
+    # API de disponibilidade de todos os profissionais ("qualquer profissional")
+    path('barbershop/<str:barbershop_name>/slots/any/<str:date>/',
+         views.get_any_employee_slots, name='any_employee_slots'),
+    # API de disponibilidade por período (calendário mensal)
+    path('barbershop/<str:barbershop_name>/calendar/<int:employee_id>/',
+         views.get_availability_calendar, name='availability_calendar'),
+    # Feeds ICS (calendário do celular) da barbearia e de cada funcionário
+    path('barbershop/<str:barbershop_name>/feed/<str:token>.ics',
+         views.barbershop_calendar_feed, name='barbershop_calendar_feed'),
+    path('barbershop/<str:barbershop_name>/feed/employee/<int:employee_id>/<str:token>.ics',
+         views.employee_calendar_feed, name='employee_calendar_feed'),
+    # Contadores do cache de disponibilidade (somente equipe)
+    path('availability/cache-stats/', views.availability_cache_stats, name='availability_cache_stats'),
     # modelo de Cadastro de cliente
     path('barbershop/<str:barbershop_name>/register/',
          views.client_registration, name='client_registration'),
@@ -1,19 +1,40 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.db.models import Q
 from .models import Barbershop, Service, Employee, Appointment, Client
 from .forms import ClientForm, AppointmentForm, PhoneVerificationForm
-from barbershop_management.models import Barbershop, WorkingHours, DayOfWeek
+from .cache import (PRESENTATION_CACHE_TIMEOUT, get_cache_stats, get_cached_availability,
+                    get_presentation_version)
+from .tenancy import barbershop_view
+from .calendar_feed import feed_appointments, feed_summary, is_valid_token, iter_calendar
+from .reservations import SlotUnavailable, reserve_appointment
+from .availability import (DEFAULT_SLOT_DURATION, get_barbershop_availability, get_day_availability,
+                           get_range_availability, is_interval_free)
+from barbershop_management.models import Barbershop, DayOfWeek
+from barbershop_management.schedule import get_schedule
 from django.urls import reverse
+import hashlib
+import json
 import logging
 logger = logging.getLogger(__name__)
 
 from datetime import datetime, timedelta
-from django.http import JsonResponse
-from django.views.decorators.http import require_GET
+from functools import partial
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import condition, require_GET
 from django.utils import timezone
-from django.db.models import F
+from django.db.models import Count, F, Max, Q
 # Create your views here.
 
+# Maior período aceito pela API de calendário
+MAX_CALENDAR_DAYS = 62
+
+# Período e tamanho de página da agenda do funcionário
+MAX_SCHEDULE_DAYS = 366
+SCHEDULE_PAGE_SIZE = 100
+MAX_SCHEDULE_PAGE_SIZE = 500
+# Colunas de cada item da agenda do funcionário
+SCHEDULE_ITEM_FIELDS = ('id', 'date', 'time', 'service__name')
+
 
 def service_list(request):
     services = Service.objects.all()
@@ -38,15 +59,21 @@ def book_appointment(request, employee_id, service_id):
 
 def my_appointments(request):
     appointments = Appointment.objects.filter(
-        client=request.user.client_profile)
+        client=request.user.client_profile).order_by('-date', '-time')
     return render(request, 'barbearia/booking/my_appointments.html', {'appointments': appointments})
 
 
+def client_by_phone_query(barbershop, phone):
+    """Cliente da barbearia com o telefone informado."""
+    return Client.objects.filter(phone=phone, barbershop=barbershop)
+
+
+@barbershop_view
 def appointment_details(request, barbershop_name, phone):
-    print(
-        f"Debug: appointment_details called with barbershop_name={barbershop_name}, phone={phone}")
-    barbershop = get_object_or_404(Barbershop, name=barbershop_name)
-    client = get_object_or_404(Client, phone=phone, barbershop=barbershop)
+    # O telefone identifica o cliente: não vai para os logs
+    logger.debug("appointment_details called with: barbershop_name=%s", barbershop_name)
+    barbershop = request.barbershop
+    client = get_object_or_404(client_by_phone_query(barbershop, phone))
 
     if request.method == 'POST':
         form = AppointmentForm(request.POST)
@@ -54,8 +81,12 @@ def appointment_details(request, barbershop_name, phone):
             appointment = form.save(commit=False)
             appointment.client = client
             appointment.barbershop = barbershop
-            appointment.save()
-            return redirect('barbershop_booking:booking_confirmation', appointment_id=appointment.id)
+            try:
+                reserve_appointment(appointment)
+            except SlotUnavailable:
+                form.add_error('time', 'Este horário não está mais disponível.')
+            else:
+                return redirect('barbershop_booking:booking_confirmation', appointment_id=appointment.id)
     else:
         form = AppointmentForm()
 
@@ -71,7 +102,7 @@ def appointment_details(request, barbershop_name, phone):
     })
 
 def employee_list(request):
-    employees = Employee.objects.all()
+    employees = Employee.objects.select_related('barbershop')
     return render(request, 'barbearia/booking/employee_list.html', {'employees': employees})
 
 
@@ -81,72 +112,178 @@ def employee_services(request, employee_id):
     return render(request, 'barbearia/booking/employee_services.html', {'employee': employee, 'services': services})
 
 
-def employee_schedule(request, employee_id):
-    appointments = Appointment.objects.filter(employee_id=employee_id).order_by('date', 'time')
-    schedule_data = [
-        {
-            'date': appointment.date.strftime('%d/%m/%Y'),
-            'time': appointment.time.strftime('%H:%M'),
-            'service': appointment.service.name
-        }
-        for appointment in appointments
-    ]
-    return JsonResponse(schedule_data, safe=False)
+def _parse_schedule_window(request):
+    """
+    Lê ``start``, ``end``, ``after`` e ``limit`` da agenda do funcionário.
+
+    Raises:
+        ValueError: com a mensagem de erro para o cliente.
+    """
+    try:
+        start_date = (datetime.strptime(request.GET['start'], '%Y-%m-%d').date()
+                      if request.GET.get('start') else timezone.localdate())
+        end_date = (datetime.strptime(request.GET['end'], '%Y-%m-%d').date()
+                    if request.GET.get('end') else start_date + timedelta(days=30))
+    except ValueError:
+        raise ValueError('Datas devem estar no formato AAAA-MM-DD.')
+    if end_date < start_date or (end_date - start_date).days >= MAX_SCHEDULE_DAYS:
+        raise ValueError(f'O período deve ter entre 1 e {MAX_SCHEDULE_DAYS} dias.')
+
+    cursor = None
+    if request.GET.get('after'):
+        try:
+            cursor_date, cursor_time, cursor_id = request.GET['after'].split(',')
+            cursor = (datetime.strptime(cursor_date, '%Y-%m-%d').date(),
+                      datetime.strptime(cursor_time, '%H:%M:%S').time(), int(cursor_id))
+        except ValueError:
+            raise ValueError('Cursor inválido.')
+
+    try:
+        limit = int(request.GET.get('limit', SCHEDULE_PAGE_SIZE))
+    except ValueError:
+        raise ValueError('O limite deve ser um número inteiro.')
+    if not 1 <= limit <= MAX_SCHEDULE_PAGE_SIZE:
+        raise ValueError(f'O limite deve estar entre 1 e {MAX_SCHEDULE_PAGE_SIZE}.')
+    return start_date, end_date, cursor, limit
+
+
+def schedule_page_query(barbershop, employee_id, start_date, end_date, cursor):
+    """Agendamentos do funcionário no período, após o cursor ``(data, hora, id)``."""
+    appointments = Appointment.objects.filter(
+        barbershop=barbershop, employee_id=employee_id, date__range=(start_date, end_date))
+    if cursor:
+        cursor_date, cursor_time, cursor_id = cursor
+        appointments = appointments.filter(
+            Q(date__gt=cursor_date)
+            | Q(date=cursor_date, time__gt=cursor_time)
+            | Q(date=cursor_date, time=cursor_time, id__gt=cursor_id))
+    return appointments.order_by('date', 'time', 'id')
+
+
+def _employee_schedule_etag(request, barbershop_name, employee_id):
+    try:
+        start_date, end_date, cursor, limit = _parse_schedule_window(request)
+    except ValueError:
+        return None
+    ids = schedule_page_query(
+        request.barbershop, employee_id, start_date, end_date, cursor).values('id')[:limit + 1]
+    summary = Appointment.objects.filter(id__in=ids).aggregate(
+        count=Count('id'), last_update=Max('updated_at'))
+    return _schedule_etag_key(
+        request.barbershop.pk, employee_id, start_date, end_date, cursor, limit, summary)
+
+
+def _schedule_etag_key(barbershop_id, employee_id, start_date, end_date, cursor, limit, summary):
+    key = (barbershop_id, employee_id, start_date, end_date, cursor, limit,
+           summary['count'], summary['last_update'])
+    return hashlib.md5(repr(key).encode(), usedforsecurity=False).hexdigest()
+
+
+def _schedule_item(date, time, service_name):
+    return json.dumps({
+        'date': date.strftime('%d/%m/%Y'),
+        'time': time.strftime('%H:%M'),
+        'service': service_name,
+    })
 
 
+def _stream_schedule(appointments, start_date, end_date, limit):
+    yield '{"start": "%s", "end": "%s", "appointments": [' % (start_date, end_date)
+    next_cursor = None
+    for index, (appointment_id, date, time, service_name) in enumerate(
+            appointments.iterator(chunk_size=SCHEDULE_PAGE_SIZE)):
+        if index == limit:
+            # Existe mais uma página: o cursor aponta para o último item enviado
+            next_cursor = last_cursor
+            break
+        item = _schedule_item(date, time, service_name)
+        yield item if index == 0 else ',' + item
+        last_cursor = f'{date.isoformat()},{time.strftime("%H:%M:%S")},{appointment_id}'
+    yield '], "next": %s}' % json.dumps(next_cursor)
+
+
+@require_GET
+@barbershop_view
+@condition(etag_func=_employee_schedule_etag)
+def employee_schedule(request, barbershop_name, employee_id):
+    """
+    Retorna a agenda do funcionário em um período, paginada por cursor.
+
+    Parâmetros GET: ``start`` e ``end`` (AAAA-MM-DD; por padrão, os próximos
+    31 dias), ``limit`` (itens por página) e ``after`` (o ``next`` da página
+    anterior). A resposta é enviada em streaming, com memória limitada ao
+    tamanho da página, e traz um ETag para que agendas inalteradas
+    retornem 304.
+    """
+    try:
+        start_date, end_date, cursor, limit = _parse_schedule_window(request)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    appointments = schedule_page_query(
+        request.barbershop, employee_id, start_date, end_date, cursor).values_list(
+        *SCHEDULE_ITEM_FIELDS)[:limit + 1]
+    return StreamingHttpResponse(
+        _stream_schedule(appointments, start_date, end_date, limit),
+        content_type='application/json')
+
+
+def _working_hours_by_day(barbershop):
+    """Horários de funcionamento por dia, a partir da agenda compilada em cache."""
+    schedule = get_schedule(barbershop)
+    working_hours_by_day = {}
+    for week_day in schedule.days:
+        day = DayOfWeek(pk=week_day.pk, day=week_day.day, name=week_day.name)
+        if not schedule.open_days & (1 << week_day.day):
+            working_hours_by_day[day] = ["Fechado"]
+        elif not schedule.intervals[week_day.day]:
+            working_hours_by_day[day] = ["Horário não cadastrado"]
+        else:
+            working_hours_by_day[day] = list(schedule.intervals[week_day.day])
+    return working_hours_by_day
+
+
+@barbershop_view
 def barbershop_presentation(request, barbershop_name):
-    barbershop = get_object_or_404(Barbershop, Q(name__iexact=barbershop_name))
+    barbershop = request.barbershop
 
-    services = Service.objects.filter(barbershop=barbershop)
-    employees = Employee.objects.filter(barbershop=barbershop)
-    working_hours = WorkingHours.objects.filter(barbershop=barbershop).select_related(
-        'day_of_week').order_by('day_of_week__day')
-    # Organize os horários de trabalho por dia
-    # Obter todos os dias da semana
-    all_days = DayOfWeek.objects.all().order_by('day')
-    # Criar um dicionário com todos os dias, inicialmente sem horários
-    working_hours_by_day = {day: [] for day in all_days}
-    # Preencher o dicionário com os horários existentes
-    for wh in working_hours:
-        working_hours_by_day[wh.day_of_week].append(wh)
-    # Adicionar uma mensagem para dias sem horário cadastrado
-    for day, hours in working_hours_by_day.items():
-        if not hours:
-            if day not in barbershop.working_days.all():
-                working_hours_by_day[day] = ["Fechado"]
-            else:
-                working_hours_by_day[day] = ["Horário não cadastrado"]
-    phone_form = PhoneVerificationForm()
+    # Serviços, funcionários e horários são avaliados apenas pelo template,
+    # quando o fragmento da página não está em cache
     context = {
         'barbershop': barbershop,
-        'services': services,
-        'employees': employees,
-        'working_hours_by_day': working_hours_by_day,
-        'phone_form': phone_form,
+        'services': Service.objects.filter(barbershop=barbershop).only(
+            'name', 'description', 'price'),
+        'employees': Employee.objects.filter(barbershop=barbershop).only('name', 'role'),
+        'working_hours_by_day': partial(_working_hours_by_day, barbershop),
+        'phone_form': PhoneVerificationForm(),
+        'presentation_version': get_presentation_version(barbershop.pk),
+        'presentation_cache_timeout': PRESENTATION_CACHE_TIMEOUT,
     }
     return render(request, 'barbearia/booking/barbershop_presentation.html', context)
 
 
+@barbershop_view
 def verify_phone(request, barbershop_name):
     if request.method == 'POST':
         form = PhoneVerificationForm(request.POST)
         if form.is_valid():
             phone = form.cleaned_data['phone']
-            barbershop = get_object_or_404(Barbershop, name=barbershop_name)
-            client = Client.objects.filter(phone=phone, barbershop=barbershop).first()
+            barbershop = request.barbershop
+            client = client_by_phone_query(barbershop, phone).first()
             
             if client:
                 # Cliente existe, redirecionar para a tela de agendamento
-                return redirect(reverse('barbershop_booking:client_booking', kwargs={'barbershop_name': barbershop_name, 'phone': phone}))
+                return redirect(reverse('barbershop_booking:client_booking', kwargs={'barbershop_name': request.barbershop.slug, 'phone': phone}))
             else:
                 # Cliente não existe, redirecionar para o cadastro
-                return redirect(reverse('barbershop_booking:client_registration', kwargs={'barbershop_name': barbershop_name, 'phone': phone}))
+                return redirect(reverse('barbershop_booking:client_registration', kwargs={'barbershop_name': request.barbershop.slug, 'phone': phone}))
     
     # Se o método não for POST, redirecionar de volta para a página da barbearia
-    return redirect(reverse('barbershop_booking:barbershop_presentation', kwargs={'barbershop_name': barbershop_name}))
+    return redirect(reverse('barbershop_booking:barbershop_presentation', kwargs={'barbershop_name': request.barbershop.slug}))
 
+@barbershop_view
 def client_registration(request, barbershop_name):
-    barbershop = get_object_or_404(Barbershop, name=barbershop_name)
+    barbershop = request.barbershop
     
     if request.method == 'POST':
         form = ClientForm(request.POST)
@@ -154,7 +291,7 @@ def client_registration(request, barbershop_name):
             client = form.save(commit=False)
             client.barbershop = barbershop
             client.save()
-            return redirect(reverse('barbershop_booking:client_booking', kwargs={'barbershop_name': barbershop_name, 'phone': client.phone}))
+            return redirect(reverse('barbershop_booking:client_booking', kwargs={'barbershop_name': request.barbershop.slug, 'phone': client.phone}))
     else:
         form = ClientForm()
     
@@ -164,9 +301,10 @@ def client_registration(request, barbershop_name):
     })
 
 
+@barbershop_view
 def client_booking(request, barbershop_name, phone):
-    barbershop = get_object_or_404(Barbershop, name=barbershop_name)
-    client = get_object_or_404(Client, phone=phone, barbershop=barbershop)
+    barbershop = request.barbershop
+    client = get_object_or_404(client_by_phone_query(barbershop, phone))
     
     if request.method == 'POST':
         form = AppointmentForm(request.POST)
@@ -177,12 +315,13 @@ def client_booking(request, barbershop_name, phone):
             appointment.created_at = timezone.now()
 
             
-            # Verificar disponibilidade
-            if is_slot_available(appointment.employee, appointment.date, appointment.time):
-                appointment.save()
-                return JsonResponse({'success': True, 'message': 'Agendamento realizado com sucesso.'})
-            else:
-                return JsonResponse({'success': False, 'message': 'Este horário não está mais disponível.'})
+            # Verificar disponibilidade e gravar na mesma transação
+            try:
+                reserve_appointment(appointment)
+            except SlotUnavailable:
+                return JsonResponse(
+                    {'success': False, 'message': 'Este horário não está mais disponível.'}, status=409)
+            return JsonResponse({'success': True, 'message': 'Agendamento realizado com sucesso.'})
         else:
             # Se o formulário não for válido, retorne os erros
             errors = {field: error[0] for field, error in form.errors.items()}
@@ -199,22 +338,22 @@ def client_booking(request, barbershop_name, phone):
     return render(request, 'barbearia/booking/client_booking.html', context)
 
 
+@barbershop_view
 def booking_process(request, barbershop_name):
-    barbershop = get_object_or_404(Barbershop, name=barbershop_name)
+    barbershop = request.barbershop
 
     if request.method == 'POST':
         form = PhoneVerificationForm(request.POST)
         if form.is_valid():
             phone = form.cleaned_data['phone']
-            client = Client.objects.filter(
-                phone=phone, barbershop=barbershop).first()
+            client = client_by_phone_query(barbershop, phone).first()
 
             if client:
                 # Cliente existe, redirecionar para a tela de agendamento
-                return redirect(reverse('barbershop_booking:client_booking', kwargs={'barbershop_name': barbershop_name, 'phone': phone}))
+                return redirect(reverse('barbershop_booking:client_booking', kwargs={'barbershop_name': request.barbershop.slug, 'phone': phone}))
             else:
                 # Cliente não existe, redirecionar para o cadastro
-                return redirect(reverse('barbershop_booking:client_registration', kwargs={'barbershop_name': barbershop_name, 'phone': phone}))
+                return redirect(reverse('barbershop_booking:client_registration', kwargs={'barbershop_name': request.barbershop.slug, 'phone': phone}))
     else:
         form = PhoneVerificationForm()
 
@@ -223,60 +362,195 @@ def booking_process(request, barbershop_name):
         'form': form
     })
 
+def _parse_day(value):
+    """Data da URL; ``ValueError`` com a mensagem de erro quando inválida."""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError('Data deve estar no formato AAAA-MM-DD.')
+
+
+def _parse_calendar_window(request):
+    """
+    Lê ``start`` e ``end`` da API de calendário (por padrão, 31 dias a partir de hoje).
+
+    Raises:
+        ValueError: com a mensagem de erro, se o período for inválido.
+    """
+    try:
+        start_date = (datetime.strptime(request.GET['start'], '%Y-%m-%d').date()
+                      if request.GET.get('start') else timezone.localdate())
+        end_date = (datetime.strptime(request.GET['end'], '%Y-%m-%d').date()
+                    if request.GET.get('end') else start_date + timedelta(days=30))
+    except ValueError:
+        raise ValueError('Datas devem estar no formato AAAA-MM-DD.')
+    if end_date < start_date or (end_date - start_date).days >= MAX_CALENDAR_DAYS:
+        raise ValueError(f'O período deve ter entre 1 e {MAX_CALENDAR_DAYS} dias.')
+    return start_date, end_date
+
+
+def _service_query(request):
+    """Serviço do parâmetro ``service``, entre os da barbearia, ou ``None`` se omitido."""
+    service_id = request.GET.get('service')
+    if not service_id:
+        return None
+    return Service.objects.filter(id=service_id, barbershop=request.barbershop)
+
+
+def _service_duration(request):
+    query = _service_query(request)
+    if query is None:
+        return None
+    return timedelta(minutes=get_object_or_404(query).duration)
+
+
+def _day_payload(availability):
+    payload = {'available_slots': [slot.strftime('%H:%M') for slot in availability.slots]}
+    if availability.message:
+        payload['message'] = availability.message
+    return payload
+
+
+def _calendar_payload(start_date, end_date, availability):
+    return {
+        'start': start_date.isoformat(),
+        'end': end_date.isoformat(),
+        'days': {day.isoformat(): _day_payload(day_availability)
+                 for day, day_availability in availability.items()},
+    }
+
+
+def _any_employee_payload(employees, matrix, message):
+    payload = {
+        'employees': [{'id': employee.id, 'name': employee.name} for employee in employees],
+        'slots': [
+            {'time': slot.strftime('%H:%M'), 'employees': employee_ids}
+            for slot, employee_ids in matrix.items()
+        ],
+    }
+    if message:
+        payload['message'] = message
+    return payload
+
+
 @require_GET
+@barbershop_view
 def get_available_slots(request, barbershop_name, employee_id, date):
-    print(f"get_available_slots called with: barbershop_name={barbershop_name}, employee_id={employee_id}, date={date}")
+    logger.debug("get_available_slots called with: barbershop_name=%s, employee_id=%s, date=%s",
+                 barbershop_name, employee_id, date)
+    barbershop = request.barbershop
     try:
-        barbershop = get_object_or_404(Barbershop, name=barbershop_name)
+        selected_date = _parse_day(date)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    service_id = request.GET.get('service')
+
+    def compute():
+        # Funcionário ou serviço de outra barbearia: 404
         employee = get_object_or_404(Employee, id=employee_id, barbershop=barbershop)
-        
-        selected_date = datetime.strptime(date, '%Y-%m-%d').date()
-        day_of_week = selected_date.weekday() 
-
-        print(f"Barbershop working days: {[day.day for day in barbershop.working_days.all()]}")
-        print(f"Day of week: {day_of_week}")
-
-        if not barbershop.working_days.filter(day=day_of_week).exists():
-            print(
-                f"if 1: {barbershop.working_days.filter(day=day_of_week).exists()}")
-            return JsonResponse({'available_slots': [], 'message': 'A barbearia está fechada neste dia.'})
-        
-        barbershop_hours = WorkingHours.objects.filter(
-            barbershop=barbershop, day_of_week__day=day_of_week).first()
-        print(f"Barbershop hours: {barbershop_hours}")
-
-        if not barbershop_hours:
-            print (f"if 2: {barbershop_hours}")
-            return JsonResponse({'available_slots': [], 'message': 'Horário de funcionamento não definido para este dia.'})
-        #employee_hours = employee.working_hours.filter(day_of_week=day_of_week).first()
-        #print(f"Employee hours: {employee_hours}")
-        #if not employee_hours:
-        #    return JsonResponse({'available_slots': [], 'message': 'O funcionário não trabalha neste dia.'})
-
-        start_time = barbershop_hours.start_time
-        end_time = barbershop_hours.end_time
-        print(f"Start time: {start_time}, End time: {end_time}")
-
-        current_time = datetime.combine(selected_date, start_time)
-        end_datetime = datetime.combine(selected_date, end_time)
-        slot_duration = timedelta(minutes=30)
-
-        available_slots = []
-        while current_time < end_datetime:
-            time_slot = current_time.time()
-            if is_slot_available(employee, selected_date, time_slot):
-                available_slots.append(time_slot.strftime('%H:%M'))
-            current_time += slot_duration
-
-        print(f"Returning available slots: {available_slots}")
-        return JsonResponse({'available_slots': available_slots})
-    except Exception as e:
-        print(f"Error in get_available_slots: {str(e)}")
-        return JsonResponse({'error': str(e)}, status=500)
-
-def is_slot_available(employee, date, time):
-    return not Appointment.objects.filter(
-        employee=employee,
-        date=date,
-        time=time
-    ).exists()
\ No newline at end of file
+        availability = get_day_availability(
+            barbershop, employee, selected_date, _service_duration(request))
+        return _day_payload(availability)
+
+    # A maior parte das consultas de horários é respondida pelo cache
+    return JsonResponse(get_cached_availability(
+        barbershop.id, employee_id, selected_date, service_id, compute))
+
+@require_GET
+@barbershop_view
+def get_availability_calendar(request, barbershop_name, employee_id):
+    """
+    Retorna a disponibilidade de um funcionário para um período (por padrão, 31 dias).
+
+    Parâmetros GET: ``start`` e ``end`` (AAAA-MM-DD) e ``service`` (opcional).
+    """
+    barbershop = request.barbershop
+    employee = get_object_or_404(Employee, id=employee_id, barbershop=barbershop)
+    try:
+        start_date, end_date = _parse_calendar_window(request)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    availability = get_range_availability(
+        barbershop, employee, start_date, end_date, _service_duration(request))
+    return JsonResponse(_calendar_payload(start_date, end_date, availability))
+
+@require_GET
+@barbershop_view
+def get_any_employee_slots(request, barbershop_name, date):
+    """
+    Retorna, para uma data, quais funcionários ativos estão livres em cada horário.
+
+    Atende o agendamento com "qualquer profissional" em uma única requisição.
+    Parâmetro GET opcional: ``service``.
+    """
+    try:
+        selected_date = _parse_day(date)
+    except ValueError as error:
+        return JsonResponse({'error': str(error)}, status=400)
+
+    employees, matrix, message = get_barbershop_availability(
+        request.barbershop, selected_date, _service_duration(request))
+    return JsonResponse(_any_employee_payload(employees, matrix, message))
+
+def _calendar_feed_summary(request, employee_id):
+    # ETag e Last-Modified usam o mesmo resumo: uma única consulta por requisição
+    if not hasattr(request, '_calendar_feed_summary'):
+        request._calendar_feed_summary = feed_summary(
+            feed_appointments(request.barbershop, employee_id))
+    return request._calendar_feed_summary
+
+
+def _calendar_feed_etag(request, barbershop_name, token, employee_id=None):
+    if not is_valid_token(request.barbershop, token, employee_id):
+        return None
+    count, last_modified = _calendar_feed_summary(request, employee_id)
+    return f'{employee_id or 0}-{count}-{last_modified.timestamp() if last_modified else 0}'
+
+
+def _calendar_feed_last_modified(request, barbershop_name, token, employee_id=None):
+    if not is_valid_token(request.barbershop, token, employee_id):
+        return None
+    return _calendar_feed_summary(request, employee_id)[1]
+
+
+def _calendar_response(request, appointments, calendar_name):
+    response = StreamingHttpResponse(
+        iter_calendar(appointments, calendar_name, request.get_host()),
+        content_type='text/calendar; charset=utf-8')
+    response['Content-Disposition'] = 'inline; filename="agenda.ics"'
+    return response
+
+
+@require_GET
+@barbershop_view
+@condition(etag_func=_calendar_feed_etag, last_modified_func=_calendar_feed_last_modified)
+def barbershop_calendar_feed(request, barbershop_name, token):
+    """Feed ICS com os agendamentos de todos os funcionários da barbearia."""
+    barbershop = request.barbershop
+    if not is_valid_token(barbershop, token):
+        raise Http404('Feed não encontrado.')
+    return _calendar_response(request, feed_appointments(barbershop), barbershop.name)
+
+
+@require_GET
+@barbershop_view
+@condition(etag_func=_calendar_feed_etag, last_modified_func=_calendar_feed_last_modified)
+def employee_calendar_feed(request, barbershop_name, employee_id, token):
+    """Feed ICS com os agendamentos de um funcionário."""
+    barbershop = request.barbershop
+    if not is_valid_token(barbershop, token, employee_id):
+        raise Http404('Feed não encontrado.')
+    employee = get_object_or_404(Employee, id=employee_id, barbershop=barbershop)
+    return _calendar_response(
+        request, feed_appointments(barbershop, employee_id), f'{employee.name} - {barbershop.name}')
+
+
+@staff_member_required
+@require_GET
+def availability_cache_stats(request):
+    """Expõe os contadores de acertos e falhas do cache de disponibilidade deste processo."""
+    return JsonResponse(get_cache_stats())
+
+def is_slot_available(employee, date, time, duration=DEFAULT_SLOT_DURATION):
+    return is_interval_free(employee, date, time, duration)
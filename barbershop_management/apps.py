@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BarbershopManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'barbershop_management'
+
+    def ready(self):
+        from . import signals  # noqa: F401
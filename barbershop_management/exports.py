@@ -0,0 +1,94 @@
+"""
+Exportação em CSV de agendamentos, clientes e despesas de uma barbearia.
+
+As linhas são lidas com ``.values_list().iterator(chunk_size=...)`` e
+escritas uma a uma por um ``csv.writer`` que apenas devolve o texto, para
+serem enviadas em um ``StreamingHttpResponse``; a memória usada não depende
+do número de linhas exportadas. As colunas de agendamentos e clientes são as
+mesmas aceitas pela importação (``importers.py``), acrescidas de dados
+informativos.
+"""
+import csv
+
+from barbershop_booking.models import Appointment, Client
+from .models import Expense
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_KINDS = [
+    ('appointments', 'Agendamentos'),
+    ('clients', 'Clientes'),
+    ('expenses', 'Despesas'),
+]
+
+
+class Echo:
+    """Arquivo falso para ``csv.writer``: ``write`` devolve a linha em vez de guardá-la."""
+
+    def write(self, value):
+        return value
+
+
+def _appointments(barbershop, start_date, end_date):
+    queryset = Appointment.objects.filter(barbershop=barbershop)
+    if start_date:
+        queryset = queryset.filter(date__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(date__lte=end_date)
+    return queryset.order_by('date', 'time', 'id').values_list(
+        'date', 'time', 'client__phone', 'client__name', 'employee__phone', 'service__name',
+        'status', 'employee__name', 'service__price')
+
+
+def _clients(barbershop, start_date, end_date):
+    queryset = Client.objects.filter(barbershop=barbershop)
+    if start_date:
+        queryset = queryset.filter(created_at__date__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(created_at__date__lte=end_date)
+    return queryset.order_by('id').values_list('name', 'phone', 'created_at')
+
+
+def _expenses(barbershop, start_date, end_date):
+    queryset = Expense.objects.filter(barbershop=barbershop)
+    if start_date:
+        queryset = queryset.filter(date__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(date__lte=end_date)
+    return queryset.order_by('date', 'id').values_list(
+        'date', 'description', 'expense_type', 'amount', 'notes')
+
+
+# Cabeçalho e consulta de cada tipo de exportação
+EXPORTS = {
+    'appointments': (
+        ('date', 'time', 'client_phone', 'client_name', 'employee_phone', 'service', 'status',
+         'employee_name', 'price'),
+        _appointments,
+    ),
+    'clients': (('name', 'phone', 'created_at'), _clients),
+    'expenses': (('date', 'description', 'expense_type', 'amount', 'notes'), _expenses),
+}
+
+
+def export_rows(kind, barbershop, start_date=None, end_date=None):
+    """Consulta (``values_list``) da exportação ``kind`` no período, já ordenada."""
+    return EXPORTS[kind][1](barbershop, start_date, end_date)
+
+
+def iter_csv(kind, barbershop, start_date=None, end_date=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Gera o CSV da exportação ``kind``, uma linha por vez.
+
+    O arquivo começa com a marca de ordem de bytes (BOM) do UTF-8, para que
+    planilhas reconheçam a acentuação.
+    """
+    writer = csv.writer(Echo())
+    yield '\ufeff' + writer.writerow(EXPORTS[kind][0])
+    for row in export_rows(kind, barbershop, start_date, end_date).iterator(chunk_size=chunk_size):
+        yield writer.writerow(row)
+
+
+def export_filename(kind, barbershop, start_date=None, end_date=None):
+    period = ''.join(f'_{day.isoformat()}' for day in (start_date, end_date) if day)
+    return f'{barbershop.slug or barbershop.pk}_{kind}{period}.csv'
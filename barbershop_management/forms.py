@@ -1,5 +1,7 @@
 from django import forms
 from django.contrib.auth.models import User
+from django.db.models import Q
+from .importers import IMPORT_KINDS
 from .models import Employee, Service, WorkingHours, EmployeeService, Expense, Inventory, Barbershop
 
 
@@ -58,10 +60,22 @@ class InventoryForm(forms.ModelForm):
 class EmployeeSearchForm(forms.Form):
     search = forms.CharField(required=False, label='Search Employees')
 
+    def filter(self, queryset):
+        search = self.cleaned_data.get('search')
+        if search:
+            queryset = queryset.filter(Q(name__icontains=search) | Q(phone__icontains=search))
+        return queryset
+
 
 class ServiceSearchForm(forms.Form):
     search = forms.CharField(required=False, label='Search Services')
 
+    def filter(self, queryset):
+        search = self.cleaned_data.get('search')
+        if search:
+            queryset = queryset.filter(name__icontains=search)
+        return queryset
+
 
 class ExpenseSearchForm(forms.Form):
     start_date = forms.DateField(
@@ -71,18 +85,53 @@ class ExpenseSearchForm(forms.Form):
     expense_type = forms.ChoiceField(
         choices=[('', 'All')] + Expense.EXPENSE_TYPES, required=False)
 
+    def filter(self, queryset):
+        if self.cleaned_data.get('start_date'):
+            queryset = queryset.filter(date__gte=self.cleaned_data['start_date'])
+        if self.cleaned_data.get('end_date'):
+            queryset = queryset.filter(date__lte=self.cleaned_data['end_date'])
+        if self.cleaned_data.get('expense_type'):
+            queryset = queryset.filter(expense_type=self.cleaned_data['expense_type'])
+        return queryset
+
 
 class InventorySearchForm(forms.Form):
     search = forms.CharField(required=False, label='Search Inventory')
     low_stock = forms.BooleanField(
         required=False, label='Show Low Stock Items')
 
+    def filter(self, queryset):
+        if self.cleaned_data.get('search'):
+            queryset = queryset.filter(name__icontains=self.cleaned_data['search'])
+        if self.cleaned_data.get('low_stock'):
+            queryset = queryset.filter(is_low_stock=True)
+        return queryset
+
 
 class BarbershopForm(forms.ModelForm):
     class Meta:
         model = Barbershop
         # ajuste conforme necessário
-        fields = ['name', 'address', 'phone', 'description', 'email']
+        fields = ['name', 'address', 'phone', 'description', 'email', 'slot_duration']
+
+
+class ImportForm(forms.Form):
+    kind = forms.ChoiceField(choices=IMPORT_KINDS, label='Tipo de registro')
+    file = forms.FileField(label='Arquivo CSV')
+
+
+class ExportForm(forms.Form):
+    start_date = forms.DateField(
+        required=False, label='Data inicial', widget=forms.DateInput(attrs={'type': 'date'}))
+    end_date = forms.DateField(
+        required=False, label='Data final', widget=forms.DateInput(attrs={'type': 'date'}))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start_date, end_date = cleaned_data.get('start_date'), cleaned_data.get('end_date')
+        if start_date and end_date and end_date < start_date:
+            raise forms.ValidationError('A data final deve ser posterior à data inicial.')
+        return cleaned_data
 
 
 class LoginForm(forms.Form):
@@ -0,0 +1,389 @@
+"""
+Importação em massa de clientes, serviços, funcionários e agendamentos a
+partir de arquivos CSV.
+
+O arquivo é lido linha a linha (``csv.DictReader`` sobre um fluxo de texto)
+e processado em lotes de ``IMPORT_CHUNK_SIZE`` linhas. Cada linha é
+validada com os próprios campos do modelo; linhas inválidas são registradas
+em ``ImportResult.errors`` com o número da linha e não interrompem a
+importação. Cada lote é gravado em uma transação, com ``bulk_create``:
+
+* clientes e funcionários são únicos por (telefone, barbearia) e usam
+  upsert (``update_conflicts``), atualizando os dados de quem já existe;
+* serviços são identificados pelo nome na barbearia; os existentes são
+  atualizados com ``bulk_update``;
+* agendamentos já existentes no mesmo horário do funcionário são ignorados,
+  de modo que reimportar o mesmo arquivo não duplica nada. Clientes
+  inexistentes são criados quando a coluna ``client_name`` é informada.
+
+Operações em massa não disparam os sinais; ao final, ``finish()`` invalida
+os caches da barbearia e recalcula os consolidados financeiros do período
+importado.
+"""
+import csv
+from datetime import datetime
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from barbershop_booking.cache import invalidate_barbershop, invalidate_presentation
+from barbershop_booking.models import Appointment, Client
+from .models import Employee, Service
+from .rollups import rebuild_rollups
+from .sharding import shard_for, use_barbershop_shard
+from .stats import invalidate_dashboard
+
+IMPORT_CHUNK_SIZE = 1000
+
+# Erros exibidos na página de importação; o comando lista todos
+MAX_REPORTED_ERRORS = 100
+
+# Formatos de data aceitos, além do ISO (AAAA-MM-DD)
+DATE_INPUT_FORMATS = ('%d/%m/%Y',)
+
+
+class ImportFileError(ValueError):
+    """O arquivo não pode ser importado (por exemplo, faltam colunas)."""
+
+
+class ImportRowError(ValueError):
+    """Uma linha do arquivo é inválida; as demais continuam sendo importadas."""
+
+
+class ImportResult:
+    """Totais de uma importação e os erros de cada linha rejeitada."""
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+    @property
+    def rows(self):
+        return self.created + self.updated + self.skipped + len(self.errors)
+
+
+def _clean(model, field_name, value):
+    """Converte e valida ``value`` com o campo ``field_name`` de ``model``."""
+    field = model._meta.get_field(field_name)
+    try:
+        return field.clean(value, None)
+    except ValidationError as error:
+        raise ImportRowError(f'{field_name}: {" ".join(error.messages)}')
+
+
+def _clean_date(model, field_name, value):
+    for date_format in DATE_INPUT_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            pass
+    return _clean(model, field_name, value)
+
+
+def _clean_decimal(model, field_name, value):
+    # Aceita vírgula como separador decimal ("25,90")
+    return _clean(model, field_name, value.replace(',', '.'))
+
+
+def _clean_bool(model, field_name, value):
+    if value == '':
+        return model._meta.get_field(field_name).default
+    if value.lower() in ('sim', 's'):
+        return True
+    if value.lower() in ('não', 'nao', 'n'):
+        return False
+    return _clean(model, field_name, value)
+
+
+def _clean_choice(model, field_name, value):
+    """Aceita tanto o valor quanto o rótulo da opção (``barber`` ou ``Barbeiro``)."""
+    labels = {str(label).lower(): key for key, label in model._meta.get_field(field_name).choices}
+    return _clean(model, field_name, labels.get(value.lower(), value))
+
+
+class CsvImporter:
+    """
+    Base dos importadores: lê o CSV em lotes e delega a validação de cada
+    linha a ``prepare`` e a gravação de cada lote a ``write``.
+    """
+
+    required_columns = ()
+    optional_columns = ()
+
+    def __init__(self, barbershop):
+        self.barbershop = barbershop
+
+    def prepare(self, row):
+        """Valida a linha e retorna ``(chave, valores)``; a chave identifica duplicatas."""
+        raise NotImplementedError
+
+    def write(self, rows, result):
+        """Grava ``rows`` (``{chave: (linha, valores)}``) e atualiza ``result``."""
+        raise NotImplementedError
+
+    def finish(self, result):
+        """Executado ao final da importação, fora das transações dos lotes."""
+
+    def run(self, stream, chunk_size=IMPORT_CHUNK_SIZE):
+        """
+        Importa o CSV de ``stream`` (um arquivo de texto).
+
+        Raises:
+            ImportFileError: se o cabeçalho não tiver as colunas obrigatórias.
+        """
+        reader = csv.DictReader(stream)
+        if reader.fieldnames is None:
+            raise ImportFileError('O arquivo está vazio.')
+        # Ignora a marca de ordem de bytes (BOM) que planilhas e ``exports.py`` gravam
+        reader.fieldnames = [name.strip().lstrip('\ufeff').lower() for name in reader.fieldnames]
+        missing = [column for column in self.required_columns if column not in reader.fieldnames]
+        if missing:
+            raise ImportFileError(f'Colunas obrigatórias ausentes: {", ".join(missing)}.')
+
+        result = ImportResult()
+        columns = self.required_columns + self.optional_columns
+        try:
+            while True:
+                chunk = {}
+                read = 0
+                for row in islice(reader, chunk_size):
+                    read += 1
+                    line = reader.line_num
+                    try:
+                        key, values = self.prepare(
+                            {column: (row.get(column) or '').strip() for column in columns})
+                    except ImportRowError as error:
+                        result.add_error(line, str(error))
+                        continue
+                    if key in chunk:
+                        # Linha repetida no mesmo lote: vale a última
+                        result.skipped += 1
+                    chunk[key] = (line, values)
+                if chunk:
+                    with transaction.atomic(using=shard_for(self.barbershop.pk)):
+                        self.write(chunk, result)
+                if read < chunk_size:
+                    break
+        finally:
+            # Os lotes já gravados permanecem, mesmo que a leitura falhe depois
+            self.finish(result)
+            result.errors.sort()
+        return result
+
+
+class ClientImporter(CsvImporter):
+    required_columns = ('name', 'phone')
+
+    def prepare(self, row):
+        phone = _clean(Client, 'phone', row['phone'])
+        return phone, {'name': _clean(Client, 'name', row['name']), 'phone': phone}
+
+    def write(self, rows, result):
+        existing = Client.objects.filter(
+            barbershop=self.barbershop, phone__in=list(rows)).count()
+        Client.objects.bulk_create(
+            [Client(barbershop=self.barbershop, **values) for _, values in rows.values()],
+            update_conflicts=True, unique_fields=['phone', 'barbershop'], update_fields=['name'])
+        result.updated += existing
+        result.created += len(rows) - existing
+
+
+class EmployeeImporter(CsvImporter):
+    required_columns = ('name', 'phone', 'role', 'hire_date')
+    optional_columns = ('is_active',)
+
+    def prepare(self, row):
+        phone = _clean(Employee, 'phone', row['phone'])
+        return phone, {
+            'name': _clean(Employee, 'name', row['name']),
+            'phone': phone,
+            'role': _clean_choice(Employee, 'role', row['role']),
+            'hire_date': _clean_date(Employee, 'hire_date', row['hire_date']),
+            'is_active': _clean_bool(Employee, 'is_active', row['is_active']),
+        }
+
+    def write(self, rows, result):
+        existing = Employee.objects.filter(
+            barbershop=self.barbershop, phone__in=list(rows)).count()
+        Employee.objects.bulk_create(
+            [Employee(barbershop=self.barbershop, **values) for _, values in rows.values()],
+            update_conflicts=True, unique_fields=['phone', 'barbershop'],
+            update_fields=['name', 'role', 'hire_date', 'is_active'])
+        result.updated += existing
+        result.created += len(rows) - existing
+
+    def finish(self, result):
+        _invalidate_barbershop_caches(self.barbershop.pk)
+
+
+class ServiceImporter(CsvImporter):
+    required_columns = ('name', 'price', 'duration')
+    optional_columns = ('description', 'is_active')
+
+    def prepare(self, row):
+        name = _clean(Service, 'name', row['name'])
+        return name, {
+            'name': name,
+            'description': row['description'],
+            'price': _clean_decimal(Service, 'price', row['price']),
+            'duration': _clean(Service, 'duration', row['duration']),
+            'is_active': _clean_bool(Service, 'is_active', row['is_active']),
+        }
+
+    def write(self, rows, result):
+        existing = {}
+        for pk, name in Service.objects.filter(
+                barbershop=self.barbershop, name__in=list(rows)).order_by('-pk').values_list('pk', 'name'):
+            # Com nomes repetidos na barbearia, atualiza o serviço mais antigo
+            existing[name] = pk
+        updates, creates = [], []
+        for name, (_, values) in rows.items():
+            service = Service(barbershop=self.barbershop, **values)
+            if name in existing:
+                service.pk = existing[name]
+                updates.append(service)
+            else:
+                creates.append(service)
+        Service.objects.bulk_update(updates, ['description', 'price', 'duration', 'is_active'])
+        Service.objects.bulk_create(creates)
+        result.updated += len(updates)
+        result.created += len(creates)
+
+    def finish(self, result):
+        _invalidate_barbershop_caches(self.barbershop.pk)
+
+
+class AppointmentImporter(CsvImporter):
+    required_columns = ('date', 'time', 'client_phone', 'employee_phone', 'service')
+    optional_columns = ('client_name', 'status')
+
+    def __init__(self, barbershop):
+        super().__init__(barbershop)
+        self.employees = dict(
+            Employee.objects.filter(barbershop=barbershop).values_list('phone', 'pk'))
+        self.services = {}
+        for pk, name in Service.objects.filter(
+                barbershop=barbershop).order_by('-pk').values_list('pk', 'name'):
+            self.services[name.lower()] = pk
+        self.first_date = self.last_date = None
+
+    def prepare(self, row):
+        employee_id = self.employees.get(row['employee_phone'])
+        if employee_id is None:
+            raise ImportRowError(f'employee_phone: funcionário {row["employee_phone"]!r} não encontrado.')
+        service_id = self.services.get(row['service'].lower())
+        if service_id is None:
+            raise ImportRowError(f'service: serviço {row["service"]!r} não encontrado.')
+        values = {
+            'date': _clean_date(Appointment, 'date', row['date']),
+            'time': _clean(Appointment, 'time', row['time']),
+            'status': _clean_choice(Appointment, 'status', row['status'] or 'scheduled'),
+            'employee_id': employee_id,
+            'service_id': service_id,
+            'client_phone': _clean(Client, 'phone', row['client_phone']),
+            'client_name': row['client_name'],
+        }
+        if values['status'] == 'cancelled':
+            # Cancelamentos não ocupam o horário e podem se repetir
+            return object(), values
+        return (employee_id, values['date'], values['time']), values
+
+    def _client_ids(self, rows):
+        """Resolve os clientes pelo telefone, criando os que têm ``client_name``."""
+        phones = {values['client_phone'] for _, values in rows.values()}
+        clients = dict(Client.objects.filter(
+            barbershop=self.barbershop, phone__in=phones).values_list('phone', 'pk'))
+        names = {values['client_phone']: values['client_name'] for _, values in rows.values()
+                 if values['client_phone'] not in clients and values['client_name']}
+        if names:
+            Client.objects.bulk_create(
+                [Client(barbershop=self.barbershop, name=name, phone=phone)
+                 for phone, name in names.items()],
+                ignore_conflicts=True)
+            clients.update(Client.objects.filter(
+                barbershop=self.barbershop, phone__in=list(names)).values_list('phone', 'pk'))
+        return clients
+
+    def write(self, rows, result):
+        occupied = set(Appointment.objects.filter(
+            employee_id__in={values['employee_id'] for _, values in rows.values()},
+            date__in={values['date'] for _, values in rows.values()},
+        ).exclude(status='cancelled').values_list('employee_id', 'date', 'time'))
+        clients = self._client_ids(rows)
+
+        appointments = []
+        for key, (line, values) in rows.items():
+            client_id = clients.get(values['client_phone'])
+            if client_id is None:
+                result.add_error(line, f'client_phone: cliente {values["client_phone"]!r} não '
+                                       'encontrado (informe client_name para cadastrá-lo).')
+            elif key in occupied:
+                result.skipped += 1
+            else:
+                appointments.append(Appointment(
+                    barbershop=self.barbershop, client_id=client_id, employee_id=values['employee_id'],
+                    service_id=values['service_id'], date=values['date'], time=values['time'],
+                    status=values['status']))
+        # Um agendamento gravado por outra requisição durante a importação é
+        # ignorado: conta-se o que de fato entrou, e o restante é pulado
+        chunk = Appointment.objects.filter(
+            barbershop=self.barbershop,
+            employee_id__in={appointment.employee_id for appointment in appointments},
+            date__in={appointment.date for appointment in appointments})
+        existing = chunk.count()
+        Appointment.objects.bulk_create(appointments, ignore_conflicts=True)
+        created = chunk.count() - existing
+        result.created += created
+        result.skipped += len(appointments) - created
+        if appointments:
+            dates = [appointment.date for appointment in appointments]
+            self.first_date = min(dates + [self.first_date or dates[0]])
+            self.last_date = max(dates + [self.last_date or dates[0]])
+
+    def finish(self, result):
+        _invalidate_barbershop_caches(self.barbershop.pk)
+        if self.first_date is not None:
+            rebuild_rollups([self.barbershop.pk], self.first_date, self.last_date)
+
+
+def _invalidate_barbershop_caches(barbershop_id):
+    """Faz o que os sinais fariam depois de gravações em massa na barbearia."""
+    invalidate_barbershop(barbershop_id)
+    invalidate_presentation(barbershop_id)
+    invalidate_dashboard(barbershop_id)
+
+
+IMPORTERS = {
+    'clients': ClientImporter,
+    'employees': EmployeeImporter,
+    'services': ServiceImporter,
+    'appointments': AppointmentImporter,
+}
+
+IMPORT_KINDS = [
+    ('clients', 'Clientes'),
+    ('employees', 'Funcionários'),
+    ('services', 'Serviços'),
+    ('appointments', 'Agendamentos'),
+]
+
+
+def import_csv(barbershop, kind, stream, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Importa o CSV ``stream`` do tipo ``kind`` (veja ``IMPORTERS``) na barbearia.
+
+    Returns:
+        ImportResult: totais de linhas criadas, atualizadas e ignoradas e os
+        erros por linha.
+
+    Raises:
+        ImportFileError: se o arquivo não puder ser importado.
+    """
+    with use_barbershop_shard(barbershop.pk):
+        return IMPORTERS[kind](barbershop).run(stream, chunk_size)
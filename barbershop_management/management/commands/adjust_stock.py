@@ -0,0 +1,38 @@
+import csv
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from barbershop_management.models import Barbershop
+from barbershop_management.stock import StockAdjustmentError, adjust_stock, parse_adjustments
+
+
+class Command(BaseCommand):
+    help = ('Aplica ajustes de estoque em massa a partir de um CSV com as colunas "id" e '
+            '"delta", em uma única transação')
+
+    def add_arguments(self, parser):
+        parser.add_argument('barbershop', type=int, help='ID da barbearia')
+        parser.add_argument('file', help='Arquivo CSV com os ajustes ("-" para a entrada padrão)')
+        parser.add_argument('--allow-negative', action='store_true',
+                            help='Permite que itens fiquem com quantidade negativa')
+
+    def handle(self, *args, **options):
+        if not Barbershop.objects.filter(pk=options['barbershop']).exists():
+            raise CommandError(f'Barbearia {options["barbershop"]} não encontrada.')
+        try:
+            if options['file'] == '-':
+                rows = list(csv.DictReader(sys.stdin))
+            else:
+                with open(options['file'], newline='', encoding='utf-8') as csv_file:
+                    rows = list(csv.DictReader(csv_file))
+        except OSError as error:
+            raise CommandError(f'Não foi possível ler o arquivo: {error}')
+
+        try:
+            quantities = adjust_stock(
+                options['barbershop'], parse_adjustments(rows), options['allow_negative'])
+        except StockAdjustmentError as error:
+            raise CommandError(f'{error} Nenhum ajuste foi aplicado.')
+        self.stdout.write(self.style.SUCCESS(
+            f'Estoque ajustado em {len(quantities)} item(ns)'))
@@ -0,0 +1,103 @@
+import resource
+import sys
+import time
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from barbershop_booking.models import Appointment, Client
+from barbershop_management.exports import iter_csv
+from barbershop_management.models import Barbershop, Employee, Service
+
+# Horários por dia na agenda sintética (um a cada 15 minutos)
+SLOTS_PER_DAY = 96
+
+
+def peak_rss_mb():
+    """Pico de memória residente do processo, em MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é informado em bytes no macOS e em KB no Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def populate_appointments(barbershop, client, employee, service, count):
+    """
+    Insere ``count`` agendamentos sintéticos com uma única instrução
+    ``INSERT ... SELECT`` sobre uma CTE recursiva, sem passar pelo Python.
+    """
+    table = Appointment._meta.db_table
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'''
+            INSERT INTO {table}
+                (client_id, employee_id, service_id, barbershop_id, date, time,
+                 created_at, updated_at, status)
+            WITH RECURSIVE seq(n) AS (
+                SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < %s
+            )
+            SELECT %s, %s, %s, %s,
+                   date(%s, '+' || (n / {SLOTS_PER_DAY}) || ' days'),
+                   printf('%%02d:%%02d:00', (n %% {SLOTS_PER_DAY}) / 4, (n %% 4) * 15),
+                   %s, %s, 'completed'
+            FROM seq
+            ''',
+            [count - 1, client.pk, employee.pk, service.pk, barbershop.pk,
+             date(2000, 1, 1).isoformat(), now, now])
+
+
+class Command(BaseCommand):
+    help = ('Mede a memória da exportação CSV de agendamentos sobre uma agenda sintética. '
+            'Os dados são criados em uma transação desfeita ao final (apenas SQLite).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=1_000_000,
+                            help='Quantidade de agendamentos sintéticos')
+        parser.add_argument('--max-rss-mb', type=float, default=64,
+                            help='Aumento máximo aceito no pico de memória, em MB')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('O benchmark usa funções de data do SQLite.')
+        if options['count'] < 1:
+            raise CommandError('--count deve ser positivo.')
+
+        with transaction.atomic():
+            owner = User.objects.create_user(username=f'benchmark-export-{time.time_ns()}')
+            barbershop = Barbershop.objects.create(
+                name=f'Benchmark {owner.username}', owner=owner, address='-', phone='0',
+                email='benchmark@example.com')
+            client = Client.objects.create(name='Cliente', phone='11900000000', barbershop=barbershop)
+            employee = Employee.objects.create(
+                name='Funcionário', phone='+5511900000000', barbershop=barbershop,
+                role='barber', hire_date=date(2000, 1, 1))
+            service = Service.objects.create(
+                barbershop=barbershop, name='Corte', description='', price=30, duration=15)
+
+            started = time.monotonic()
+            populate_appointments(barbershop, client, employee, service, options['count'])
+            self.stdout.write(
+                f'{options["count"]} agendamentos criados em {time.monotonic() - started:.1f}s')
+
+            baseline = peak_rss_mb()
+            started = time.monotonic()
+            rows = size = 0
+            for line in iter_csv('appointments', barbershop):
+                rows += 1
+                size += len(line)
+            elapsed = time.monotonic() - started
+            growth = peak_rss_mb() - baseline
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f'{rows - 1} linhas ({size / (1024 * 1024):.1f} MB) exportadas em {elapsed:.1f}s; '
+            f'pico de memória +{growth:.1f} MB')
+        if rows - 1 != options['count']:
+            raise CommandError(f'Esperadas {options["count"]} linhas, exportadas {rows - 1}.')
+        if growth > options['max_rss_mb']:
+            raise CommandError(
+                f'O pico de memória cresceu {growth:.1f} MB (limite: {options["max_rss_mb"]} MB).')
+        self.stdout.write(self.style.SUCCESS('Memória dentro do limite'))
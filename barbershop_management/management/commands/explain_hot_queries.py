@@ -0,0 +1,121 @@
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from barbershop_booking.availability import (active_employees_query, busy_by_day_query,
+                                             busy_by_employee_query)
+from barbershop_booking.reminders import entering_window
+from barbershop_booking.tenancy import lookup_queries
+from barbershop_booking.views import (SCHEDULE_ITEM_FIELDS, SCHEDULE_PAGE_SIZE, client_by_phone_query,
+                                      schedule_page_query)
+from barbershop_management.forms import InventorySearchForm
+from barbershop_management.models import Barbershop, DayOfWeek, Expense, Inventory
+from barbershop_management.pagination import encode_cursor, keyset_page_query
+from barbershop_management.schedule import weekly_opening_hours_query
+from barbershop_management.stats import (dashboard_stats_query, get_periods, owner_stats_queries,
+                                         recent_items_queries)
+from barbershop_management.views import EXPENSE_ORDERING, INVENTORY_ORDERING, employee_list_query
+
+# Tabelas pequenas e de tamanho fixo, em que uma varredura completa é aceitável
+SMALL_TABLES = {DayOfWeek._meta.db_table}
+
+
+def hot_queries():
+    """
+    Consultas mais frequentes de ``barbershop_booking.views`` e
+    ``barbershop_management.views``, com parâmetros representativos.
+
+    As consultas vêm das mesmas funções usadas pelas views, por
+    ``availability.py`` e por ``stats.py``, de modo que o plano analisado é o
+    das consultas executadas em produção.
+    """
+    today = date(2024, 9, 2)
+    barbershop = Barbershop(pk=1)
+    slug_query, old_slug_query = lookup_queries('barbearia-teste')
+    (code_query,) = lookup_queries('4a7f5c3e-2b1d-4c6a-9e8f-0d1c2b3a4f5e')
+    low_stock = InventorySearchForm({'low_stock': 'on'})
+    low_stock.is_valid()
+    queries = [
+        ('booking: barbearia pelo slug da URL', slug_query),
+        ('booking: barbearia por um slug anterior', old_slug_query),
+        ('booking: barbearia pelo código da URL', code_query),
+        ('booking: agenda do funcionário no período (disponibilidade)',
+         busy_by_day_query(1, today, today + timedelta(days=30))),
+        ('booking: agenda de todos os funcionários no dia',
+         busy_by_employee_query([1, 2, 3], today)),
+        ('booking: agenda do funcionário (employee_schedule)',
+         schedule_page_query(barbershop, 1, today, today + timedelta(days=30), None)
+         .values_list(*SCHEDULE_ITEM_FIELDS)[:SCHEDULE_PAGE_SIZE + 1]),
+        ('booking: agenda do funcionário após o cursor',
+         schedule_page_query(barbershop, 1, today, today + timedelta(days=30),
+                             (today, datetime(2024, 9, 2, 10, 0).time(), 100))
+         .values_list(*SCHEDULE_ITEM_FIELDS)[:SCHEDULE_PAGE_SIZE + 1]),
+        ('booking: cliente por telefone', client_by_phone_query(barbershop, '11999999999')),
+        ('booking: funcionamento semanal da barbearia', weekly_opening_hours_query(barbershop.pk)),
+        ('booking: funcionários ativos da barbearia', active_employees_query(barbershop)),
+        ('booking: agendamentos entrando na janela de lembrete',
+         entering_window(timezone.make_aware(datetime(2024, 9, 2, 10, 0)),
+                         timezone.make_aware(datetime(2024, 9, 3, 10, 1)))
+         .values_list('id', 'client_id')),
+        ('management: métricas do dashboard (subconsultas por barbearia)',
+         dashboard_stats_query(Barbershop.objects.filter(pk=barbershop.pk), today)),
+    ]
+    queries += [
+        (f'management: dashboard, {name}', queryset)
+        for name, queryset in recent_items_queries(barbershop.pk).items()
+    ]
+    queries += [
+        (f'management: painel dos donos, {table} agrupados por barbearia', queryset)
+        for table, queryset in owner_stats_queries([1, 2, 3], get_periods(today)['month']).items()
+    ]
+    queries += [
+        ('management: próximo agendamento por funcionário', employee_list_query(barbershop, today)),
+        ('management: despesas, primeira página',
+         keyset_page_query(Expense.objects.filter(barbershop=barbershop), EXPENSE_ORDERING)),
+        ('management: despesas, página após o cursor',
+         keyset_page_query(Expense.objects.filter(barbershop=barbershop), EXPENSE_ORDERING,
+                           encode_cursor([today, 100]))),
+        ('management: itens com estoque baixo',
+         keyset_page_query(low_stock.filter(Inventory.objects.filter(barbershop=barbershop)),
+                           INVENTORY_ORDERING)),
+    ]
+    return queries
+
+
+def full_scans(plan):
+    """Retorna as linhas do plano que varrem uma tabela inteira."""
+    scans = []
+    for line in plan.splitlines():
+        detail = line.strip()
+        if ' SCAN ' not in f' {detail} ' or 'SCAN CONSTANT ROW' in detail:
+            continue
+        table = detail.split('SCAN ', 1)[1].split()[0]
+        if table not in SMALL_TABLES:
+            scans.append(detail)
+    return scans
+
+
+class Command(BaseCommand):
+    help = 'Executa EXPLAIN QUERY PLAN nas consultas mais frequentes e falha se alguma varrer uma tabela inteira'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Este comando analisa planos do SQLite (EXPLAIN QUERY PLAN).')
+
+        failures = []
+        for name, queryset in hot_queries():
+            plan = queryset.explain()
+            scans = full_scans(plan)
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{name}\n{plan}\n')
+            if scans:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f'FULL SCAN  {name}: {"; ".join(scans)}'))
+            else:
+                self.stdout.write(f'ok         {name}')
+
+        if failures:
+            raise CommandError(f'{len(failures)} consulta(s) fazem varredura completa de tabela.')
+        self.stdout.write(self.style.SUCCESS('Nenhuma consulta frequente faz varredura completa'))
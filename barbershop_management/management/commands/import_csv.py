@@ -0,0 +1,44 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from barbershop_management.importers import IMPORT_CHUNK_SIZE, IMPORTERS, ImportFileError, import_csv
+from barbershop_management.models import Barbershop
+
+
+class Command(BaseCommand):
+    help = 'Importa clientes, funcionários, serviços ou agendamentos de um arquivo CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('barbershop', type=int, help='ID da barbearia')
+        parser.add_argument('kind', choices=sorted(IMPORTERS), help='Tipo de registro importado')
+        parser.add_argument('file', help='Arquivo CSV ("-" para a entrada padrão)')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE,
+                            help='Linhas gravadas por transação')
+
+    def handle(self, *args, **options):
+        barbershop = Barbershop.objects.filter(pk=options['barbershop']).first()
+        if barbershop is None:
+            raise CommandError(f'Barbearia {options["barbershop"]} não encontrada.')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size deve ser positivo.')
+
+        started = time.monotonic()
+        try:
+            if options['file'] == '-':
+                result = import_csv(barbershop, options['kind'], sys.stdin, options['chunk_size'])
+            else:
+                with open(options['file'], newline='', encoding='utf-8-sig') as csv_file:
+                    result = import_csv(barbershop, options['kind'], csv_file, options['chunk_size'])
+        except OSError as error:
+            raise CommandError(f'Não foi possível ler o arquivo: {error}')
+        except ImportFileError as error:
+            raise CommandError(str(error))
+
+        for line, message in result.errors:
+            self.stderr.write(f'Linha {line}: {message}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.rows} linha(s) em {time.monotonic() - started:.1f}s: '
+            f'{result.created} criada(s), {result.updated} atualizada(s), '
+            f'{result.skipped} ignorada(s), {len(result.errors)} com erro'))
@@ -0,0 +1,11 @@
+from django.core.management.commands.migrate import Command as MigrateCommand
+
+from setup.routers import migrating
+
+
+class Command(MigrateCommand):
+    # O migrate do Django, com as consultas das migrações de dados (RunPython) enviadas
+    # ao banco migrado até o fim do comando, mesmo se uma migração falhar
+    def handle(self, *args, **options):
+        with migrating(options['database']):
+            return super().handle(*args, **options)
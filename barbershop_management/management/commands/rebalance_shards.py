@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from barbershop_management.models import Barbershop
+from barbershop_management.sharding import (move_barbershop, placement, shard_for,
+                                            sharding_enabled, tenant_databases)
+
+
+class Command(BaseCommand):
+    help = ('Move os dados das barbearias para o shard escolhido pelo código de cada uma (ou '
+            'para --to) e atualiza o diretório de shards. Execute sem escritas nas barbearias '
+            'movidas; uma execução interrompida pode ser repetida.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--barbershop', type=int, action='append', dest='barbershops',
+                            help='ID da barbearia (pode ser repetido); por padrão, todas')
+        parser.add_argument('--to', dest='target',
+                            help='Banco de destino (um shard ou "default"); exige --barbershop')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Apenas lista as barbearias que seriam movidas')
+
+    def handle(self, *args, **options):
+        if not sharding_enabled():
+            raise CommandError('Sharding desativado: defina DJANGO_SHARDS.')
+        target = options['target']
+        if target is not None:
+            if target not in tenant_databases():
+                raise CommandError(f'Banco desconhecido: {target}.')
+            if not options['barbershops']:
+                raise CommandError('--to exige --barbershop.')
+
+        barbershops = Barbershop.objects.using(DEFAULT_DB_ALIAS).order_by('pk')
+        if options['barbershops']:
+            barbershops = barbershops.filter(pk__in=options['barbershops'])
+        moved = rows = 0
+        for barbershop in barbershops.iterator():
+            source = shard_for(barbershop.pk)
+            destination = target or placement(barbershop.code)
+            if source == destination:
+                continue
+            moved += 1
+            if options['dry_run']:
+                self.stdout.write(f'{barbershop.name} (#{barbershop.pk}): {source} -> {destination}')
+                continue
+            started = time.monotonic()
+            copied = move_barbershop(barbershop, destination)
+            rows += copied
+            self.stdout.write(
+                f'{barbershop.name} (#{barbershop.pk}): {source} -> {destination}, '
+                f'{copied} linha(s) em {time.monotonic() - started:.1f}s')
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'{moved} barbearia(s) seriam movidas'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'{moved} barbearia(s) movida(s), {rows} linha(s) copiada(s)'))
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from barbershop_management.rollups import rebuild_rollups
+from barbershop_management.sharding import tenant_databases, use_shard
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Data inválida: {value} (use AAAA-MM-DD).')
+
+
+class Command(BaseCommand):
+    help = 'Recalcula os consolidados diários de receitas e despesas a partir dos dados brutos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--barbershop', type=int, action='append', dest='barbershops',
+                            help='ID da barbearia (pode ser repetido); por padrão, todas')
+        parser.add_argument('--start', type=_parse_date, help='Data inicial (AAAA-MM-DD)')
+        parser.add_argument('--end', type=_parse_date, help='Data final (AAAA-MM-DD)')
+
+    def handle(self, *args, **options):
+        if options['start'] and options['end'] and options['end'] < options['start']:
+            raise CommandError('A data final deve ser posterior à data inicial.')
+        revenue_rows = expense_rows = 0
+        for alias in tenant_databases():
+            with use_shard(alias):
+                revenues, expenses = rebuild_rollups(
+                    options['barbershops'], options['start'], options['end'])
+            revenue_rows += revenues
+            expense_rows += expenses
+        self.stdout.write(self.style.SUCCESS(
+            f'Consolidados recalculados: {revenue_rows} linha(s) de receita, '
+            f'{expense_rows} linha(s) de despesa'))
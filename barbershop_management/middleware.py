@@ -1,14 +1,116 @@
+"""
+Barbearia ativa da requisição (``request.current_barbershop``).
+
+A barbearia escolhida pelo dono fica na sessão (``barbershop_id``, gravada
+pela view ``switch_barbershop``). O middleware não consulta nada: o atributo
+é um ``SimpleLazyObject``, resolvido apenas quando a view ou o template o
+lê. Como o objeto é um proxy, teste-o pela veracidade (``if
+request.current_barbershop``), não com ``is None``. A resolução usa o ORM
+síncrono; views ``async`` não devem lê-lo.
+
+A barbearia resolvida fica em um cache do processo, por ``(usuário,
+barbearia)``, junto com a versão da barbearia no cache do Django. Salvar ou
+excluir a barbearia (sinais em ``signals.py``) remove as entradas deste
+processo e incrementa a versão, invalidando as entradas dos demais.
+
+Com sharding, o middleware também ativa, antes da view, o shard da barbearia
+da URL (``barbershop_id``) ou, nas demais rotas, o da barbearia ativa da
+sessão (veja ``sharding.py``).
+"""
+import copy
+import threading
+from collections import OrderedDict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.functional import SimpleLazyObject
+
 from .models import Barbershop
+from .sharding import activate_shard, shard_for, sharding_enabled
+from .versioning import bump_version, get_version
+
+SESSION_KEY = 'barbershop_id'
+
+# Entradas mantidas por processo; as usadas há mais tempo saem primeiro
+CURRENT_BARBERSHOP_CACHE_SIZE = 1024
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _version_key(barbershop_id):
+    return f'barbershop:version:{barbershop_id}'
+
+
+def invalidate_current_barbershop(barbershop_id):
+    """Descarta a barbearia ``barbershop_id`` em cache, para todos os usuários."""
+    with _cache_lock:
+        for key in [key for key in _cache if key[1] == barbershop_id]:
+            del _cache[key]
+    bump_version(_version_key(barbershop_id))
+
+
+def clear_current_barbershop_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def get_current_barbershop(request):
+    """
+    Retorna a barbearia ativa do usuário logado, ou ``None`` se não houver
+    (usuário anônimo, nenhuma barbearia escolhida ou barbearia que não é
+    mais dele).
+    """
+    if not request.user.is_authenticated:
+        return None
+    barbershop_id = request.session.get(SESSION_KEY)
+    if not barbershop_id:
+        return None
+
+    key = (request.user.pk, barbershop_id)
+    version = get_version(_version_key(barbershop_id))
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == version:
+            _cache.move_to_end(key)
+            barbershop = cached[1]
+            # Cópia: alterações feitas pela view não vazam para outras requisições
+            return copy.copy(barbershop) if barbershop is not None else None
+
+    barbershop = Barbershop.objects.filter(id=barbershop_id, owner=request.user).first()
+    with _cache_lock:
+        _cache[key] = (version, barbershop)
+        _cache.move_to_end(key)
+        while len(_cache) > CURRENT_BARBERSHOP_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return copy.copy(barbershop) if barbershop is not None else None
+
+
+def set_current_barbershop(request, barbershop):
+    """Torna ``barbershop`` a barbearia ativa da sessão."""
+    request.session[SESSION_KEY] = barbershop.pk
+    request.current_barbershop = barbershop
+
 
 class BarbershopMiddleware:
+    # Não faz E/S: sob ASGI roda no event loop, sem trocar de thread
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        if request.user.is_authenticated:
-            barbershop_id = request.session.get('barbershop_id')
-            if barbershop_id:
-                request.current_barbershop = Barbershop.objects.filter(id=barbershop_id, owner=request.user).first()
-            else:
-                request.current_barbershop = None
+        request.current_barbershop = SimpleLazyObject(lambda: get_current_barbershop(request))
+        # A thread do worker é reaproveitada: nada fica ativo da requisição anterior
+        activate_shard(None)
         return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not sharding_enabled():
+            return None
+        barbershop_id = view_kwargs.get('barbershop_id') or request.session.get(SESSION_KEY)
+        if barbershop_id:
+            activate_shard(shard_for(barbershop_id))
+        return None
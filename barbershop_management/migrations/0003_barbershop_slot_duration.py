@@ -0,0 +1,18 @@
+# Generated by Django 5.1 on 2026-10-18 16:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barbershop_management', '0002_barbershop_slug'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='barbershop',
+            name='slot_duration',
+            field=models.PositiveSmallIntegerField(default=30, help_text='Intervalo, em minutos, entre os horários oferecidos para agendamento', verbose_name='Intervalo entre horários'),
+        ),
+    ]
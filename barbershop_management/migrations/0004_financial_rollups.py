@@ -0,0 +1,47 @@
+# Generated by Django 5.1 on 2026-10-18 16:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barbershop_management', '0003_barbershop_slot_duration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyExpense',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('expense_type', models.CharField(choices=[('supplies', 'Supplies'), ('equipment', 'Equipment'), ('utilities', 'Utilities'), ('rent', 'Rent'), ('salary', 'Salary'), ('other', 'Other')], max_length=20)),
+                ('expenses_count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('barbershop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_expenses', to='barbershop_management.barbershop')),
+            ],
+            options={
+                'verbose_name': 'Despesa diária',
+                'verbose_name_plural': 'Despesas diárias',
+                'constraints': [models.UniqueConstraint(fields=('barbershop', 'date', 'expense_type'), name='unique_daily_expense')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('appointments_count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('barbershop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_revenues', to='barbershop_management.barbershop')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='barbershop_management.employee')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='barbershop_management.service')),
+            ],
+            options={
+                'verbose_name': 'Receita diária',
+                'verbose_name_plural': 'Receitas diárias',
+                'constraints': [models.UniqueConstraint(fields=('barbershop', 'date', 'service', 'employee'), name='unique_daily_revenue')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1 on 2026-10-18 16:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barbershop_management', '0004_financial_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['barbershop', 'name'], name='employee_shop_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['barbershop', 'date'], name='expense_shop_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inventory',
+            index=models.Index(fields=['barbershop', 'name'], name='inventory_shop_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['barbershop', 'name'], name='service_shop_name_idx'),
+        ),
+    ]
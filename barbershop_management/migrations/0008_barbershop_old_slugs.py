@@ -0,0 +1,26 @@
+# Generated by Django 5.1 on 2026-10-18 18:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barbershop_management', '0007_shard_assignment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BarbershopSlug',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(unique=True)),
+                ('barbershop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='old_slugs', to='barbershop_management.barbershop')),
+            ],
+            options={
+                'verbose_name': 'Slug anterior da barbearia',
+                'verbose_name_plural': 'Slugs anteriores das barbearias',
+            },
+        ),
+    ]
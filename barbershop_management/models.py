@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, router
+from django.db.models import F, Q
 from django.contrib.auth.models import User
 import uuid
 from django.utils import timezone
@@ -8,6 +9,21 @@ from django.utils.text import slugify
 # Create your models here.
 
 
+def load_stored_values(instance, save_kwargs):
+    """
+    Guarda em ``instance._loaded_values`` os valores gravados da linha, quando
+    uma instância montada à mão (``Model(pk=..., ...)``) é salva sobre uma linha
+    existente. Os sinais comparam esses valores com os novos; sem eles, a
+    alteração seria tratada como um registro novo.
+    """
+    if instance.pk is None or hasattr(instance, '_loaded_values') or save_kwargs.get('force_insert'):
+        return
+    model = type(instance)
+    using = save_kwargs.get('using') or router.db_for_write(model, instance=instance)
+    instance._loaded_values = model._base_manager.using(using).filter(pk=instance.pk).values(
+        *[field.attname for field in model._meta.concrete_fields]).first()
+
+
 class Barbershop(models.Model):
     name = models.CharField(max_length=100)
     address = models.CharField(max_length=200)
@@ -19,6 +35,10 @@ class Barbershop(models.Model):
     code = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     is_open = models.BooleanField(default=True, verbose_name="Aberto")
     slug = models.SlugField(unique=True, blank=True)
+    slot_duration = models.PositiveSmallIntegerField(
+        default=30,
+        verbose_name="Intervalo entre horários",
+        help_text="Intervalo, em minutos, entre os horários oferecidos para agendamento")
     
     DAYS_OF_WEEK = [
         (0, 'Segunda-feira'),
@@ -38,10 +58,41 @@ class Barbershop(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Valores carregados do banco, usados para detectar renomeações
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
+        loaded = getattr(self, '_loaded_values', {})
+        # O slug acompanha o nome, para que links com o nome continuem resolvendo
+        if not self.slug or self.name != loaded.get('name', self.name):
+            self.slug = self._unique_slug(
+                kwargs.get('using') or router.db_for_write(Barbershop, instance=self))
         super().save(*args, **kwargs)
+        previous = loaded.get('slug')
+        if previous and previous != self.slug:
+            # O slug anterior continua resolvendo e redireciona para o atual
+            old_slugs = BarbershopSlug.objects.using(self._state.db)
+            old_slugs.filter(slug=self.slug).delete()
+            old_slugs.update_or_create(slug=previous, defaults={'barbershop': self})
+        self._loaded_values = {field.attname: getattr(self, field.attname)
+                               for field in self._meta.concrete_fields}
+
+    def _unique_slug(self, using):
+        """Slug do nome, com sufixo numérico se já for (ou tiver sido) de outra barbearia."""
+        base = slugify(self.name) or 'barbearia'
+        taken = set(Barbershop.objects.using(using).filter(slug__startswith=base).exclude(
+            pk=self.pk).values_list('slug', flat=True))
+        taken.update(BarbershopSlug.objects.using(using).filter(slug__startswith=base).exclude(
+            barbershop_id=self.pk).values_list('slug', flat=True))
+        slug, suffix = base, 1
+        while slug in taken:
+            suffix += 1
+            slug = f'{base}-{suffix}'
+        return slug
 
 
 class Employee(models.Model):
@@ -93,6 +144,9 @@ class Employee(models.Model):
         ordering = ['name']
         # Garante que um funcionário é único por telefone e barbearia
         unique_together = ['phone', 'barbershop']
+        indexes = [
+            models.Index(fields=['barbershop', 'name'], name='employee_shop_name_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.get_role_display()}"
@@ -110,6 +164,11 @@ class Service(models.Model):
     duration = models.IntegerField(help_text="Duration in minutes")
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['barbershop', 'name'], name='service_shop_name_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} - {self.barbershop.name}"
 
@@ -177,9 +236,28 @@ class Expense(models.Model):
     expense_type = models.CharField(max_length=20, choices=EXPENSE_TYPES)
     notes = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['barbershop', 'date'], name='expense_shop_date_idx'),
+        ]
+
     def __str__(self):
         return f"{self.description} - {self.barbershop.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Valores carregados do banco, usados pelos sinais para atualizar os consolidados
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        load_stored_values(self, kwargs)
+        super().save(*args, **kwargs)
+        # Os sinais já usaram os valores anteriores; os salvos passam a ser os carregados
+        self._loaded_values = {field.attname: getattr(self, field.attname)
+                               for field in self._meta.concrete_fields}
+
 
 class Inventory(models.Model):
     """
@@ -194,12 +272,16 @@ class Inventory(models.Model):
         reorder_level (IntegerField): Nível mínimo de estoque para reabastecimento.
         unit_price (DecimalField): Preço unitário do item.
         last_restocked (DateField): Data da última reposição de estoque.
+        is_low_stock (GeneratedField): Coluna calculada pelo banco, verdadeira
+            quando ``quantity <= reorder_level``.
 
     Métodos:
         __str__: Retorna uma representação em string do item de inventário.
 
     Meta:
         verbose_name_plural: Define o nome plural para "Inventories" na interface admin.
+        indexes: O índice parcial ``inventory_low_stock_idx`` contém apenas os
+            itens com estoque baixo, de modo que listá-los não percorre o inventário.
     """
 
     barbershop = models.ForeignKey(
@@ -209,12 +291,22 @@ class Inventory(models.Model):
     reorder_level = models.IntegerField()
     unit_price = models.DecimalField(max_digits=6, decimal_places=2)
     last_restocked = models.DateField(auto_now=True)
+    is_low_stock = models.GeneratedField(
+        expression=Q(quantity__lte=F('reorder_level')),
+        output_field=models.BooleanField(),
+        db_persist=True,
+    )
 
     def __str__(self):
         return f"{self.name} - {self.barbershop.name}"
 
     class Meta:
         verbose_name_plural = "Inventories"
+        indexes = [
+            models.Index(fields=['barbershop', 'name'], name='inventory_shop_name_idx'),
+            models.Index(fields=['barbershop', 'name'], name='inventory_low_stock_idx',
+                         condition=Q(is_low_stock=True)),
+        ]
 
 
 class DayOfWeek(models.Model):
@@ -232,3 +324,121 @@ class DayOfWeek(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class DailyRevenue(models.Model):
+    """
+    Receita consolidada por dia, serviço e funcionário.
+
+    Soma os agendamentos concluídos, com o preço do serviço no momento da
+    conclusão. Mantida incrementalmente pelos sinais de ``Appointment`` e
+    reconstruída pelo comando ``rebuild_financial_rollups``.
+
+    Attributes:
+        barbershop (ForeignKey): Barbearia do agendamento.
+        date (DateField): Data do agendamento.
+        service (ForeignKey): Serviço realizado.
+        employee (ForeignKey): Funcionário que realizou o serviço.
+        appointments_count (IntegerField): Quantidade de agendamentos concluídos.
+        revenue (DecimalField): Soma dos preços dos serviços.
+    """
+    barbershop = models.ForeignKey(
+        Barbershop, on_delete=models.CASCADE, related_name='daily_revenues')
+    date = models.DateField()
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='+')
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='+')
+    appointments_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = "Receita diária"
+        verbose_name_plural = "Receitas diárias"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['barbershop', 'date', 'service', 'employee'],
+                name='unique_daily_revenue'),
+        ]
+
+    def __str__(self):
+        return f"{self.barbershop_id} - {self.date}: {self.revenue}"
+
+
+class DailyExpense(models.Model):
+    """
+    Despesas consolidadas por dia e tipo.
+
+    Mantida incrementalmente pelos sinais de ``Expense`` e reconstruída pelo
+    comando ``rebuild_financial_rollups``.
+
+    Attributes:
+        barbershop (ForeignKey): Barbearia da despesa.
+        date (DateField): Data da despesa.
+        expense_type (CharField): Tipo da despesa (``Expense.EXPENSE_TYPES``).
+        expenses_count (IntegerField): Quantidade de despesas.
+        amount (DecimalField): Soma dos valores.
+    """
+    barbershop = models.ForeignKey(
+        Barbershop, on_delete=models.CASCADE, related_name='daily_expenses')
+    date = models.DateField()
+    expense_type = models.CharField(max_length=20, choices=Expense.EXPENSE_TYPES)
+    expenses_count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name = "Despesa diária"
+        verbose_name_plural = "Despesas diárias"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['barbershop', 'date', 'expense_type'], name='unique_daily_expense'),
+        ]
+
+    def __str__(self):
+        return f"{self.barbershop_id} - {self.date}: {self.amount}"
+
+
+class ShardAssignment(models.Model):
+    """
+    Diretório de shards: banco que guarda os dados de cada barbearia.
+
+    Fica sempre em ``default``. Barbearias sem entrada continuam em
+    ``default``; veja ``sharding.py`` e o comando ``rebalance_shards``.
+
+    Attributes:
+        barbershop (OneToOneField): Barbearia.
+        alias (CharField): Alias do banco em ``DATABASES`` (``shard_0``, ...).
+        updated_at (DateTimeField): Data e hora da última mudança de banco.
+    """
+    barbershop = models.OneToOneField(
+        Barbershop, on_delete=models.CASCADE, primary_key=True, related_name='shard_assignment')
+    alias = models.CharField(max_length=100)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Shard da barbearia"
+        verbose_name_plural = "Shards das barbearias"
+
+    def __str__(self):
+        return f"{self.barbershop_id}: {self.alias}"
+
+
+class BarbershopSlug(models.Model):
+    """
+    Slug anterior de uma barbearia renomeada.
+
+    As URLs públicas com o slug antigo redirecionam para o atual (veja
+    ``barbershop_booking/tenancy.py``). Fica em ``default``, como a barbearia.
+
+    Attributes:
+        barbershop (ForeignKey): Barbearia.
+        slug (SlugField): Slug usado antes da renomeação.
+    """
+    barbershop = models.ForeignKey(
+        Barbershop, on_delete=models.CASCADE, related_name='old_slugs')
+    slug = models.SlugField(unique=True)
+
+    class Meta:
+        verbose_name = "Slug anterior da barbearia"
+        verbose_name_plural = "Slugs anteriores das barbearias"
+
+    def __str__(self):
+        return f"{self.slug} -> {self.barbershop_id}"
@@ -0,0 +1,143 @@
+"""
+Paginação por cursor (keyset) para as listas da área de gestão.
+
+Em vez de ``OFFSET``, cada página continua a partir dos valores de ordenação
+do último item da página anterior, codificados no parâmetro ``cursor``. O
+custo de uma página não depende de quantas páginas vêm antes dela, e a
+ordenação é estável porque a última chave é sempre única (o ``id``).
+As chaves de ordenação não podem ser nulas.
+
+O cursor da página anterior guarda os valores do primeiro item da página e
+a direção: a consulta percorre a ordenação invertida a partir dele, e os
+itens são devolvidos na ordem normal.
+"""
+import base64
+import json
+from collections import namedtuple
+from functools import reduce
+from operator import attrgetter, or_
+
+from django.db.models import Q
+
+PAGE_SIZE = 25
+
+CURSOR_PARAM = 'cursor'
+
+KeysetPage = namedtuple('KeysetPage', ['items', 'next_cursor', 'previous_cursor'])
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _field(model, path):
+    """Resolve ``path`` (por exemplo ``employee__name``) até o campo do modelo."""
+    *relations, name = path.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+def encode_cursor(values, previous=False):
+    """Cursor para os itens após ``values`` ou, com ``previous``, antes deles."""
+    raw = json.dumps({'values': [str(value) for value in values], 'previous': previous}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(model, ordering, cursor):
+    """
+    Converte o cursor de volta para os tipos dos campos de ``ordering``.
+
+    Returns:
+        tuple: (valores de ordenação, se o cursor aponta para a página anterior).
+    """
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        values, previous = raw['values'], raw['previous']
+        if (not isinstance(values, list) or len(values) != len(ordering)
+                or not isinstance(previous, bool)):
+            raise ValueError
+        return [_field(model, key.lstrip('-')).to_python(value)
+                for key, value in zip(ordering, values)], previous
+    except Exception:
+        raise InvalidCursor('Cursor inválido.')
+
+
+def _reversed(ordering):
+    return tuple(key[1:] if key.startswith('-') else f'-{key}' for key in ordering)
+
+
+def _after(ordering, values):
+    """Filtro dos itens posteriores a ``values`` na ordem ``ordering``."""
+    conditions = []
+    for index, key in enumerate(ordering):
+        field = key.lstrip('-')
+        lookup = 'lt' if key.startswith('-') else 'gt'
+        equal = {ordering[i].lstrip('-'): values[i] for i in range(index)}
+        conditions.append(Q(**equal, **{f'{field}__{lookup}': values[index]}))
+    return reduce(or_, conditions)
+
+
+def _page_query(queryset, ordering, values, previous, page_size):
+    if previous:
+        ordering = _reversed(ordering)
+    queryset = queryset.order_by(*ordering)
+    if values is not None:
+        queryset = queryset.filter(_after(ordering, values))
+    return queryset[:page_size + 1]
+
+
+def keyset_page_query(queryset, ordering, cursor=None, page_size=PAGE_SIZE):
+    """
+    Consulta de uma página de ``queryset`` ordenada por ``ordering``, com um
+    item a mais para saber se há outra página na mesma direção. Para o
+    cursor de uma página anterior, a ordenação é invertida.
+
+    Raises:
+        InvalidCursor: se o cursor não puder ser decodificado.
+    """
+    values, previous = decode_cursor(queryset.model, ordering, cursor) if cursor else (None, False)
+    return _page_query(queryset, ordering, values, previous, page_size)
+
+
+def paginate_keyset(queryset, ordering, cursor=None, page_size=PAGE_SIZE):
+    """
+    Retorna uma página de ``queryset`` ordenada por ``ordering``.
+
+    Args:
+        ordering (tuple): campos de ordenação (``-`` para decrescente); o
+            último deve ser único, normalmente ``id`` ou ``-id``.
+        cursor (str): ``next_cursor`` ou ``previous_cursor`` de outra página.
+
+    Returns:
+        KeysetPage: itens da página e os cursores da próxima e da anterior
+        (``None`` na última e na primeira página).
+
+    Raises:
+        InvalidCursor: se o cursor não puder ser decodificado.
+    """
+    values, previous = decode_cursor(queryset.model, ordering, cursor) if cursor else (None, False)
+    items = list(_page_query(queryset, ordering, values, previous, page_size))
+    more = len(items) > page_size
+    items = items[:page_size]
+    if previous:
+        items.reverse()
+    # A página de onde o cursor veio existe: a seguinte, para o cursor de uma
+    # página anterior, ou a anterior, para o cursor de uma próxima página
+    has_next = more or previous
+    has_previous = more if previous else values is not None
+
+    getters = [attrgetter(key.lstrip('-').replace('__', '.')) for key in ordering]
+    next_cursor = previous_cursor = None
+    if items and has_next:
+        next_cursor = encode_cursor([getter(items[-1]) for getter in getters])
+    if items and has_previous:
+        previous_cursor = encode_cursor([getter(items[0]) for getter in getters], previous=True)
+    return KeysetPage(items, next_cursor, previous_cursor)
+
+
+def page_query(request, cursor):
+    """Querystring da página com ``cursor``, mantendo os filtros da requisição."""
+    params = request.GET.copy()
+    params[CURSOR_PARAM] = cursor
+    return params.urlencode()
@@ -0,0 +1,194 @@
+"""
+Consolidados financeiros diários (receitas e despesas) por barbearia.
+
+``DailyRevenue`` e ``DailyExpense`` são atualizados de forma incremental
+pelos sinais em ``signals.py``: cada alteração em um agendamento concluído ou
+em uma despesa retira a contribuição antiga e soma a nova, com ``F()``, sem
+reler os dados brutos. Operações em massa (``update()``, ``bulk_create()``)
+não disparam sinais; depois delas, use o comando
+``rebuild_financial_rollups``. A receita usa o preço guardado no
+agendamento na conclusão (``Appointment.price``), nos dois caminhos: mudar o
+preço do serviço depois não altera a receita já consolidada, e cancelar ou
+excluir o agendamento retira exatamente o valor somado. Agendamentos
+concluídos sem preço guardado (por ``update()``) usam o preço atual do
+serviço.
+
+Os relatórios mensais e anuais leem apenas os consolidados.
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.db import IntegrityError, router, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce, TruncMonth, TruncYear
+
+from barbershop_booking.models import Appointment
+from .models import DailyExpense, DailyRevenue, Expense, Service
+
+REBUILD_BATCH_SIZE = 1000
+
+# Preço de um agendamento concluído, em consultas agregadas
+COMPLETED_PRICE = Coalesce('price', 'service__price')
+
+
+def _apply(model, key, **deltas):
+    """Soma ``deltas`` à linha ``key`` do consolidado, criando-a se necessário."""
+    increments = {field: F(field) + delta for field, delta in deltas.items()}
+    using = router.db_for_write(model)
+    with transaction.atomic(using=using):
+        if model.objects.filter(**key).update(**increments):
+            return
+        try:
+            # Savepoint: outra transação pode criar a mesma linha ao mesmo tempo
+            with transaction.atomic(using=using):
+                model.objects.create(**key, **deltas)
+        except IntegrityError:
+            model.objects.filter(**key).update(**increments)
+
+
+def revenue_contribution(values):
+    """
+    Retorna ``(chave, preço)`` da contribuição de um agendamento à receita,
+    ou ``None`` se ele não está concluído.
+
+    Args:
+        values (dict): valores dos campos do agendamento, por ``attname``.
+    """
+    if values.get('status') != 'completed':
+        return None
+    price = values.get('price')
+    if price is None:
+        price = Service.objects.filter(pk=values['service_id']).values_list(
+            'price', flat=True).first() or Decimal('0')
+    key = {
+        'barbershop_id': values['barbershop_id'],
+        'date': values['date'],
+        'service_id': values['service_id'],
+        'employee_id': values['employee_id'],
+    }
+    return key, price
+
+
+def apply_revenue(contribution, sign):
+    if contribution is not None:
+        key, price = contribution
+        _apply(DailyRevenue, key, appointments_count=sign, revenue=sign * price)
+
+
+def expense_contribution(values):
+    """Retorna ``(chave, valor)`` da contribuição de uma despesa ao consolidado."""
+    key = {
+        'barbershop_id': values['barbershop_id'],
+        'date': values['date'],
+        'expense_type': values['expense_type'],
+    }
+    return key, Decimal(values['amount'])
+
+
+def apply_expense(contribution, sign):
+    if contribution is not None:
+        key, amount = contribution
+        _apply(DailyExpense, key, expenses_count=sign, amount=sign * amount)
+
+
+def rebuild_rollups(barbershop_ids=None, start_date=None, end_date=None):
+    """
+    Recalcula os consolidados a partir dos agendamentos e despesas.
+
+    Args:
+        barbershop_ids (list): restringe às barbearias informadas.
+        start_date, end_date (date): restringe ao período informado.
+
+    Returns:
+        tuple: quantidade de linhas de receita e de despesa gravadas.
+    """
+    filters = {}
+    if barbershop_ids:
+        filters['barbershop_id__in'] = barbershop_ids
+    if start_date:
+        filters['date__gte'] = start_date
+    if end_date:
+        filters['date__lte'] = end_date
+
+    revenues = (
+        Appointment.objects.filter(status='completed', **filters).order_by()
+        .values('barbershop_id', 'date', 'service_id', 'employee_id')
+        .annotate(appointments_count=Count('pk'), revenue=Sum(COMPLETED_PRICE))
+    )
+    expenses = (
+        Expense.objects.filter(**filters).order_by()
+        .values('barbershop_id', 'date', 'expense_type')
+        .annotate(expenses_count=Count('pk'), amount=Sum('amount'))
+    )
+    with transaction.atomic(using=router.db_for_write(DailyRevenue)):
+        DailyRevenue.objects.filter(**filters).delete()
+        DailyExpense.objects.filter(**filters).delete()
+        revenue_rows = DailyRevenue.objects.bulk_create(
+            (DailyRevenue(**row) for row in revenues.iterator(chunk_size=REBUILD_BATCH_SIZE)),
+            batch_size=REBUILD_BATCH_SIZE)
+        expense_rows = DailyExpense.objects.bulk_create(
+            (DailyExpense(**row) for row in expenses.iterator(chunk_size=REBUILD_BATCH_SIZE)),
+            batch_size=REBUILD_BATCH_SIZE)
+    return len(revenue_rows), len(expense_rows)
+
+
+def _by_period(barbershop, trunc, start_date, end_date):
+    revenues = (
+        DailyRevenue.objects.filter(barbershop=barbershop, date__range=(start_date, end_date))
+        .annotate(period=trunc('date')).order_by().values('period')
+        .annotate(total=Sum('revenue'), count=Sum('appointments_count'))
+    )
+    expenses = (
+        DailyExpense.objects.filter(barbershop=barbershop, date__range=(start_date, end_date))
+        .annotate(period=trunc('date')).order_by().values('period')
+        .annotate(total=Sum('amount'))
+    )
+    periods = {}
+    for row in revenues:
+        periods.setdefault(row['period'], _empty_period(row['period'])).update(
+            revenue=Decimal(row['total'] or 0), appointments=row['count'] or 0)
+    for row in expenses:
+        periods.setdefault(row['period'], _empty_period(row['period']))['expenses'] = \
+            Decimal(row['total'] or 0)
+    for period in periods.values():
+        period['profit'] = period['revenue'] - period['expenses']
+    return [periods[key] for key in sorted(periods)]
+
+
+def _empty_period(period):
+    return {'period': period, 'appointments': 0, 'revenue': Decimal('0'),
+            'expenses': Decimal('0'), 'profit': Decimal('0')}
+
+
+def monthly_report(barbershop, year):
+    """Receita, despesas e resultado de cada mês do ano, a partir dos consolidados."""
+    return _by_period(barbershop, TruncMonth, date(year, 1, 1), date(year, 12, 31))
+
+
+def yearly_report(barbershop):
+    """Receita, despesas e resultado de cada ano, a partir dos consolidados."""
+    return _by_period(barbershop, TruncYear, date.min, date.max)
+
+
+def breakdown(barbershop, start_date, end_date):
+    """
+    Detalha o período por serviço, por funcionário e por tipo de despesa.
+
+    Returns:
+        dict: listas ``services``, ``employees`` e ``expense_types``, em ordem
+        decrescente de valor.
+    """
+    revenues = DailyRevenue.objects.filter(
+        barbershop=barbershop, date__range=(start_date, end_date)).order_by()
+    return {
+        'services': list(
+            revenues.values('service__name')
+            .annotate(count=Sum('appointments_count'), total=Sum('revenue')).order_by('-total')),
+        'employees': list(
+            revenues.values('employee__name')
+            .annotate(count=Sum('appointments_count'), total=Sum('revenue')).order_by('-total')),
+        'expense_types': list(
+            DailyExpense.objects.filter(barbershop=barbershop, date__range=(start_date, end_date))
+            .order_by().values('expense_type')
+            .annotate(count=Sum('expenses_count'), total=Sum('amount')).order_by('-total')),
+    }
@@ -0,0 +1,176 @@
+"""
+Agenda semanal compilada de cada barbearia.
+
+Os dias de funcionamento e os horários de cada dia são carregados em uma
+única consulta e compilados em uma máscara de bits por dia da semana e em
+intervalos de funcionamento ordenados. A agenda compilada fica no cache do
+Django sob a versão da barbearia, incrementada pelos sinais em
+``signals.py``; assim, formulários e views respondem "está aberta neste
+horário?" e "quais os intervalos de funcionamento nesta data?" sem
+consultar o banco.
+"""
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db.models import Exists, FilteredRelation, OuterRef, Q
+
+from .models import Barbershop, DayOfWeek
+from .sharding import ashard_for, pinned_db, shard_for
+from .versioning import aget_versions, bump_version, get_versions
+
+SCHEDULE_CACHE_TIMEOUT = 60 * 60 * 24
+
+CLOSED_MESSAGE = 'A barbearia está fechada neste dia.'
+UNDEFINED_HOURS_MESSAGE = 'Horário de funcionamento não definido para este dia.'
+
+# Incrementada quando os dias da semana (``DayOfWeek``) mudam
+GLOBAL_VERSION_KEY = 'schedule:version'
+
+OpeningInterval = namedtuple('OpeningInterval', ['start_time', 'end_time'])
+WeekDay = namedtuple('WeekDay', ['pk', 'day', 'name'])
+
+
+class CompiledSchedule:
+    """
+    Funcionamento semanal de uma barbearia, consultado apenas em memória.
+
+    Attributes:
+        open_days (int): máscara de bits com o bit ``1 << dia_da_semana``
+            ligado para cada dia de funcionamento.
+        intervals (tuple): para cada dia da semana (0 a 6), uma tupla
+            ordenada de ``OpeningInterval``.
+        days (tuple): ``WeekDay`` de cada dia da semana cadastrado, em ordem.
+    """
+
+    __slots__ = ('open_days', 'intervals', 'days')
+
+    def __init__(self, open_days, intervals, days):
+        self.open_days = open_days
+        self.intervals = intervals
+        self.days = days
+
+    def is_open_on(self, date):
+        """Indica se a barbearia funciona no dia da semana de ``date``."""
+        return bool(self.open_days & (1 << date.weekday()))
+
+    def intervals_on(self, date):
+        """Retorna os intervalos de funcionamento em ``date`` (vazio se fechada)."""
+        if not self.is_open_on(date):
+            return ()
+        return self.intervals[date.weekday()]
+
+    def is_open_at(self, date, time):
+        """Indica se ``time`` está dentro de algum intervalo de funcionamento em ``date``."""
+        return any(
+            interval.start_time <= time < interval.end_time
+            for interval in self.intervals_on(date)
+        )
+
+    def interval_at(self, date, time):
+        """Retorna o intervalo de funcionamento que contém ``time``, ou ``None``."""
+        for interval in self.intervals_on(date):
+            if interval.start_time <= time < interval.end_time:
+                return interval
+        return None
+
+    def closed_message(self, date):
+        """Mensagem explicando por que não há atendimento em ``date``, ou ``None``."""
+        if not self.is_open_on(date):
+            return CLOSED_MESSAGE
+        if not self.intervals[date.weekday()]:
+            return UNDEFINED_HOURS_MESSAGE
+        return None
+
+
+def weekly_opening_hours_query(barbershop_id, using=None):
+    """
+    Consulta única com ``(id, dia, nome, aberto, início, fim)`` para cada dia
+    da semana. Com sharding, ``using`` é o shard da barbearia, onde há cópias
+    dos dias e dos dias de funcionamento.
+    """
+    working_days = Barbershop.working_days.through.objects.filter(
+        barbershop_id=barbershop_id, dayofweek_id=OuterRef('pk'))
+    return DayOfWeek.objects.db_manager(using).annotate(
+        is_working_day=Exists(working_days),
+        barbershop_hours=FilteredRelation(
+            'working_hours', condition=Q(working_hours__barbershop_id=barbershop_id)),
+    ).order_by('day').values_list(
+        'pk', 'day', 'name', 'is_working_day',
+        'barbershop_hours__start_time', 'barbershop_hours__end_time')
+
+
+def _build_schedule(rows):
+    open_days = 0
+    intervals = [[] for _ in range(7)]
+    days = []
+    seen = set()
+    for pk, day, name, is_working_day, start_time, end_time in rows:
+        if pk not in seen:
+            seen.add(pk)
+            days.append(WeekDay(pk, day, name))
+        if is_working_day:
+            open_days |= 1 << day
+            if start_time is not None:
+                intervals[day].append(OpeningInterval(start_time, end_time))
+    return CompiledSchedule(
+        open_days, tuple(tuple(sorted(day_intervals)) for day_intervals in intervals), tuple(days))
+
+
+def compile_schedule(barbershop_id):
+    """Monta a agenda compilada da barbearia a partir do banco, em uma consulta."""
+    return _build_schedule(weekly_opening_hours_query(
+        barbershop_id, using=pinned_db(shard_for(barbershop_id))))
+
+
+async def acompile_schedule(barbershop_id):
+    """Versão assíncrona de ``compile_schedule``."""
+    query = weekly_opening_hours_query(
+        barbershop_id, using=pinned_db(await ashard_for(barbershop_id)))
+    return _build_schedule([row async for row in query])
+
+
+def _version_key(barbershop_id):
+    return f'schedule:version:{barbershop_id}'
+
+
+def invalidate_schedule(barbershop_id=None):
+    """
+    Invalida a agenda compilada da barbearia, ou de todas as barbearias
+    quando ``barbershop_id`` não é informado.
+    """
+    bump_version(GLOBAL_VERSION_KEY if barbershop_id is None else _version_key(barbershop_id))
+
+
+def _schedule_key(barbershop_id, versions):
+    return f'schedule:{barbershop_id}:{versions[GLOBAL_VERSION_KEY]}:{versions[_version_key(barbershop_id)]}'
+
+
+def get_schedule(barbershop):
+    """
+    Retorna a ``CompiledSchedule`` da barbearia (instância ou id).
+
+    Lida do cache quando possível; caso contrário é compilada em uma consulta
+    e gravada sob a versão atual.
+    """
+    barbershop_id = getattr(barbershop, 'pk', barbershop)
+    versions = get_versions(GLOBAL_VERSION_KEY, _version_key(barbershop_id))
+    key = _schedule_key(barbershop_id, versions)
+
+    schedule = cache.get(key)
+    if schedule is None:
+        schedule = compile_schedule(barbershop_id)
+        cache.set(key, schedule, SCHEDULE_CACHE_TIMEOUT)
+    return schedule
+
+
+async def aget_schedule(barbershop):
+    """Versão assíncrona de ``get_schedule``, para views ``async``."""
+    barbershop_id = getattr(barbershop, 'pk', barbershop)
+    versions = await aget_versions(GLOBAL_VERSION_KEY, _version_key(barbershop_id))
+    key = _schedule_key(barbershop_id, versions)
+
+    schedule = await cache.aget(key)
+    if schedule is None:
+        schedule = await acompile_schedule(barbershop_id)
+        await cache.aset(key, schedule, SCHEDULE_CACHE_TIMEOUT)
+    return schedule
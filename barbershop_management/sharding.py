@@ -0,0 +1,307 @@
+"""
+Particionamento (sharding) dos dados das barbearias entre bancos.
+
+Com ``DJANGO_SHARDS=N``, ``settings.SHARD_ALIASES`` lista os bancos
+``shard_0`` a ``shard_{N-1}`` (arquivos SQLite locais, no lugar de
+servidores). Barbearias, usuários e ``DayOfWeek`` continuam em ``default``,
+que funciona como diretório: ``ShardAssignment`` diz em qual banco estão os
+dados de cada barbearia (funcionários, serviços, horários, clientes,
+agendamentos, notificações, despesas, estoque e consolidados). Barbearias
+sem entrada no diretório continuam em ``default``, como antes do sharding.
+
+Cada shard guarda uma cópia da barbearia, dos seus dias de funcionamento,
+do dono (apenas id e nome de usuário) e de ``DayOfWeek``, mantida pelos
+sinais em ``signals.py``, para que as chaves estrangeiras e as consultas
+com junções funcionem dentro do shard.
+
+O banco de uma barbearia nova é escolhido por rendezvous hashing do
+``code``: cada shard recebe a nota ``sha256(code + alias)`` e vence a
+maior. A escolha não muda enquanto os shards forem os mesmos, e acrescentar
+um shard move apenas as barbearias que passam a preferi-lo (cerca de 1/N).
+O comando ``rebalance_shards`` move os dados para o banco escolhido.
+
+O ``setup.routers.ShardRouter`` envia as consultas dos modelos particionados
+para o banco do objeto relacionado ou para o shard ativo (``use_shard``,
+``activate_shard``). O ``BarbershopMiddleware`` ativa o shard da barbearia
+da URL (``barbershop_id``) ou da barbearia ativa da sessão, e
+``tenancy.barbershop_view`` o da barbearia pública. Os ids são sequenciais
+em cada banco, então toda rota que recebe o id de um funcionário, despesa,
+item de estoque etc. traz também a barbearia na URL.
+"""
+import contextvars
+import hashlib
+from contextlib import contextmanager
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from barbershop_booking.cache import invalidate_barbershop as invalidate_availability
+from barbershop_booking.models import Appointment, Client, Notification, Review
+from barbershop_booking.models import EmployeeService as BookingEmployeeService
+from .models import (Barbershop, DailyExpense, DailyRevenue, DayOfWeek, Employee, EmployeeService,
+                     Expense, Inventory, Service, ShardAssignment, WorkingHours)
+
+SHARDED_APPS = ('barbershop_management', 'barbershop_booking')
+
+# Ficam em default, com cópias nos shards
+GLOBAL_MODELS = {
+    'barbershop_management.barbershop',
+    'barbershop_management.barbershop_working_days',
+    'barbershop_management.barbershopslug',
+    'barbershop_management.dayofweek',
+    'barbershop_management.shardassignment',
+}
+
+# Modelos com dados de uma barbearia, na ordem de cópia (pais antes dos
+# filhos), com o caminho até a barbearia. ``SchedulerWatermark`` é do banco,
+# não de uma barbearia, e não é movido.
+TENANT_MODELS = (
+    (Employee, 'barbershop'),
+    (Service, 'barbershop'),
+    (WorkingHours, 'barbershop'),
+    (EmployeeService, 'employee__barbershop'),
+    (BookingEmployeeService, 'employee__barbershop'),
+    (Client, 'barbershop'),
+    (Appointment, 'barbershop'),
+    (Review, 'appointment__barbershop'),
+    (Notification, 'appointment__barbershop'),
+    (Expense, 'barbershop'),
+    (Inventory, 'barbershop'),
+    (DailyRevenue, 'barbershop'),
+    (DailyExpense, 'barbershop'),
+)
+
+DIRECTORY_CACHE_TIMEOUT = 60 * 5
+MOVE_BATCH_SIZE = 500
+
+_active_shard = contextvars.ContextVar('active_shard', default=None)
+
+
+def shard_aliases():
+    return list(getattr(settings, 'SHARD_ALIASES', ()))
+
+
+def sharding_enabled():
+    return bool(shard_aliases())
+
+
+def tenant_databases():
+    """Bancos que podem guardar dados de barbearias: ``default`` e os shards."""
+    return [DEFAULT_DB_ALIAS, *shard_aliases()]
+
+
+def is_sharded(model):
+    return model._meta.app_label in SHARDED_APPS and model._meta.label_lower not in GLOBAL_MODELS
+
+
+def placement(code, aliases=None):
+    """Shard escolhido para a barbearia de código ``code`` (rendezvous hashing)."""
+    aliases = shard_aliases() if aliases is None else aliases
+    return max(aliases, key=lambda alias: hashlib.sha256(code.bytes + alias.encode()).digest())
+
+
+def _directory_key(barbershop_id):
+    return f'shard:barbershop:{barbershop_id}'
+
+
+def shard_for(barbershop_id):
+    """Banco com os dados da barbearia ``barbershop_id`` (``default`` sem sharding)."""
+    if not sharding_enabled():
+        return DEFAULT_DB_ALIAS
+    key = _directory_key(barbershop_id)
+    alias = cache.get(key)
+    if alias is None:
+        alias = ShardAssignment.objects.using(DEFAULT_DB_ALIAS).filter(
+            barbershop_id=barbershop_id).values_list('alias', flat=True).first() or DEFAULT_DB_ALIAS
+        cache.set(key, alias, DIRECTORY_CACHE_TIMEOUT)
+    return alias
+
+
+async def ashard_for(barbershop_id):
+    """Versão assíncrona de ``shard_for``, para views ``async``."""
+    if not sharding_enabled():
+        return DEFAULT_DB_ALIAS
+    key = _directory_key(barbershop_id)
+    alias = await cache.aget(key)
+    if alias is None:
+        alias = await ShardAssignment.objects.using(DEFAULT_DB_ALIAS).filter(
+            barbershop_id=barbershop_id).values_list('alias', flat=True).afirst() or DEFAULT_DB_ALIAS
+        await cache.aset(key, alias, DIRECTORY_CACHE_TIMEOUT)
+    return alias
+
+
+def pinned_db(alias):
+    """
+    Banco a fixar com ``.using()`` em consultas que juntam tabelas globais e
+    particionadas, ou ``None`` quando os dados estão em ``default`` e o
+    roteamento normal vale.
+    """
+    return None if alias == DEFAULT_DB_ALIAS else alias
+
+
+def group_by_shard(barbershop_ids):
+    """Retorna ``{banco: [ids]}`` para os ids de barbearias informados."""
+    groups = {}
+    for barbershop_id in barbershop_ids:
+        groups.setdefault(shard_for(barbershop_id), []).append(barbershop_id)
+    return groups
+
+
+def active_shard():
+    return _active_shard.get()
+
+
+def activate_shard(alias):
+    """Ativa ``alias`` até o fim do contexto atual (a requisição ou a tarefa)."""
+    _active_shard.set(alias)
+
+
+@contextmanager
+def use_shard(alias):
+    token = _active_shard.set(alias)
+    try:
+        yield alias
+    finally:
+        _active_shard.reset(token)
+
+
+def use_barbershop_shard(barbershop_id):
+    return use_shard(shard_for(barbershop_id))
+
+
+def _clone(instance):
+    model = type(instance)
+    return model(**{field.attname: getattr(instance, field.attname)
+                    for field in model._meta.concrete_fields})
+
+
+def _upsert(model, objects, alias, fields=None):
+    """Insere ou atualiza ``objects`` em ``alias`` pela chave primária, sem sinais."""
+    if fields is None:
+        fields = [field.name for field in model._meta.concrete_fields if not field.primary_key]
+    model._base_manager.db_manager(alias).bulk_create(
+        objects, update_conflicts=True, unique_fields=[model._meta.pk.name], update_fields=fields)
+
+
+def replicate_days(alias):
+    _upsert(DayOfWeek, list(DayOfWeek.objects.using(DEFAULT_DB_ALIAS)), alias)
+
+
+def replicate_working_days(barbershop_id, alias):
+    through = Barbershop.working_days.through
+    with transaction.atomic(using=alias):
+        through.objects.using(alias).filter(barbershop_id=barbershop_id).delete()
+        through.objects.using(alias).bulk_create(
+            _clone(row) for row in through.objects.using(DEFAULT_DB_ALIAS).filter(
+                barbershop_id=barbershop_id))
+
+
+def replicate_barbershop(barbershop, alias=None):
+    """
+    Copia para o banco da barbearia (ou ``alias``) a barbearia, o dono, os
+    dias da semana e os dias de funcionamento. Nada a fazer em ``default``.
+    """
+    alias = alias or shard_for(barbershop.pk)
+    if alias == DEFAULT_DB_ALIAS:
+        return
+    username = User.objects.using(DEFAULT_DB_ALIAS).filter(
+        pk=barbershop.owner_id).values_list('username', flat=True).get()
+    with transaction.atomic(using=alias):
+        # Apenas o necessário para a chave estrangeira; a senha fica em default
+        _upsert(User, [User(pk=barbershop.owner_id, username=username,
+                            password=make_password(None))], alias, fields=['username'])
+        replicate_days(alias)
+        _upsert(Barbershop, [_clone(barbershop)], alias)
+        replicate_working_days(barbershop.pk, alias)
+
+
+def _set_assignment(barbershop_id, alias):
+    ShardAssignment.objects.using(DEFAULT_DB_ALIAS).update_or_create(
+        barbershop_id=barbershop_id, defaults={'alias': alias})
+    cache.delete(_directory_key(barbershop_id))
+
+
+def assign_barbershop(barbershop):
+    """Registra uma barbearia nova no diretório, no shard escolhido por ``placement``."""
+    alias = placement(barbershop.code)
+    replicate_barbershop(barbershop, alias)
+    _set_assignment(barbershop.pk, alias)
+    return alias
+
+
+def _purge(barbershop_id, alias):
+    for model, path in reversed(TENANT_MODELS):
+        # Sem sinais nem coleta de cascatas: as linhas são apagadas como foram copiadas
+        model._base_manager.using(alias).filter(**{path: barbershop_id})._raw_delete(alias)
+
+
+def _copy_rows(model, rows, target, remapped):
+    """
+    Insere ``rows`` em ``target`` e retorna ``{id de origem: id novo}`` das
+    linhas que trocaram de id.
+
+    As chaves estrangeiras para linhas já copiadas com outro id são
+    reescritas. Cada linha mantém o id que tinha quando ele está livre no
+    destino; as demais recebem um id novo, gerado pelo destino.
+    """
+    foreign_keys = [field for field in model._meta.concrete_fields
+                    if field.is_relation and field.related_model in remapped]
+    for row in rows:
+        for field in foreign_keys:
+            value = getattr(row, field.attname)
+            setattr(row, field.attname, remapped[field.related_model].get(value, value))
+    taken = set(model._base_manager.using(target).filter(
+        pk__in=[row.pk for row in rows]).values_list('pk', flat=True))
+    moved = [(row, row.pk) for row in rows if row.pk in taken]
+    for row, _ in moved:
+        row.pk = None
+    model._base_manager.db_manager(target).bulk_create(rows)
+    return {source_id: row.pk for row, source_id in moved}
+
+
+def move_barbershop(barbershop, target):
+    """
+    Move os dados de ``barbershop`` para o banco ``target``.
+
+    Copia as linhas em uma transação no destino, atualiza o diretório e só
+    então apaga as linhas da origem; uma execução interrompida pode ser
+    repetida. Os ids são sequenciais em cada banco: as linhas cujo id já
+    está em uso no destino recebem um id novo (e os links com o id antigo,
+    como o feed do funcionário, mudam). A barbearia não deve receber escritas
+    durante a cópia, e os processos com o diretório em um cache local só
+    enxergam a mudança depois de ``DIRECTORY_CACHE_TIMEOUT``.
+
+    Returns:
+        int: quantidade de linhas copiadas.
+    """
+    source = shard_for(barbershop.pk)
+    if source == target:
+        return 0
+    replicate_barbershop(barbershop, target)
+    copied = 0
+    remapped = {}
+    with transaction.atomic(using=target):
+        # Restos de uma execução interrompida antes de atualizar o diretório
+        _purge(barbershop.pk, target)
+        for model, path in TENANT_MODELS:
+            remapped[model] = {}
+            rows = (model._base_manager.using(source).filter(**{path: barbershop.pk})
+                    .order_by('pk').iterator(chunk_size=MOVE_BATCH_SIZE))
+            while batch := list(islice(rows, MOVE_BATCH_SIZE)):
+                remapped[model].update(_copy_rows(model, batch, target, remapped))
+                copied += len(batch)
+    _set_assignment(barbershop.pk, target)
+    # A disponibilidade em cache é indexada pelo id do funcionário
+    invalidate_availability(barbershop.pk)
+
+    with transaction.atomic(using=source):
+        _purge(barbershop.pk, source)
+        if source != DEFAULT_DB_ALIAS:
+            Barbershop.working_days.through.objects.using(source).filter(
+                barbershop_id=barbershop.pk)._raw_delete(source)
+            Barbershop._base_manager.using(source).filter(pk=barbershop.pk)._raw_delete(source)
+    return copied
@@ -0,0 +1,177 @@
+"""
+Sinais que mantêm a agenda compilada (``schedule.py``) e o snapshot do
+dashboard (``stats.py``) consistentes.
+
+Alterações no horário de funcionamento ou nos dias de funcionamento de uma
+barbearia invalidam apenas a agenda dela; alterações nos dias da semana
+invalidam a agenda de todas as barbearias. Agendamentos, funcionários,
+serviços e despesas invalidam o dashboard da barbearia.
+
+Agendamentos concluídos e despesas também atualizam os consolidados
+financeiros diários (``rollups.py``): a contribuição dos valores carregados
+do banco é retirada e a dos valores salvos é somada.
+
+Salvar ou excluir uma barbearia invalida a barbearia ativa em cache do
+``BarbershopMiddleware``.
+
+Com sharding (``sharding.py``), uma barbearia nova é registrada no diretório
+de shards, e as alterações na barbearia, nos seus dias de funcionamento e em
+``DayOfWeek`` feitas em ``default`` são copiadas para os shards. Excluir a
+barbearia exclui também os dados dela no shard.
+"""
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from barbershop_booking.models import Appointment
+from .middleware import invalidate_current_barbershop
+from .models import Barbershop, DayOfWeek, Employee, Expense, Service, WorkingHours
+from .rollups import (apply_expense, apply_revenue, expense_contribution,
+                      revenue_contribution)
+from .schedule import invalidate_schedule
+from .sharding import (assign_barbershop, replicate_barbershop, replicate_days,
+                       replicate_working_days, shard_aliases, shard_for, sharding_enabled,
+                       use_shard)
+from .stats import invalidate_dashboard
+
+
+@receiver(post_save, sender=Barbershop)
+@receiver(post_delete, sender=Barbershop)
+def invalidate_barbershop(sender, instance, **kwargs):
+    invalidate_current_barbershop(instance.pk)
+
+
+@receiver(post_save, sender=Barbershop)
+def replicate_barbershop_to_shard(sender, instance, created, using, **kwargs):
+    if using != DEFAULT_DB_ALIAS or not sharding_enabled():
+        return
+    if created:
+        assign_barbershop(instance)
+    else:
+        replicate_barbershop(instance)
+
+
+@receiver(pre_delete, sender=Barbershop)
+def remember_barbershop_shard(sender, instance, using, **kwargs):
+    if using == DEFAULT_DB_ALIAS and sharding_enabled():
+        # O diretório é excluído em cascata junto com a barbearia
+        instance._shard = shard_for(instance.pk)
+
+
+@receiver(post_delete, sender=Barbershop)
+def delete_barbershop_from_shard(sender, instance, using, **kwargs):
+    alias = getattr(instance, '_shard', DEFAULT_DB_ALIAS)
+    if using != DEFAULT_DB_ALIAS or alias == DEFAULT_DB_ALIAS:
+        return
+    with use_shard(alias):
+        Barbershop.objects.using(alias).filter(pk=instance.pk).delete()
+
+
+@receiver(m2m_changed, sender=Barbershop.working_days.through)
+def replicate_working_days_to_shards(sender, instance, action, reverse, pk_set, using, **kwargs):
+    if using != DEFAULT_DB_ALIAS or not sharding_enabled() or not action.startswith('post_'):
+        return
+    if not reverse:
+        barbershop_ids = [instance.pk]
+    elif pk_set:
+        barbershop_ids = pk_set
+    else:
+        barbershop_ids = Barbershop.objects.using(DEFAULT_DB_ALIAS).values_list('pk', flat=True)
+    for barbershop_id in barbershop_ids:
+        alias = shard_for(barbershop_id)
+        if alias != DEFAULT_DB_ALIAS:
+            replicate_working_days(barbershop_id, alias)
+
+
+@receiver(post_save, sender=DayOfWeek)
+def replicate_day_to_shards(sender, instance, using, **kwargs):
+    if using == DEFAULT_DB_ALIAS:
+        for alias in shard_aliases():
+            replicate_days(alias)
+
+
+@receiver(post_delete, sender=DayOfWeek)
+def delete_day_from_shards(sender, instance, using, **kwargs):
+    if using == DEFAULT_DB_ALIAS:
+        for alias in shard_aliases():
+            with use_shard(alias):
+                DayOfWeek.objects.using(alias).filter(pk=instance.pk).delete()
+
+
+@receiver(post_save, sender=WorkingHours)
+@receiver(post_delete, sender=WorkingHours)
+def invalidate_working_hours_schedule(sender, instance, **kwargs):
+    invalidate_schedule(instance.barbershop_id)
+
+
+@receiver(post_save, sender=DayOfWeek)
+@receiver(post_delete, sender=DayOfWeek)
+def invalidate_all_schedules(sender, instance, **kwargs):
+    invalidate_schedule()
+
+
+@receiver(m2m_changed, sender=Barbershop.working_days.through)
+def invalidate_working_days_schedule(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate_schedule(instance.pk)
+    elif pk_set:
+        for barbershop_id in pk_set:
+            invalidate_schedule(barbershop_id)
+    else:
+        # post_clear a partir de DayOfWeek: pk_set não é informado
+        invalidate_schedule()
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Service)
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Expense)
+def invalidate_dashboard_stats(sender, instance, **kwargs):
+    invalidate_dashboard(instance.barbershop_id)
+
+
+def _field_values(instance):
+    return {field.attname: getattr(instance, field.attname)
+            for field in instance._meta.concrete_fields}
+
+
+@receiver(post_save, sender=Appointment)
+def update_revenue_rollup(sender, instance, created, **kwargs):
+    loaded = None if created else getattr(instance, '_loaded_values', None)
+    current = _field_values(instance)
+    if loaded is not None and all(loaded.get(field) == current[field] for field in (
+            'status', 'barbershop_id', 'date', 'service_id', 'employee_id', 'price')):
+        return
+    if loaded is not None:
+        apply_revenue(revenue_contribution(loaded), -1)
+    apply_revenue(revenue_contribution(current), 1)
+
+
+@receiver(post_delete, sender=Appointment)
+def remove_revenue_rollup(sender, instance, **kwargs):
+    values = getattr(instance, '_loaded_values', None) or _field_values(instance)
+    apply_revenue(revenue_contribution(values), -1)
+
+
+@receiver(post_save, sender=Expense)
+def update_expense_rollup(sender, instance, created, **kwargs):
+    loaded = None if created else getattr(instance, '_loaded_values', None)
+    current = _field_values(instance)
+    if loaded is not None and all(loaded.get(field) == current[field] for field in (
+            'barbershop_id', 'date', 'expense_type', 'amount')):
+        return
+    if loaded is not None:
+        apply_expense(expense_contribution(loaded), -1)
+    apply_expense(expense_contribution(current), 1)
+
+
+@receiver(post_delete, sender=Expense)
+def remove_expense_rollup(sender, instance, **kwargs):
+    values = getattr(instance, '_loaded_values', None) or _field_values(instance)
+    apply_expense(expense_contribution(values), -1)
@@ -0,0 +1,239 @@
+"""
+Estatísticas do dashboard da barbearia.
+
+Todas as contagens e receitas são obtidas em uma única consulta, com uma
+subconsulta agregada por métrica sobre a tabela de barbearias. O resultado
+fica em cache por barbearia, sob uma versão incrementada pelos sinais em
+``signals.py`` sempre que agendamentos, funcionários ou serviços mudam; a
+data de hoje também faz parte da chave, para que os períodos "hoje",
+"semana" e "mês" avancem sozinhos na virada do dia.
+
+A receita considera o preço guardado na conclusão dos agendamentos
+concluídos, como os consolidados financeiros de ``rollups.py``;
+agendamentos ainda marcados entram apenas nas contagens.
+
+O painel dos donos com várias unidades usa consultas agrupadas por
+barbearia (``values('barbershop').annotate(...)``), uma por tabela, de
+modo que o número de consultas não cresce com o número de unidades.
+"""
+import hashlib
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from barbershop_booking.models import Appointment
+from .models import Barbershop, Employee, Expense, Service
+from .rollups import COMPLETED_PRICE
+from .sharding import group_by_shard, pinned_db, use_barbershop_shard, use_shard
+from .versioning import bump_version, get_version, get_versions
+
+DASHBOARD_CACHE_TIMEOUT = 60 * 60
+
+RECENT_ITEMS = 5
+
+# Métricas somadas no total da rede, no painel dos donos com várias unidades
+OWNER_METRICS = (
+    'employees', 'services', 'scheduled', 'completed', 'cancelled', 'revenue', 'expenses', 'profit')
+
+
+def _per_barbershop(queryset, aggregate, default):
+    """Agregado de ``queryset`` para a barbearia da linha externa, como subconsulta."""
+    subquery = (
+        queryset.filter(barbershop=OuterRef('pk')).order_by()
+        .values('barbershop').annotate(value=aggregate).values('value')
+    )
+    return Coalesce(Subquery(subquery), default)
+
+
+def _count(queryset):
+    return _per_barbershop(queryset, Count('pk'), Value(0, output_field=IntegerField()))
+
+
+def _revenue(queryset):
+    return _per_barbershop(
+        queryset, Sum(COMPLETED_PRICE),
+        Value(Decimal('0.00'), output_field=DecimalField(max_digits=12, decimal_places=2)))
+
+
+def get_periods(today):
+    """Retorna o intervalo de datas de cada período do dashboard: ``{nome: (início, fim)}``."""
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    return {
+        'today': (today, today),
+        'week': (week_start, week_start + timedelta(days=6)),
+        'month': (month_start, next_month - timedelta(days=1)),
+    }
+
+
+def dashboard_stats_query(barbershops, today):
+    """
+    Anota cada barbearia de ``barbershops`` com as métricas do dashboard.
+
+    Uma consulta, qualquer que seja o número de barbearias.
+    """
+    active = Appointment.objects.exclude(status='cancelled')
+    completed = Appointment.objects.filter(status='completed')
+    metrics = {
+        'employees_count': _count(Employee.objects.all()),
+        'services_count': _count(Service.objects.all()),
+        'appointments_count': _count(Appointment.objects.all()),
+    }
+    for period, date_range in get_periods(today).items():
+        metrics[f'appointments_{period}'] = _count(active.filter(date__range=date_range))
+        metrics[f'revenue_{period}'] = _revenue(completed.filter(date__range=date_range))
+    return barbershops.annotate(**metrics).values('pk', *metrics)
+
+
+def recent_items_queries(barbershop_id):
+    """Consultas das listas de itens recentes do dashboard: ``{nome: queryset}``."""
+    return {
+        'recent_employees':
+            Employee.objects.filter(barbershop_id=barbershop_id).order_by('-id')[:RECENT_ITEMS],
+        'recent_services':
+            Service.objects.filter(barbershop_id=barbershop_id).order_by('-id')[:RECENT_ITEMS],
+    }
+
+
+def compute_dashboard_stats(barbershop_id, today=None):
+    """Calcula as métricas da barbearia e as listas de itens recentes."""
+    today = today or timezone.localdate()
+    with use_barbershop_shard(barbershop_id) as alias:
+        # No shard, as subconsultas partem da cópia da barbearia
+        barbershops = Barbershop.objects.db_manager(pinned_db(alias)).filter(pk=barbershop_id)
+        stats = dashboard_stats_query(barbershops, today).get()
+        del stats['pk']
+        for name, queryset in recent_items_queries(barbershop_id).items():
+            stats[name] = list(queryset)
+    return stats
+
+
+def _version_key(barbershop_id):
+    return f'dashboard:version:{barbershop_id}'
+
+
+def invalidate_dashboard(barbershop_id):
+    """Invalida o snapshot do dashboard da barbearia."""
+    bump_version(_version_key(barbershop_id))
+
+
+def get_dashboard_stats(barbershop_id):
+    """
+    Retorna o snapshot do dashboard da barbearia, do cache quando possível.
+
+    Returns:
+        dict: contagens de funcionários, serviços e agendamentos, agendamentos
+        e receita de hoje, da semana e do mês, e os itens recentes.
+    """
+    today = timezone.localdate()
+    version = get_version(_version_key(barbershop_id))
+    key = f'dashboard:{barbershop_id}:{version}:{today.isoformat()}'
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_dashboard_stats(barbershop_id, today)
+        cache.set(key, stats, DASHBOARD_CACHE_TIMEOUT)
+    return stats
+
+
+def _grouped(queryset, **aggregates):
+    """``aggregates`` agrupados por barbearia, uma linha por barbearia."""
+    return queryset.order_by().values('barbershop').annotate(**aggregates)
+
+
+def owner_stats_queries(barbershop_ids, date_range):
+    """
+    Consultas agrupadas por barbearia do painel dos donos: ``{tabela: queryset}``.
+
+    Todas as barbearias de ``barbershop_ids`` devem estar no mesmo banco.
+    """
+    return {
+        'employees': _grouped(
+            Employee.objects.filter(barbershop__in=barbershop_ids), count=Count('pk')),
+        'services': _grouped(
+            Service.objects.filter(barbershop__in=barbershop_ids), count=Count('pk')),
+        'appointments': _grouped(
+            Appointment.objects.filter(barbershop__in=barbershop_ids, date__range=date_range),
+            scheduled=Count('pk', filter=Q(status='scheduled')),
+            completed=Count('pk', filter=Q(status='completed')),
+            cancelled=Count('pk', filter=Q(status='cancelled')),
+            revenue=Sum(COMPLETED_PRICE, filter=Q(status='completed')),
+        ),
+        'expenses': _grouped(
+            Expense.objects.filter(barbershop__in=barbershop_ids, date__range=date_range),
+            total=Sum('amount')),
+    }
+
+
+def compute_owner_stats(barbershops, date_range):
+    """
+    Calcula as métricas de cada barbearia e o total da rede no período.
+
+    Executa uma consulta agrupada por tabela (funcionários, serviços,
+    agendamentos e despesas), qualquer que seja o número de barbearias; com
+    sharding, uma por tabela em cada banco com barbearias da lista.
+
+    Args:
+        barbershops (list): dicionários com ``pk`` e ``name`` de cada barbearia.
+        date_range (tuple): datas inicial e final do período.
+
+    Returns:
+        tuple: (lista de métricas por barbearia, métricas somadas da rede).
+    """
+    employees, services, appointments, expenses = {}, {}, {}, {}
+    grouped = {
+        'employees': employees, 'services': services,
+        'appointments': appointments, 'expenses': expenses,
+    }
+    ids = [barbershop['pk'] for barbershop in barbershops]
+    for alias, shard_ids in group_by_shard(ids).items():
+        with use_shard(alias):
+            for table, queryset in owner_stats_queries(shard_ids, date_range).items():
+                grouped[table].update((row.pop('barbershop'), row) for row in queryset)
+
+    rows = []
+    totals = dict.fromkeys(OWNER_METRICS, 0)
+    for barbershop in barbershops:
+        shop_appointments = appointments.get(barbershop['pk'], {})
+        row = {
+            'barbershop': barbershop,
+            'employees': employees.get(barbershop['pk'], {}).get('count', 0),
+            'services': services.get(barbershop['pk'], {}).get('count', 0),
+            'scheduled': shop_appointments.get('scheduled', 0),
+            'completed': shop_appointments.get('completed', 0),
+            'cancelled': shop_appointments.get('cancelled', 0),
+            'revenue': Decimal(shop_appointments.get('revenue') or 0),
+            'expenses': Decimal(expenses.get(barbershop['pk'], {}).get('total') or 0),
+        }
+        row['profit'] = row['revenue'] - row['expenses']
+        for metric in OWNER_METRICS:
+            totals[metric] += row[metric]
+        rows.append(row)
+    return rows, totals
+
+
+def get_owner_stats(owner, date_range):
+    """
+    Retorna as métricas de todas as barbearias de ``owner`` no período.
+
+    O resultado fica em cache sob as versões de dashboard de todas as
+    barbearias do dono; qualquer alteração em uma delas o invalida.
+    """
+    barbershops = list(Barbershop.objects.filter(owner=owner).order_by('name').values('pk', 'name'))
+    version_keys = [_version_key(barbershop['pk']) for barbershop in barbershops]
+    versions = get_versions(*version_keys)
+    # Resumo das barbearias e versões, para a chave não crescer com o número de unidades
+    fingerprint = hashlib.md5(repr([
+        (barbershop['pk'], barbershop['name'], versions[version_key])
+        for barbershop, version_key in zip(barbershops, version_keys)
+    ]).encode(), usedforsecurity=False).hexdigest()
+    key = f'dashboard:owner:{owner.pk}:{date_range[0].isoformat()}:{date_range[1].isoformat()}:{fingerprint}'
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_owner_stats(barbershops, date_range)
+        cache.set(key, stats, DASHBOARD_CACHE_TIMEOUT)
+    return stats
@@ -0,0 +1,92 @@
+"""
+Ajuste de estoque em massa.
+
+Recebe as variações de quantidade de muitos itens (por exemplo, a contagem
+de fechamento) e as aplica em uma transação, com um ``UPDATE`` por lote de
+itens: ``quantity = CASE id WHEN ... THEN quantity + delta END``. Como a
+soma é feita pelo banco com ``F()``, ajustes concorrentes no mesmo item não
+se perdem. Se algum item não pertencer à barbearia ou ficar com quantidade
+negativa, nada é gravado.
+"""
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .models import Inventory
+from .sharding import shard_for
+
+# Itens por UPDATE; cada item usa alguns parâmetros da consulta
+ADJUST_BATCH_SIZE = 250
+
+
+class StockAdjustmentError(ValueError):
+    pass
+
+
+def parse_adjustments(items):
+    """
+    Valida uma lista de ``{'id': ..., 'delta': ...}`` e a converte em
+    ``{id_do_item: delta}``, somando repetições do mesmo item.
+
+    Raises:
+        StockAdjustmentError: se algum ajuste for inválido.
+    """
+    if not isinstance(items, list) or not items:
+        raise StockAdjustmentError('Informe ao menos um ajuste.')
+    deltas = {}
+    for item in items:
+        try:
+            inventory_id, delta = int(item['id']), int(item['delta'])
+        except (KeyError, TypeError, ValueError):
+            raise StockAdjustmentError(f'Ajuste inválido: {item!r}.')
+        deltas[inventory_id] = deltas.get(inventory_id, 0) + delta
+    return deltas
+
+
+def adjust_stock(barbershop_id, deltas, allow_negative=False):
+    """
+    Soma ``deltas`` às quantidades dos itens de inventário da barbearia.
+
+    Itens com variação positiva têm ``last_restocked`` atualizado para hoje.
+
+    Args:
+        barbershop_id (int): barbearia dona dos itens.
+        deltas (dict): ``{id_do_item: variação}``.
+        allow_negative (bool): permite quantidades finais negativas.
+
+    Returns:
+        dict: ``{id_do_item: quantidade final}``.
+
+    Raises:
+        StockAdjustmentError: se algum item não existir na barbearia ou
+            ficar com quantidade negativa; nenhum ajuste é aplicado.
+    """
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return {}
+    using = shard_for(barbershop_id)
+    items = Inventory.objects.using(using).filter(barbershop_id=barbershop_id)
+    today = timezone.localdate()
+    ids = list(deltas)
+    with transaction.atomic(using=using):
+        for start in range(0, len(ids), ADJUST_BATCH_SIZE):
+            batch = ids[start:start + ADJUST_BATCH_SIZE]
+            restocked = [pk for pk in batch if deltas[pk] > 0]
+            updated = items.filter(pk__in=batch).update(
+                quantity=Case(*(When(pk=pk, then=F('quantity') + deltas[pk]) for pk in batch)),
+                last_restocked=Case(
+                    When(pk__in=restocked, then=Value(today)), default=F('last_restocked')),
+            )
+            if updated != len(batch):
+                missing = set(batch) - set(items.filter(pk__in=batch).values_list('pk', flat=True))
+                raise StockAdjustmentError(
+                    f'Itens não encontrados nesta barbearia: {sorted(missing)}.')
+        # As quantidades finais são lidas dentro da transação, depois das atualizações
+        quantities = {}
+        for start in range(0, len(ids), ADJUST_BATCH_SIZE):
+            quantities.update(items.filter(
+                pk__in=ids[start:start + ADJUST_BATCH_SIZE]).values_list('pk', 'quantity'))
+        negative = sorted(pk for pk, quantity in quantities.items() if quantity < 0)
+        if negative and not allow_negative:
+            raise StockAdjustmentError(f'Estoque ficaria negativo nos itens: {negative}.')
+    return quantities
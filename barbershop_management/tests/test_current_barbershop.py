@@ -0,0 +1,77 @@
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from barbershop_booking.testing import create_barbershop, create_owner
+from barbershop_management.middleware import (SESSION_KEY, BarbershopMiddleware,
+                                              clear_current_barbershop_cache)
+
+
+class CurrentBarbershopTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_current_barbershop_cache()
+        self.user = create_owner()
+        self.shop = self.add_shop('Unidade Centro')
+        self.middleware = BarbershopMiddleware(lambda request: HttpResponse())
+
+    def add_shop(self, name, owner=None):
+        return create_barbershop(owner or self.user, name, address='Rua A')
+
+    def make_request(self, barbershop_id):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        request.session = {SESSION_KEY: barbershop_id}
+        self.middleware(request)
+        return request
+
+    def test_lookup_is_lazy_and_cached(self):
+        with self.assertNumQueries(0):
+            request = self.make_request(self.shop.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(request.current_barbershop.name, 'Unidade Centro')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.make_request(self.shop.pk).current_barbershop.pk, self.shop.pk)
+
+    def test_save_and_delete_invalidate(self):
+        self.make_request(self.shop.pk).current_barbershop.pk
+        self.shop.name = 'Unidade Norte'
+        self.shop.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.make_request(self.shop.pk).current_barbershop.name, 'Unidade Norte')
+
+        shop_id = self.shop.pk
+        self.shop.delete()
+        self.assertFalse(self.make_request(shop_id).current_barbershop)
+
+    def test_other_owners_shop_is_not_current(self):
+        other = self.add_shop('Outra', owner=create_owner('other'))
+        self.assertFalse(self.make_request(other.pk).current_barbershop)
+        self.assertFalse(self.make_request(None).current_barbershop)
+
+    def test_switch_barbershop(self):
+        second = self.add_shop('Unidade Sul')
+        self.client.login(username='owner', password='12345')
+        dashboard = reverse('barbershop_management:dashboard')
+        self.assertRedirects(self.client.get(dashboard),
+                             reverse('barbershop_management:owner_dashboard'))
+
+        url = reverse('barbershop_management:switch_barbershop', args=[second.pk])
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.assertRedirects(self.client.post(url), dashboard)
+        self.assertEqual(self.client.session[SESSION_KEY], second.pk)
+        self.assertEqual(self.client.get(dashboard).context['barbershop'].pk, second.pk)
+
+        response = self.client.post(url, {'next': 'https://evil.example.com/'})
+        self.assertRedirects(response, dashboard)
+        response = self.client.post(
+            reverse('barbershop_management:switch_barbershop', args=[self.shop.pk]),
+            {'next': reverse('barbershop_management:barbershop_list')})
+        self.assertEqual(response['Location'], reverse('barbershop_management:barbershop_list'))
+
+        other = self.add_shop('Outra', owner=create_owner('other'))
+        response = self.client.post(
+            reverse('barbershop_management:switch_barbershop', args=[other.pk]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.session[SESSION_KEY], self.shop.pk)
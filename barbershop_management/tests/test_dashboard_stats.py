@@ -0,0 +1,64 @@
+from datetime import date, time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from barbershop_booking.testing import BarbershopFixturesMixin, create_service
+from barbershop_management.stats import compute_dashboard_stats, get_dashboard_stats, get_periods
+
+
+class DashboardStatsTestCase(BarbershopFixturesMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.set_up_barbershop()
+
+    def test_periods(self):
+        self.assertEqual(get_periods(date(2024, 2, 14)), {
+            'today': (date(2024, 2, 14), date(2024, 2, 14)),
+            'week': (date(2024, 2, 12), date(2024, 2, 18)),
+            'month': (date(2024, 2, 1), date(2024, 2, 29)),
+        })
+
+    def test_counts_and_revenue_in_one_query(self):
+        today = date(2024, 9, 4)
+        self.book(today)
+        self.book(today, time(11, 0), status='completed')
+        self.book(today, time(12, 0), status='cancelled')
+        self.book(date(2024, 9, 6))
+        self.book(date(2024, 9, 20))
+        self.book(date(2024, 8, 30))
+
+        with self.assertNumQueries(3):
+            stats = compute_dashboard_stats(self.barbershop.id, today)
+        self.assertEqual(stats['employees_count'], 1)
+        self.assertEqual(stats['services_count'], 1)
+        self.assertEqual(stats['appointments_count'], 6)
+        self.assertEqual(
+            (stats['appointments_today'], stats['appointments_week'], stats['appointments_month']),
+            (2, 3, 4))
+        # Só os concluídos contam na receita, como nos consolidados financeiros
+        self.assertEqual(stats['revenue_today'], Decimal('20.00'))
+        self.assertEqual(stats['revenue_month'], Decimal('20.00'))
+        self.assertEqual(stats['recent_employees'], [self.employee])
+
+    def test_snapshot_is_cached_until_a_write(self):
+        get_dashboard_stats(self.barbershop.id)
+        with self.assertNumQueries(0):
+            get_dashboard_stats(self.barbershop.id)
+
+        self.book(timezone.localdate())
+        stats = get_dashboard_stats(self.barbershop.id)
+        self.assertEqual(stats['appointments_today'], 1)
+
+        create_service(self.barbershop, 'Barba', price=15, duration=20, description='Barba')
+        self.assertEqual(get_dashboard_stats(self.barbershop.id)['services_count'], 2)
+
+    def test_dashboard_view_shows_periods(self):
+        self.book(timezone.localdate(), status='completed')
+        self.client.login(username='owner', password='12345')
+        response = self.client.get(reverse('barbershop_management:dashboard'))
+        self.assertEqual(response.context['appointments_today'], 1)
+        self.assertContains(response, '<strong>R$ 20,00</strong>', count=3)
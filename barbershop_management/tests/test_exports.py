@@ -0,0 +1,79 @@
+import csv
+import io
+from datetime import date
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from barbershop_booking.testing import (PASSWORD, BarbershopFixturesMixin, create_barbershop,
+                                        create_client, create_employee, create_owner, create_service)
+from barbershop_management.exports import iter_csv
+from barbershop_management.importers import import_csv
+from barbershop_management.models import Barbershop, Expense
+
+
+class CsvExportTestCase(BarbershopFixturesMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_owner()
+        self.client.login(username='owner', password=PASSWORD)
+        self.barbershop = create_barbershop(self.user)
+        self.employee = create_employee(self.barbershop, 'João')
+        self.service = create_service(self.barbershop, 'Corte', description='')
+        self.client_profile = create_client(self.barbershop, 'Ana, "a primeira"', '11911111111')
+        for day in (date(2024, 3, 1), date(2024, 3, 2), date(2024, 4, 1)):
+            self.book(day, status='completed')
+        Expense.objects.create(
+            barbershop=self.barbershop, description='Aluguel', amount=1500, date=date(2024, 3, 5),
+            expense_type='rent')
+
+    def export(self, kind, **params):
+        response = self.client.get(
+            reverse('barbershop_management:export_data', args=[self.barbershop.id, kind]), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_appointments_export_by_period(self):
+        rows = self.export('appointments', start_date='2024-03-01', end_date='2024-03-31')
+        self.assertEqual(rows[0][:7], [
+            'date', 'time', 'client_phone', 'client_name', 'employee_phone', 'service', 'status'])
+        self.assertEqual(rows[1], [
+            '2024-03-01', '10:00:00', '11911111111', 'Ana, "a primeira"', '+5511999999999',
+            'Corte', 'completed', 'João', '20.00'])
+        self.assertEqual([row[0] for row in rows[1:]], ['2024-03-01', '2024-03-02'])
+
+    def test_clients_and_expenses_export(self):
+        self.assertEqual(self.export('clients')[1][:2], ['Ana, "a primeira"', '11911111111'])
+        self.assertEqual(self.export('expenses')[1],
+                         ['2024-03-05', 'Aluguel', 'rent', '1500.00', ''])
+
+    def test_export_can_be_imported_back(self):
+        other = create_barbershop(
+            self.user, 'Other Barbershop', address='456 Test St', phone='0987654321',
+            email='other@example.com')
+        create_employee(other, 'João')
+        create_service(other, 'Corte', description='')
+        exported = ''.join(iter_csv('appointments', self.barbershop))
+        result = import_csv(other, 'appointments', io.StringIO(exported))
+        self.assertEqual((result.created, result.errors), (3, []))
+
+    def test_export_rejects_invalid_requests(self):
+        url = reverse('barbershop_management:export_data', args=[self.barbershop.id, 'appointments'])
+        self.assertEqual(self.client.get(url, {'start_date': '2024-04-01',
+                                               'end_date': '2024-03-01'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse(
+            'barbershop_management:export_data', args=[self.barbershop.id, 'users'])).status_code, 404)
+
+        create_owner('intruder')
+        self.client.login(username='intruder', password=PASSWORD)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_benchmark_command(self):
+        out = io.StringIO()
+        call_command('benchmark_export', count=500, max_rss_mb=64, stdout=out)
+        self.assertIn('500 linhas', out.getvalue())
+        self.assertFalse(Barbershop.objects.filter(name__startswith='Benchmark').exists())
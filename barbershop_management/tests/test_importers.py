@@ -0,0 +1,140 @@
+import io
+from datetime import date, time
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+
+from barbershop_booking.models import Appointment, Client
+from barbershop_booking.testing import (PASSWORD, create_barbershop, create_client, create_employee,
+                                        create_owner, create_service)
+from barbershop_management.importers import AppointmentImporter, ImportFileError, import_csv
+from barbershop_management.models import DailyRevenue, Employee, Service
+from barbershop_management.stats import get_dashboard_stats
+
+
+class CsvImportTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_owner()
+        self.client.login(username='owner', password=PASSWORD)
+        self.barbershop = create_barbershop(self.user)
+
+    def run_import(self, kind, content, chunk_size=1000):
+        return import_csv(self.barbershop, kind, io.StringIO(content), chunk_size)
+
+    def test_clients_are_upserted_by_phone(self):
+        create_client(self.barbershop, 'Antigo', '11911111111')
+        result = self.run_import('clients', (
+            'name,phone\n'
+            'Ana,11911111111\n'
+            'Bruno,11922222222\n'
+            ',11933333333\n'
+            'Carla,11944444444\n'
+            'Carla Souza,11944444444\n'
+        ), chunk_size=2)
+        # Com lotes de duas linhas, a segunda "Carla" atualiza a primeira, gravada no lote anterior
+        self.assertEqual((result.created, result.updated, result.skipped), (2, 2, 0))
+        self.assertEqual(result.errors, [(4, 'name: Este campo não pode estar vazio.')])
+        self.assertEqual(
+            dict(Client.objects.values_list('phone', 'name')),
+            {'11911111111': 'Ana', '11922222222': 'Bruno', '11944444444': 'Carla Souza'})
+
+    def test_duplicates_in_the_same_chunk_keep_the_last_row(self):
+        result = self.run_import('clients', 'name,phone\nA,1199\nB,1199\n')
+        self.assertEqual((result.created, result.skipped), (1, 1))
+        self.assertEqual(Client.objects.get().name, 'B')
+
+    def test_missing_columns(self):
+        with self.assertRaises(ImportFileError):
+            self.run_import('employees', 'name,phone\nJoão,+5511999999999\n')
+
+    def test_employees_and_services(self):
+        result = self.run_import('employees', (
+            'Name,Phone,Role,Hire_Date\n'
+            'João,+5511999999999,Barbeiro,01/02/2024\n'
+            'Pedro,abc,barber,2024-01-01\n'
+            'Maria,+5511988888888,cozinheira,2024-01-01\n'
+        ))
+        self.assertEqual(result.created, 1)
+        self.assertEqual([line for line, _ in result.errors], [3, 4])
+        employee = Employee.objects.get()
+        self.assertEqual((employee.role, employee.hire_date), ('barber', date(2024, 2, 1)))
+
+        create_service(self.barbershop, 'Corte', description='')
+        result = self.run_import('services', (
+            'name,price,duration,is_active\n'
+            'Corte,"25,90",40,sim\n'
+            'Barba,15,20,não\n'
+        ))
+        self.assertEqual((result.created, result.updated), (1, 1))
+        self.assertEqual(
+            set(Service.objects.values_list('name', 'price', 'duration', 'is_active')),
+            {('Corte', Decimal('25.90'), 40, True), ('Barba', Decimal('15.00'), 20, False)})
+
+    def test_appointments_are_deduplicated_and_update_caches(self):
+        employee = create_employee(self.barbershop, 'João')
+        create_service(self.barbershop, 'Corte', description='')
+        create_client(self.barbershop, 'Ana', '11911111111')
+        self.assertEqual(get_dashboard_stats(self.barbershop.id)['appointments_count'], 0)
+
+        content = (
+            'date,time,client_phone,client_name,employee_phone,service,status\n'
+            '2024-03-01,10:00,11911111111,,+5511999999999,corte,completed\n'
+            '2024-03-01,10:30,11922222222,Bruno,+5511999999999,Corte,completed\n'
+            '2024-03-01,11:00,11933333333,,+5511999999999,Corte,scheduled\n'
+            '2024-03-01,11:30,11911111111,,+5511900000000,Corte,scheduled\n'
+            '2024-03-02,09:00,11911111111,,+5511999999999,Corte,cancelled\n'
+        )
+        result = self.run_import('appointments', content)
+        self.assertEqual(result.created, 3)
+        self.assertEqual([line for line, _ in result.errors], [4, 5])
+        self.assertTrue(Client.objects.filter(phone='11922222222', name='Bruno').exists())
+        self.assertEqual(
+            DailyRevenue.objects.get(date=date(2024, 3, 1), employee=employee).revenue, Decimal('40'))
+        self.assertEqual(get_dashboard_stats(self.barbershop.id)['appointments_count'], 3)
+
+        # Reimportar o mesmo arquivo não duplica os agendamentos ativos
+        result = self.run_import('appointments', content)
+        self.assertEqual((result.created, result.skipped), (1, 2))
+        self.assertEqual(Appointment.objects.filter(time=time(10, 0)).count(), 1)
+
+    def test_slot_booked_during_import_is_skipped(self):
+        employee = create_employee(self.barbershop, 'João')
+        service = create_service(self.barbershop, 'Corte', description='')
+        client = create_client(self.barbershop, 'Ana', '11911111111')
+        client_ids = AppointmentImporter._client_ids
+
+        def book_then_resolve_clients(importer, rows):
+            # Outra requisição reserva o horário depois da checagem dos horários ocupados
+            Appointment.objects.create(
+                barbershop=self.barbershop, client=client, employee=employee, service=service,
+                date=date(2024, 3, 1), time=time(10, 0))
+            return client_ids(importer, rows)
+
+        with mock.patch.object(AppointmentImporter, '_client_ids', book_then_resolve_clients):
+            result = self.run_import('appointments', (
+                'date,time,client_phone,employee_phone,service\n'
+                '2024-03-01,10:00,11911111111,+5511999999999,Corte\n'
+                '2024-03-01,10:30,11911111111,+5511999999999,Corte\n'
+            ))
+        self.assertEqual((result.created, result.skipped), (1, 1))
+        self.assertEqual(Appointment.objects.count(), 2)
+
+    def test_upload_view(self):
+        url = reverse('barbershop_management:import_data', args=[self.barbershop.id])
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        upload = SimpleUploadedFile(
+            'clientes.csv', '\ufeffname,phone\nAna,11911111111\n,11922222222\n'.encode())
+        response = self.client.post(url, {'kind': 'clients', 'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['result'].created, 1)
+        self.assertEqual([line for line, _ in response.context['errors']], [3])
+
+        upload = SimpleUploadedFile('clientes.csv', b'nome\nAna\n')
+        response = self.client.post(url, {'kind': 'clients', 'file': upload})
+        self.assertIn('file', response.context['form'].errors)
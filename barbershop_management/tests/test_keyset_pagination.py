@@ -0,0 +1,127 @@
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from barbershop_booking.testing import PASSWORD, create_barbershop, create_owner, create_service
+from barbershop_management.models import Expense, Inventory
+from barbershop_management.pagination import (
+    InvalidCursor, decode_cursor, encode_cursor, paginate_keyset)
+
+
+class KeysetPaginationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_owner()
+        self.client.login(username='owner', password=PASSWORD)
+        self.barbershop = create_barbershop(self.user)
+
+    def add_expenses(self, count):
+        Expense.objects.bulk_create([
+            Expense(barbershop=self.barbershop, description=f'Despesa {i}', amount=10,
+                    date=date(2024, 1, 1) + timedelta(days=i // 3),
+                    expense_type='rent' if i % 2 else 'supplies')
+            for i in range(count)
+        ])
+
+    def test_pages_cover_all_rows_in_stable_order(self):
+        self.add_expenses(12)
+        ordering = ('-date', '-id')
+        expected = list(Expense.objects.order_by(*ordering).values_list('id', flat=True))
+
+        seen, cursor = [], None
+        while True:
+            page = paginate_keyset(Expense.objects.all(), ordering, cursor, page_size=5)
+            seen.extend(expense.id for expense in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+
+    def test_previous_cursor_walks_back_to_the_first_page(self):
+        self.add_expenses(12)
+        ordering = ('-date', '-id')
+        pages, cursor = [], None
+        while True:
+            page = paginate_keyset(Expense.objects.all(), ordering, cursor, page_size=5)
+            pages.append([expense.id for expense in page.items])
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        self.assertEqual([len(items) for items in pages], [5, 5, 2])
+        self.assertIsNotNone(page.previous_cursor)
+
+        # Do fim para o início, as páginas se repetem na mesma ordem
+        for expected in reversed(pages[:-1]):
+            page = paginate_keyset(Expense.objects.all(), ordering, page.previous_cursor, page_size=5)
+            self.assertEqual([expense.id for expense in page.items], expected)
+            self.assertIsNotNone(page.next_cursor)
+        self.assertIsNone(page.previous_cursor)
+        self.assertIsNone(paginate_keyset(Expense.objects.all(), ordering, page_size=5).previous_cursor)
+
+    def test_page_does_not_count_or_offset(self):
+        self.add_expenses(12)
+        first = paginate_keyset(Expense.objects.all(), ('-date', '-id'), page_size=5)
+        with self.assertNumQueries(1):
+            paginate_keyset(Expense.objects.all(), ('-date', '-id'), first.next_cursor, page_size=5)
+
+    def test_cursor_round_trip_and_invalid_cursor(self):
+        cursor = encode_cursor([date(2024, 1, 2), 7])
+        self.assertEqual(decode_cursor(Expense, ('-date', '-id'), cursor),
+                         ([date(2024, 1, 2), 7], False))
+        cursor = encode_cursor([date(2024, 1, 2), 7], previous=True)
+        self.assertEqual(decode_cursor(Expense, ('-date', '-id'), cursor),
+                         ([date(2024, 1, 2), 7], True))
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(Expense, ('-date', '-id'), 'nao-e-um-cursor')
+
+    def test_expense_list_filters_and_paginates(self):
+        self.add_expenses(60)
+        url = reverse('barbershop_management:expense_list', args=[self.barbershop.id])
+
+        response = self.client.get(url, {'expense_type': 'rent'})
+        self.assertEqual(response.status_code, 200)
+        first_page = response.context['expenses']
+        self.assertEqual(len(first_page), 25)
+        self.assertTrue(all(expense.expense_type == 'rent' for expense in first_page))
+        self.assertIn('expense_type=rent', response.context['next_page_query'])
+
+        response = self.client.get(f"{url}?{response.context['next_page_query']}")
+        second_page = response.context['expenses']
+        self.assertEqual(len(second_page), 5)
+        self.assertFalse({e.id for e in first_page} & {e.id for e in second_page})
+        self.assertIsNone(response.context['next_page_query'])
+
+        response = self.client.get(f"{url}?{response.context['previous_page_query']}")
+        self.assertEqual([e.id for e in response.context['expenses']], [e.id for e in first_page])
+        self.assertIsNone(response.context['previous_page_query'])
+        self.assertContains(response, 'Próxima página')
+
+    def test_invalid_cursor_falls_back_to_first_page(self):
+        for i in range(3):
+            create_service(self.barbershop, f'Serviço {i}', price=10, description='')
+        response = self.client.get(
+            reverse('barbershop_management:services', args=[self.barbershop.id]),
+            {'cursor': '%%%'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([s.name for s in response.context['services']],
+                         ['Serviço 0', 'Serviço 1', 'Serviço 2'])
+
+    def test_lists_only_show_the_owners_barbershops(self):
+        barbershop = create_barbershop(
+            create_owner('other'), 'Other Barbershop', address='456 Test St',
+            email='other@example.com')
+        for name in ('services', 'employee_list'):
+            response = self.client.get(reverse(f'barbershop_management:{name}', args=[barbershop.id]))
+            self.assertEqual(response.status_code, 404)
+
+    def test_inventory_low_stock_filter(self):
+        Inventory.objects.create(
+            barbershop=self.barbershop, name='Pomada', quantity=2, reorder_level=5, unit_price=10)
+        Inventory.objects.create(
+            barbershop=self.barbershop, name='Shampoo', quantity=20, reorder_level=5, unit_price=10)
+        response = self.client.get(
+            reverse('barbershop_management:inventory_list', args=[self.barbershop.id]),
+            {'low_stock': 'on'})
+        self.assertEqual([item.name for item in response.context['inventory_items']], ['Pomada'])
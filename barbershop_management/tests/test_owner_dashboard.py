@@ -0,0 +1,87 @@
+from datetime import date, time
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from barbershop_booking.models import Appointment
+from barbershop_booking.testing import (PASSWORD, create_barbershop, create_client, create_employee,
+                                        create_owner, create_service)
+from barbershop_management.models import Expense
+
+
+class OwnerDashboardTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_owner()
+        self.client.login(username='owner', password=PASSWORD)
+        self.url = reverse('barbershop_management:owner_dashboard')
+
+    def add_shop(self, index, appointments=1):
+        barbershop = create_barbershop(self.user, f'Unidade {index:02d}', address='Rua A')
+        employee = create_employee(barbershop)
+        service = create_service(barbershop)
+        client = create_client(barbershop)
+        for hour in range(appointments):
+            Appointment.objects.create(
+                client=client, employee=employee, service=service, barbershop=barbershop,
+                date=date(2024, 9, 2), time=time(8 + hour, 0),
+                status=('cancelled', 'completed', 'completed', 'scheduled')[hour % 4])
+        Expense.objects.create(
+            barbershop=barbershop, description='Aluguel', amount=Decimal('15.50'),
+            date=date(2024, 9, 1), expense_type='rent')
+        return barbershop
+
+    def test_dashboard_redirects_owners_with_several_shops(self):
+        shop = self.add_shop(1)
+        self.add_shop(2)
+        response = self.client.get(reverse('barbershop_management:dashboard'))
+        self.assertRedirects(response, self.url)
+
+        response = self.client.get(reverse('barbershop_management:dashboard'),
+                                   {'barbershop': shop.pk})
+        self.assertEqual(response.context['barbershop'], shop)
+
+        for value in ('abc', '-1', '1.0', '²'):
+            response = self.client.get(reverse('barbershop_management:dashboard'),
+                                       {'barbershop': value})
+            self.assertEqual(response.status_code, 404)
+
+    def test_query_count_does_not_grow_with_shops(self):
+        self.add_shop(1, appointments=3)
+        # Sessão, usuário, barbearias e uma consulta agrupada por tabela
+        with self.assertNumQueries(7):
+            self.client.get(self.url, {'month': '2024-09'})
+
+        cache.clear()
+        for index in range(2, 16):
+            self.add_shop(index, appointments=3)
+        self.add_shop(16, appointments=4)
+        with self.assertNumQueries(7):
+            response = self.client.get(self.url, {'month': '2024-09'})
+
+        rows, totals = response.context['rows'], response.context['totals']
+        self.assertEqual(len(rows), 16)
+        self.assertEqual(rows[0]['barbershop']['name'], 'Unidade 01')
+        self.assertEqual((rows[0]['completed'], rows[0]['cancelled']), (2, 1))
+        self.assertEqual(rows[0]['revenue'], Decimal('40'))
+        self.assertEqual(rows[0]['profit'], Decimal('24.50'))
+        # O agendamento ainda marcado da unidade 16 não entra na receita
+        self.assertEqual((rows[-1]['scheduled'], rows[-1]['revenue']), (1, Decimal('40')))
+        self.assertEqual(totals['employees'], 16)
+        self.assertEqual(totals['revenue'], Decimal('640'))
+        self.assertEqual(totals['expenses'], Decimal('248.00'))
+
+    def test_overview_is_cached_until_a_shop_changes(self):
+        shop = self.add_shop(1)
+        self.client.get(self.url, {'month': '2024-09'})
+        # Sessão, usuário e barbearias; métricas do cache
+        with self.assertNumQueries(3):
+            self.client.get(self.url, {'month': '2024-09'})
+
+        Expense.objects.create(
+            barbershop=shop, description='Luz', amount=Decimal('4.50'),
+            date=date(2024, 9, 3), expense_type='utilities')
+        response = self.client.get(self.url, {'month': '2024-09'})
+        self.assertEqual(response.context['totals']['expenses'], Decimal('20.00'))
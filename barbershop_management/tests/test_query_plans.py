@@ -0,0 +1,30 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from barbershop_management.management.commands.explain_hot_queries import full_scans
+
+
+class QueryPlanTestCase(TestCase):
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command('explain_hot_queries', stdout=out)
+        self.assertIn('Nenhuma consulta frequente faz varredura completa', out.getvalue())
+        # Consultas do dashboard, do painel dos donos e das listas por cursor
+        for name in ('métricas do dashboard', 'painel dos donos, appointments',
+                     'despesas, página após o cursor'):
+            self.assertIn(name, out.getvalue())
+
+
+class FullScanDetectionTestCase(SimpleTestCase):
+    def test_detects_table_scans(self):
+        plan = (
+            '3 0 0 SCAN barbershop_booking_appointment\n'
+            '5 0 0 SEARCH barbershop_management_service USING INTEGER PRIMARY KEY (rowid=?)'
+        )
+        self.assertEqual(full_scans(plan), ['3 0 0 SCAN barbershop_booking_appointment'])
+
+    def test_ignores_small_lookup_tables(self):
+        plan = '4 0 0 SCAN barbershop_management_dayofweek USING COVERING INDEX sqlite_autoindex_1'
+        self.assertEqual(full_scans(plan), [])
@@ -0,0 +1,145 @@
+from datetime import date, time
+from decimal import Decimal
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from barbershop_booking.models import Appointment
+from barbershop_booking.testing import BarbershopFixturesMixin, create_service
+from barbershop_management.models import DailyExpense, DailyRevenue, Expense
+from barbershop_management.rollups import monthly_report, yearly_report
+
+
+class FinancialRollupTestCase(BarbershopFixturesMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.set_up_barbershop()
+        self.haircut = self.service
+        self.beard = create_service(self.barbershop, 'Barba', price=15, duration=20, description='Barba')
+
+    def book(self, day, at, service=None, status='completed'):
+        return super().book(day, at, service=service or self.haircut, status=status)
+
+    def rollup(self):
+        return sorted(DailyRevenue.objects.values_list(
+            'date', 'service_id', 'appointments_count', 'revenue'))
+
+    def test_completed_appointments_update_revenue_incrementally(self):
+        day = date(2024, 9, 2)
+        appointment = self.book(day, time(9, 0), status='scheduled')
+        self.assertEqual(self.rollup(), [])
+
+        appointment.status = 'completed'
+        appointment.save()
+        self.book(day, time(10, 0))
+        self.assertEqual(self.rollup(), [(day, self.haircut.id, 2, Decimal('40'))])
+
+        appointment.service = self.beard
+        appointment.save()
+        self.assertEqual(self.rollup(), [
+            (day, self.haircut.id, 1, Decimal('20')),
+            (day, self.beard.id, 1, Decimal('15')),
+        ])
+
+        appointment.delete()
+        self.assertEqual(self.rollup(), [
+            (day, self.haircut.id, 1, Decimal('20')),
+            (day, self.beard.id, 0, Decimal('0')),
+        ])
+
+    def test_revenue_keeps_the_price_at_completion(self):
+        day = date(2024, 9, 2)
+        appointment = self.book(day, time(9, 0))
+        self.haircut.price = 25
+        self.haircut.save()
+        self.book(day, time(10, 0))
+        self.assertEqual(self.rollup(), [(day, self.haircut.id, 2, Decimal('45'))])
+
+        # A reconstrução soma os mesmos preços
+        call_command('rebuild_financial_rollups', stdout=StringIO())
+        self.assertEqual(self.rollup(), [(day, self.haircut.id, 2, Decimal('45'))])
+
+        # Cancelar retira o preço somado na conclusão, e não o atual
+        appointment.status = 'cancelled'
+        appointment.save()
+        self.assertIsNone(appointment.price)
+        self.assertEqual(self.rollup(), [(day, self.haircut.id, 1, Decimal('25'))])
+
+    def test_saving_an_unloaded_instance_is_not_counted_twice(self):
+        day = date(2024, 9, 2)
+        appointment = self.book(day, time(9, 0))
+        expense = Expense.objects.create(
+            barbershop=self.barbershop, description='Aluguel', amount=Decimal('100.00'),
+            date=day, expense_type='rent')
+        # Instâncias montadas à mão para linhas existentes
+        Appointment(
+            pk=appointment.pk, client=self.client_profile, employee=self.employee,
+            service=self.beard, barbershop=self.barbershop, date=day, time=time(9, 0),
+            status='completed', created_at=appointment.created_at).save()
+        Expense(pk=expense.pk, barbershop=self.barbershop, description='Aluguel',
+                amount=Decimal('120.00'), date=day, expense_type='rent').save()
+        self.assertEqual(self.rollup(), [
+            (day, self.haircut.id, 0, Decimal('0')),
+            (day, self.beard.id, 1, Decimal('15')),
+        ])
+        self.assertEqual(
+            list(DailyExpense.objects.values_list('expenses_count', 'amount')),
+            [(1, Decimal('120'))])
+
+    def test_expenses_update_rollup(self):
+        expense = Expense.objects.create(
+            barbershop=self.barbershop, description='Aluguel', amount=Decimal('100.00'),
+            date=date(2024, 9, 1), expense_type='rent')
+        expense.amount = Decimal('120.00')
+        expense.save()
+        Expense.objects.create(
+            barbershop=self.barbershop, description='Luz', amount=Decimal('30.00'),
+            date=date(2024, 9, 1), expense_type='utilities')
+        self.assertEqual(
+            sorted(DailyExpense.objects.values_list('expense_type', 'expenses_count', 'amount')),
+            [('rent', 1, Decimal('120')), ('utilities', 1, Decimal('30'))])
+
+    def test_rebuild_matches_incremental_rollups(self):
+        self.book(date(2024, 9, 2), time(9, 0))
+        self.book(date(2024, 10, 3), time(9, 0), service=self.beard)
+        self.book(date(2023, 5, 3), time(9, 0))
+        self.book(date(2024, 10, 3), time(10, 0), status='cancelled')
+        Expense.objects.create(
+            barbershop=self.barbershop, description='Aluguel', amount=Decimal('10.00'),
+            date=date(2024, 10, 1), expense_type='rent')
+        incremental = self.rollup()
+
+        # Alterações em massa não disparam sinais: o comando corrige os consolidados
+        Appointment.objects.filter(date=date(2024, 10, 3)).update(status='completed')
+        call_command('rebuild_financial_rollups', stdout=StringIO())
+        self.assertEqual(len(self.rollup()), len(incremental) + 1)
+        self.assertEqual(DailyExpense.objects.get().amount, Decimal('10'))
+
+        with self.assertNumQueries(2):
+            months = monthly_report(self.barbershop, 2024)
+        self.assertEqual([(row['period'], row['revenue'], row['expenses']) for row in months], [
+            (date(2024, 9, 1), Decimal('20'), Decimal('0')),
+            (date(2024, 10, 1), Decimal('35'), Decimal('10')),
+        ])
+        self.assertEqual([row['profit'] for row in yearly_report(self.barbershop)],
+                         [Decimal('20'), Decimal('45')])
+
+    def test_financial_report_view(self):
+        self.book(date(2024, 9, 2), time(9, 0))
+        self.client.login(username='owner', password='12345')
+        response = self.client.get(
+            reverse('barbershop_management:financial_report', args=[self.barbershop.id]),
+            {'year': 2024})
+        self.assertEqual(response.context['year_totals']['revenue'], Decimal('20'))
+        self.assertContains(response, 'Haircut: 1 - R$ 20,00')
+
+        # Anos inválidos mostram o ano atual
+        for year in ('abc', '0', '10000'):
+            response = self.client.get(
+                reverse('barbershop_management:financial_report', args=[self.barbershop.id]),
+                {'year': year})
+            self.assertEqual(response.context['year'], timezone.localdate().year)
@@ -0,0 +1,89 @@
+from datetime import date, time
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from barbershop_booking.forms import AppointmentForm
+from barbershop_booking.tenancy import barbershop_cache
+from barbershop_booking.testing import BarbershopFixturesMixin, create_days_of_week, open_on
+from barbershop_management.models import WorkingHours
+from barbershop_management.schedule import (CLOSED_MESSAGE, UNDEFINED_HOURS_MESSAGE,
+                                            OpeningInterval, get_schedule)
+
+MONDAY = date(2024, 9, 2)
+TUESDAY = date(2024, 9, 3)
+WEDNESDAY = date(2024, 9, 4)
+
+
+class CompiledScheduleTestCase(BarbershopFixturesMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        barbershop_cache.clear()
+        self.set_up_barbershop()
+        days = create_days_of_week()
+        self.monday, self.tuesday = days[0], days[1]
+        open_on(self.barbershop, self.monday, end_time=time(18, 0))
+        self.barbershop.working_days.add(self.tuesday)
+
+    def test_schedule_is_compiled_in_one_query(self):
+        with self.assertNumQueries(1):
+            schedule = get_schedule(self.barbershop)
+        self.assertEqual(schedule.open_days, 0b11)
+        self.assertEqual(schedule.intervals_on(MONDAY), (OpeningInterval(time(8, 0), time(18, 0)),))
+        self.assertTrue(schedule.is_open_at(MONDAY, time(8, 0)))
+        self.assertFalse(schedule.is_open_at(MONDAY, time(18, 0)))
+        self.assertIsNone(schedule.closed_message(MONDAY))
+        self.assertEqual(schedule.closed_message(TUESDAY), UNDEFINED_HOURS_MESSAGE)
+        self.assertEqual(schedule.closed_message(WEDNESDAY), CLOSED_MESSAGE)
+
+        with self.assertNumQueries(0):
+            get_schedule(self.barbershop.pk)
+
+    def test_schedule_changes_invalidate_cache(self):
+        get_schedule(self.barbershop)
+        WorkingHours.objects.filter(barbershop=self.barbershop).first().delete()
+        self.assertEqual(get_schedule(self.barbershop).closed_message(MONDAY), UNDEFINED_HOURS_MESSAGE)
+
+        self.barbershop.working_days.remove(self.monday)
+        self.assertFalse(get_schedule(self.barbershop).is_open_on(MONDAY))
+
+        self.tuesday.barbershops.clear()
+        self.assertEqual(get_schedule(self.barbershop).open_days, 0)
+
+    def test_form_validation_uses_cached_schedule(self):
+        get_schedule(self.barbershop)
+        data = {'service': self.service.id, 'employee': self.employee.id,
+                'date': MONDAY.isoformat(), 'time': '17:45'}
+        form = AppointmentForm(data)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertFalse(form.is_valid())
+        schedule_tables = ('dayofweek', 'workinghours', 'working_days')
+        self.assertEqual(
+            [query['sql'] for query in queries
+             if any(table in query['sql'] for table in schedule_tables)], [])
+        self.assertIn('O serviço selecionado termina após o horário de funcionamento.',
+                      form.non_field_errors())
+
+        data['time'] = '10:00'
+        self.assertTrue(AppointmentForm(data).is_valid())
+
+        data['date'] = WEDNESDAY.isoformat()
+        form = AppointmentForm(data)
+        self.assertFalse(form.is_valid())
+        self.assertIn('A barbearia está fechada neste dia.', form.non_field_errors())
+
+    def test_presentation_lists_hours_from_schedule(self):
+        url = reverse('barbershop_booking:barbershop_presentation',
+                      kwargs={'barbershop_name': self.barbershop.slug})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        hours = {day.day: value for day, value in response.context['working_hours_by_day']().items()}
+        self.assertEqual(hours, {
+            0: [OpeningInterval(time(8, 0), time(18, 0))],
+            1: ['Horário não cadastrado'],
+            **{day: ['Fechado'] for day in range(2, 7)},
+        })
+        self.assertContains(response, '08:00 - 18:00')
@@ -0,0 +1,285 @@
+import io
+import json
+import shutil
+import tempfile
+import uuid
+from datetime import date, time
+from pathlib import Path
+from unittest import mock
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from barbershop_booking.models import Appointment, Client, Notification
+from barbershop_booking.tenancy import barbershop_cache
+from barbershop_booking.testing import (create_barbershop, create_client, create_days_of_week,
+                                        create_employee, create_owner, create_service, open_on)
+from barbershop_management.models import (Barbershop, DayOfWeek, Employee, Service,
+                                          ShardAssignment, WorkingHours)
+from barbershop_management.schedule import get_schedule
+from barbershop_management.sharding import (SHARDED_APPS, TENANT_MODELS, is_sharded, placement,
+                                            shard_for, use_barbershop_shard)
+from barbershop_management.stats import compute_dashboard_stats
+from setup.database import sqlite_database
+
+SHARDS = ['shard_0', 'shard_1']
+SHARDING = override_settings(
+    SHARD_ALIASES=SHARDS,
+    DATABASE_ROUTERS=['setup.routers.MigrationRouter', 'setup.routers.ShardRouter'])
+
+
+class ShardModelsTestCase(SimpleTestCase):
+    def test_every_sharded_model_is_moved(self):
+        moved = {model for model, _ in TENANT_MODELS}
+        sharded = {
+            model for app_label in SHARDED_APPS
+            for model in apps.get_app_config(app_label).get_models(include_auto_created=True)
+            if is_sharded(model)
+        }
+        # A marca d'água é de cada banco, não de uma barbearia
+        self.assertEqual(sharded - moved, {apps.get_model('barbershop_booking', 'SchedulerWatermark')})
+
+    def test_placement_is_stable(self):
+        codes = [uuid.uuid4() for _ in range(200)]
+        placements = [placement(code, SHARDS) for code in codes]
+        self.assertEqual(placements, [placement(code, SHARDS) for code in codes])
+        self.assertEqual(set(placements), set(SHARDS))
+        # Um shard novo recebe apenas barbearias que saem dos demais
+        for code, before in zip(codes, placements):
+            self.assertIn(placement(code, [*SHARDS, 'shard_2']), {before, 'shard_2'})
+
+
+class ShardingTestCase(TransactionTestCase):
+    databases = {DEFAULT_DB_ALIAS, *SHARDS}
+    # Os ids começam em 1 em todos os bancos, como em shards novos
+    reset_sequences = True
+
+    @classmethod
+    def setUpClass(cls):
+        # Arquivos SQLite temporários no lugar dos servidores dos shards
+        cls.directory = Path(tempfile.mkdtemp(prefix='shards-'))
+        for alias in SHARDS:
+            database = sqlite_database(cls.directory / f'{alias}.sqlite3')
+            connections.settings[alias] = connections.configure_settings(
+                {DEFAULT_DB_ALIAS: database})[DEFAULT_DB_ALIAS]
+            call_command('migrate', database=alias, verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for alias in SHARDS:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+        shutil.rmtree(cls.directory, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        barbershop_cache.clear()
+        self.owner = create_owner()
+        self.monday = create_days_of_week()[0]
+
+    def create_barbershop(self, name='Test Barbershop'):
+        barbershop = create_barbershop(self.owner, name)
+        barbershop.working_days.add(self.monday)
+        return barbershop
+
+    def populate(self, barbershop):
+        open_on(barbershop, self.monday, end_time=time(10, 0))
+        employee = create_employee(barbershop)
+        service = create_service(barbershop, duration=60)
+        client = create_client(barbershop)
+        Appointment.objects.create(
+            client=client, employee=employee, service=service, barbershop=barbershop,
+            date=date(2024, 9, 2), time=time(8, 0))
+        return employee
+
+    def test_new_barbershop_is_assigned_and_replicated(self):
+        with SHARDING:
+            barbershop = self.create_barbershop()
+            alias = placement(barbershop.code, SHARDS)
+            self.assertEqual(ShardAssignment.objects.get(barbershop=barbershop).alias, alias)
+            self.assertEqual(shard_for(barbershop.pk), alias)
+
+            replica = Barbershop.objects.using(alias).get(pk=barbershop.pk)
+            self.assertEqual(replica.code, barbershop.code)
+            self.assertEqual(list(replica.working_days.values_list('day', flat=True)), [0])
+            self.assertEqual(DayOfWeek.objects.using(alias).count(), 7)
+            self.assertFalse(User.objects.using(alias).get(pk=self.owner.pk).has_usable_password())
+
+            barbershop.name = 'Renamed'
+            barbershop.save()
+            self.assertEqual(Barbershop.objects.using(alias).get(pk=barbershop.pk).name, 'Renamed')
+
+    def test_tenant_rows_are_routed_to_the_shard(self):
+        with SHARDING:
+            barbershop = self.create_barbershop()
+            alias = shard_for(barbershop.pk)
+            with use_barbershop_shard(barbershop.pk):
+                employee = self.populate(barbershop)
+            self.assertEqual(employee._state.db, alias)
+            self.assertFalse(Employee.objects.using(DEFAULT_DB_ALIAS).exists())
+            self.assertEqual(Appointment.objects.using(alias).count(), 1)
+            # Sem shard ativo, o banco vem do objeto relacionado
+            self.assertEqual(list(barbershop.employees.all()), [employee])
+            self.assertEqual(employee.barbershop, barbershop)
+
+            self.assertTrue(get_schedule(barbershop).is_open_on(date(2024, 9, 2)))
+            stats = compute_dashboard_stats(barbershop.pk, today=date(2024, 9, 2))
+            self.assertEqual((stats['employees_count'], stats['appointments_today']), (1, 1))
+
+    def test_views_activate_the_barbershop_shard(self):
+        with SHARDING:
+            barbershop = self.create_barbershop()
+            with use_barbershop_shard(barbershop.pk):
+                employee = self.populate(barbershop)
+
+            response = self.client.get(reverse('barbershop_booking:get_available_slots', kwargs={
+                'barbershop_name': barbershop.slug, 'employee_id': employee.pk, 'date': '2024-09-02'}))
+            self.assertEqual(response.json(), {'available_slots': ['09:00', '09:30']})
+            response = self.client.get(reverse('barbershop_booking:employee_schedule', kwargs={
+                'barbershop_name': barbershop.slug, 'employee_id': employee.pk}),
+                {'start': '2024-09-01', 'end': '2024-09-30'})
+            self.assertEqual(len(json.loads(b''.join(response.streaming_content))['appointments']), 1)
+
+            self.client.login(username='owner', password='12345')
+            response = self.client.get(reverse(
+                'barbershop_management:employee_list', args=[barbershop.pk]))
+            self.assertContains(response, 'John Doe')
+            # Sem barbearia ativa na sessão: o shard vem da barbearia da URL
+            response = self.client.get(reverse(
+                'barbershop_management:employee_detail', args=[barbershop.pk, employee.pk]))
+            self.assertContains(response, 'John Doe')
+            response = self.client.get(reverse('barbershop_management:owner_dashboard'),
+                                       {'month': '2024-09'})
+            self.assertEqual(response.context['totals']['employees'], 1)
+            self.assertEqual(response.context['totals']['scheduled'], 1)
+
+    def test_rebalance_moves_existing_barbershops(self):
+        # Criada antes do sharding: os dados ficam em default
+        barbershop = self.create_barbershop()
+        self.populate(barbershop)
+        with SHARDING:
+            self.assertEqual(shard_for(barbershop.pk), DEFAULT_DB_ALIAS)
+            target = placement(barbershop.code, SHARDS)
+
+            out = io.StringIO()
+            call_command('rebalance_shards', dry_run=True, stdout=out)
+            self.assertIn(f'default -> {target}', out.getvalue())
+            self.assertEqual(shard_for(barbershop.pk), DEFAULT_DB_ALIAS)
+
+            out = io.StringIO()
+            call_command('rebalance_shards', stdout=out)
+            self.assertIn('1 barbearia(s) movida(s), 6 linha(s) copiada(s)', out.getvalue())
+            self.assertEqual(shard_for(barbershop.pk), target)
+            self.assertFalse(Appointment.objects.using(DEFAULT_DB_ALIAS).exists())
+            self.assertFalse(WorkingHours.objects.using(DEFAULT_DB_ALIAS).exists())
+            self.assertEqual(Appointment.objects.using(target).count(), 1)
+            self.assertTrue(Barbershop.objects.using(DEFAULT_DB_ALIAS).filter(pk=barbershop.pk).exists())
+
+            out = io.StringIO()
+            call_command('rebalance_shards', stdout=out)
+            self.assertIn('0 barbearia(s) movida(s)', out.getvalue())
+
+            other = next(alias for alias in SHARDS if alias != target)
+            call_command('rebalance_shards', barbershop=[barbershop.pk], target=other,
+                         stdout=io.StringIO())
+            self.assertEqual(Appointment.objects.using(other).count(), 1)
+            self.assertFalse(Appointment.objects.using(target).exists())
+            self.assertFalse(Barbershop.objects.using(target).filter(pk=barbershop.pk).exists())
+
+    def test_move_into_shard_with_other_barbershop_remaps_ids(self):
+        # Criada antes do sharding: ids 1.. em default, os mesmos da outra no shard
+        moved = self.create_barbershop('Moved Barbershop')
+        moved_employee = self.populate(moved)
+        with SHARDING:
+            resident = self.create_barbershop()
+            target = shard_for(resident.pk)
+            with use_barbershop_shard(resident.pk):
+                resident_employee = self.populate(resident)
+            self.assertEqual(resident_employee.pk, moved_employee.pk)
+
+            call_command('rebalance_shards', barbershop=[moved.pk], target=target,
+                         stdout=io.StringIO())
+            self.assertEqual(shard_for(moved.pk), target)
+            for barbershop in (resident, moved):
+                appointment = Appointment.objects.using(target).select_related(
+                    'employee', 'client', 'service').get(barbershop=barbershop)
+                self.assertEqual(appointment.employee.barbershop_id, barbershop.pk)
+                self.assertEqual(appointment.client.barbershop_id, barbershop.pk)
+                self.assertEqual(appointment.service.barbershop_id, barbershop.pk)
+            self.assertEqual(Employee.objects.using(target).get(pk=resident_employee.pk).barbershop,
+                             resident)
+            self.assertFalse(Employee.objects.using(DEFAULT_DB_ALIAS).exists())
+
+            # E de volta: os ids novos estão livres em default e são mantidos
+            employee_id = Employee.objects.using(target).get(barbershop=moved).pk
+            call_command('rebalance_shards', barbershop=[moved.pk], target=DEFAULT_DB_ALIAS,
+                         stdout=io.StringIO())
+            self.assertEqual(Employee.objects.using(DEFAULT_DB_ALIAS).get(barbershop=moved).pk,
+                             employee_id)
+            self.assertEqual(WorkingHours.objects.using(target).get().barbershop_id, resident.pk)
+
+    def test_notifications_wait_for_the_shard_transaction(self):
+        with SHARDING:
+            barbershop = self.create_barbershop()
+            alias = shard_for(barbershop.pk)
+            with use_barbershop_shard(barbershop.pk):
+                with transaction.atomic(using=alias):
+                    self.populate(barbershop)
+                    self.assertFalse(Notification.objects.using(alias).exists())
+                self.assertEqual(Notification.objects.using(alias).get().type,
+                                 'appointment_confirmation')
+
+                with self.assertRaises(RuntimeError), transaction.atomic(using=alias):
+                    Appointment.objects.create(
+                        client=Client.objects.get(), employee=Employee.objects.get(),
+                        service=Service.objects.get(), barbershop=barbershop,
+                        date=date(2024, 9, 2), time=time(9, 0))
+                    raise RuntimeError
+                self.assertEqual(Notification.objects.using(alias).count(), 1)
+            self.assertFalse(Notification.objects.using(DEFAULT_DB_ALIAS).exists())
+
+    def test_migrating_a_shard_leaves_default_data_alone(self):
+        # A confirmação fica pendente em default
+        self.populate(self.create_barbershop())
+        with SHARDING:
+            call_command('migrate', 'barbershop_booking', '0006', database='shard_1', verbosity=0)
+            # A migração de dados 0007 marca como enviadas as notificações do banco migrado
+            call_command('migrate', 'barbershop_booking', database='shard_1', verbosity=0)
+        self.assertEqual(Notification.objects.using(DEFAULT_DB_ALIAS).get().status, 'pending')
+
+    def test_failed_migration_stops_routing_to_the_migrated_db(self):
+        def fail(*args, **kwargs):
+            self.assertEqual(router.db_for_write(Notification), 'shard_1')
+            raise RuntimeError
+
+        with SHARDING, mock.patch(
+                'django.core.management.commands.migrate.MigrationExecutor.migrate', side_effect=fail):
+            with self.assertRaises(RuntimeError):
+                call_command('migrate', database='shard_1', verbosity=0)
+            self.assertEqual(router.db_for_write(Notification), DEFAULT_DB_ALIAS)
+
+    def test_deleting_barbershop_deletes_shard_rows(self):
+        with SHARDING:
+            barbershop = self.create_barbershop()
+            alias = shard_for(barbershop.pk)
+            with use_barbershop_shard(barbershop.pk):
+                self.populate(barbershop)
+            barbershop.delete()
+            self.assertFalse(Barbershop.objects.using(alias).exists())
+            self.assertFalse(Appointment.objects.using(alias).exists())
+            self.assertFalse(ShardAssignment.objects.exists())
+
+    def test_rebalance_requires_sharding(self):
+        with self.assertRaisesMessage(CommandError, 'DJANGO_SHARDS'):
+            call_command('rebalance_shards')
+        with SHARDING, self.assertRaisesMessage(CommandError, '--to exige --barbershop'):
+            call_command('rebalance_shards', target='shard_0')
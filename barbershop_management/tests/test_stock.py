@@ -0,0 +1,94 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from barbershop_booking.testing import PASSWORD, create_barbershop, create_owner
+from barbershop_management.models import Inventory
+from barbershop_management.stock import ADJUST_BATCH_SIZE, StockAdjustmentError, adjust_stock
+
+
+class StockAdjustmentTestCase(TestCase):
+    def setUp(self):
+        self.user = create_owner()
+        self.client.login(username='owner', password=PASSWORD)
+        self.barbershop = create_barbershop(self.user)
+        self.other = create_barbershop(
+            self.user, 'Other Barbershop', address='456 Test St', phone='0987654321',
+            email='other@example.com')
+        self.pomade = Inventory.objects.create(
+            barbershop=self.barbershop, name='Pomada', quantity=10, reorder_level=5, unit_price=10)
+        self.shampoo = Inventory.objects.create(
+            barbershop=self.barbershop, name='Shampoo', quantity=3, reorder_level=5, unit_price=10)
+        self.foreign = Inventory.objects.create(
+            barbershop=self.other, name='Cera', quantity=10, reorder_level=5, unit_price=10)
+
+    def quantities(self):
+        return dict(Inventory.objects.values_list('name', 'quantity'))
+
+    def test_low_stock_flag_is_maintained_by_the_database(self):
+        self.assertEqual(
+            list(Inventory.objects.filter(is_low_stock=True).values_list('name', flat=True)),
+            ['Shampoo'])
+        Inventory.objects.filter(pk=self.pomade.pk).update(quantity=5)
+        self.assertEqual(
+            set(Inventory.objects.filter(is_low_stock=True).values_list('name', flat=True)),
+            {'Pomada', 'Shampoo'})
+
+    def test_adjusts_in_one_update_per_batch(self):
+        with self.assertNumQueries(4):  # savepoint, UPDATE, SELECT, release
+            quantities = adjust_stock(self.barbershop.id, {self.pomade.id: -4, self.shampoo.id: 7})
+        self.assertEqual(quantities, {self.pomade.id: 6, self.shampoo.id: 10})
+        self.assertEqual(self.quantities(), {'Pomada': 6, 'Shampoo': 10, 'Cera': 10})
+
+    def test_adjustment_is_relative_to_the_current_value(self):
+        # Uma alteração gravada depois da leitura do item não é sobrescrita
+        Inventory.objects.filter(pk=self.pomade.pk).update(quantity=20)
+        adjust_stock(self.barbershop.id, {self.pomade.id: -1})
+        self.assertEqual(self.quantities()['Pomada'], 19)
+
+    def test_many_items_are_split_in_batches(self):
+        items = Inventory.objects.bulk_create([
+            Inventory(barbershop=self.barbershop, name=f'Item {i}', quantity=1,
+                      reorder_level=0, unit_price=1)
+            for i in range(ADJUST_BATCH_SIZE + 10)
+        ])
+        quantities = adjust_stock(self.barbershop.id, {item.id: 2 for item in items})
+        self.assertEqual(set(quantities.values()), {3})
+
+    def test_nothing_is_applied_on_error(self):
+        with self.assertRaises(StockAdjustmentError):
+            adjust_stock(self.barbershop.id, {self.pomade.id: 1, self.foreign.id: 1})
+        with self.assertRaises(StockAdjustmentError):
+            adjust_stock(self.barbershop.id, {self.pomade.id: 1, self.shampoo.id: -4})
+        self.assertEqual(self.quantities(), {'Pomada': 10, 'Shampoo': 3, 'Cera': 10})
+
+    def test_adjust_endpoint(self):
+        url = reverse('barbershop_management:inventory_adjust', args=[self.barbershop.id])
+        response = self.client.post(url, json.dumps({'adjustments': [
+            {'id': self.pomade.id, 'delta': -2}, {'id': self.pomade.id, 'delta': -1},
+        ]}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['items'], [{'id': self.pomade.id, 'quantity': 7}])
+
+        response = self.client.post(url, 'nao é json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(url, json.dumps({'adjustments': [
+            {'id': self.foreign.id, 'delta': 1}]}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.quantities()['Cera'], 10)
+
+    def test_adjust_stock_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as csv_file:
+            csv_file.write(f'id,delta\n{self.pomade.id},5\n{self.shampoo.id},-3\n')
+        self.addCleanup(os.remove, csv_file.name)
+        call_command('adjust_stock', self.barbershop.id, csv_file.name, stdout=StringIO())
+        self.assertEqual(self.quantities(), {'Pomada': 15, 'Shampoo': 0, 'Cera': 10})
+
+        with self.assertRaises(CommandError):
+            call_command('adjust_stock', self.other.id, csv_file.name)
@@ -8,6 +8,8 @@ urlpatterns = [
     path('', views.presentation, name='presentation'),
     # Dashboard
     path('barbershops/', views.dashboard, name='dashboard'),
+    # Painel consolidado dos donos com várias unidades
+    path('barbershops/overview/', views.owner_dashboard, name='owner_dashboard'),
 
     # Barbershop URLs
     path('barbershops/', views.barbershop_list, name='barbershop_list'),
@@ -16,11 +18,13 @@ urlpatterns = [
          views.barbershop_detail, name='barbershop_detail'),
     path('barbershops/<int:barbershop_id>/edit/',
          views.barbershop_edit, name='barbershop_edit'),
+    path('barbershops/<int:barbershop_id>/switch/',
+         views.switch_barbershop, name='switch_barbershop'),
 
     # Employee URLs
     path('barbershops/<int:barbershop_id>/employees/',
          views.employee_list, name='employee_list'),
-    path('employees/<int:employee_id>/',
+    path('barbershops/<int:barbershop_id>/employees/<int:employee_id>/',
          views.employee_detail, name='employee_detail'),
     path('barbershops/<int:barbershop_id>/employees/create/',
          views.employee_create, name='employee_create'),
@@ -43,29 +47,39 @@ urlpatterns = [
          views.working_hours_list, name='working_hours_list'),
     path('barbershops/<int:barbershop_id>/working-hours/create/',
          views.working_hours_create, name='working_hours_create'),
-    path('working-hours/<int:working_hours_id>/edit/',
+    path('barbershops/<int:barbershop_id>/working-hours/<int:working_hours_id>/edit/',
          views.working_hours_edit, name='working_hours_edit'),
-    path('working-hours/<int:working_hours_id>/delete/',
+    path('barbershops/<int:barbershop_id>/working-hours/<int:working_hours_id>/delete/',
          views.working_hours_delete, name='working_hours_delete'),
 
+    # Relatório financeiro (consolidados diários)
+    path('barbershops/<int:barbershop_id>/import/',
+         views.import_data, name='import_data'),
+    path('barbershops/<int:barbershop_id>/export/<str:kind>.csv',
+         views.export_data, name='export_data'),
+    path('barbershops/<int:barbershop_id>/reports/financial/',
+         views.financial_report, name='financial_report'),
+
     # Expense URLs
     path('barbershops/<int:barbershop_id>/expenses/',
          views.expense_list, name='expense_list'),
     path('barbershops/<int:barbershop_id>/expenses/create/',
          views.expense_create, name='expense_create'),
-    path('expenses/<int:expense_id>/edit/',
+    path('barbershops/<int:barbershop_id>/expenses/<int:expense_id>/edit/',
          views.expense_edit, name='expense_edit'),
-    path('expenses/<int:expense_id>/delete/',
+    path('barbershops/<int:barbershop_id>/expenses/<int:expense_id>/delete/',
          views.expense_delete, name='expense_delete'),
 
     # Inventory URLs
     path('barbershops/<int:barbershop_id>/inventory/',
          views.inventory_list, name='inventory_list'),
+    path('barbershops/<int:barbershop_id>/inventory/adjust/',
+         views.inventory_adjust, name='inventory_adjust'),
     path('barbershops/<int:barbershop_id>/inventory/create/',
          views.inventory_create, name='inventory_create'),
-    path('inventory/<int:inventory_id>/edit/',
+    path('barbershops/<int:barbershop_id>/inventory/<int:inventory_id>/edit/',
          views.inventory_edit, name='inventory_edit'),
-    path('inventory/<int:inventory_id>/delete/',
+    path('barbershops/<int:barbershop_id>/inventory/<int:inventory_id>/delete/',
          views.inventory_delete, name='inventory_delete'),
 
     # EmployeeService URLs
@@ -73,7 +87,7 @@ urlpatterns = [
          views.employee_service_list, name='employee_service_list'),
     path('barbershops/<int:barbershop_id>/employee-services/create/',
          views.employee_service_create, name='employee_service_create'),
-    path('employee-services/<int:employee_service_id>/delete/',
+    path('barbershops/<int:barbershop_id>/employee-services/<int:employee_service_id>/delete/',
          views.employee_service_delete, name='employee_service_delete'),
 
     # Generate Booking Link
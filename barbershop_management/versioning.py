@@ -0,0 +1,55 @@
+"""
+Chaves de versão para invalidar caches sem apagar entradas.
+
+Cada cache inclui na sua chave a versão atual de um ou mais escopos (por
+exemplo, a barbearia). Invalidar um escopo é apenas incrementar sua versão:
+entradas antigas deixam de ser lidas e expiram sozinhas, e um cálculo
+iniciado antes da alteração nunca sobrescreve o cache com dados antigos.
+"""
+import time
+
+from django.core.cache import cache
+
+VERSION_TIMEOUT = 60 * 60 * 24
+
+
+def _new_version():
+    # Versões novas nunca coincidem com versões antigas que tenham sido removidas do cache
+    return time.time_ns()
+
+
+def bump_version(key):
+    """Incrementa a versão ``key``, invalidando tudo o que foi gravado com ela."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), VERSION_TIMEOUT)
+
+
+def get_versions(*keys):
+    """Retorna ``{chave: versão}``, criando as versões que ainda não existem."""
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            version = _new_version()
+            if not cache.add(key, version, VERSION_TIMEOUT):
+                # Outro processo criou a versão primeiro
+                version = cache.get(key, version)
+            versions[key] = version
+    return versions
+
+
+def get_version(key):
+    return get_versions(key)[key]
+
+
+async def aget_versions(*keys):
+    """Versão assíncrona de ``get_versions``, para views ``async``."""
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            version = _new_version()
+            if not await cache.aadd(key, version, VERSION_TIMEOUT):
+                version = await cache.aget(key, version)
+            versions[key] = version
+    return versions
@@ -2,12 +2,25 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from barbershop_booking.models import Appointment
+from barbershop_booking.calendar_feed import barbershop_feed_url, employee_feed_url
 from .models import Barbershop, Employee, Service, WorkingHours, Expense, Inventory, EmployeeService
+from .exports import EXPORTS, export_filename, iter_csv
+from .importers import MAX_REPORTED_ERRORS, ImportFileError, import_csv
+from .middleware import set_current_barbershop
+from .rollups import breakdown, monthly_report, yearly_report
+from .stats import get_dashboard_stats, get_owner_stats, get_periods
+from .stock import StockAdjustmentError, adjust_stock, parse_adjustments
 from .forms import BarbershopForm, EmployeeForm, ServiceForm, WorkingHoursForm, ExpenseForm, InventoryForm, EmployeeServiceForm, LoginForm
+from .forms import EmployeeSearchForm, ExpenseSearchForm, ExportForm, ImportForm, InventorySearchForm, ServiceSearchForm
+from .pagination import CURSOR_PARAM, InvalidCursor, page_query, paginate_keyset
 from django.utils import timezone
+from django.utils.http import url_has_allowed_host_and_scheme
+from datetime import MAXYEAR, MINYEAR, date, datetime
+import io
+import json
 
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
+from django.http import Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET, require_POST
 from django.contrib.auth import authenticate, login, logout
 
 from django.db.models import OuterRef, Subquery
@@ -15,13 +28,41 @@ from django.db.models.functions import Concat
 from django.db.models import CharField, Value
 
 
+# Ordem das listas de despesas (mais recentes primeiro) e de inventário
+EXPENSE_ORDERING = ('-date', '-id')
+INVENTORY_ORDERING = ('name', 'id')
+
+
+def _paginated_list(request, queryset, ordering, search_form=None):
+    """
+    Aplica o formulário de busca e a paginação por cursor a ``queryset``.
+
+    Returns:
+        dict: itens da página, querystrings da próxima página e da anterior e o formulário.
+    """
+    if search_form is not None and search_form.is_valid():
+        queryset = search_form.filter(queryset)
+    try:
+        page = paginate_keyset(queryset, ordering, request.GET.get(CURSOR_PARAM))
+    except InvalidCursor:
+        page = paginate_keyset(queryset, ordering)
+    return {
+        'page_items': page.items,
+        'next_page_query': page_query(request, page.next_cursor) if page.next_cursor else None,
+        'previous_page_query': (
+            page_query(request, page.previous_cursor) if page.previous_cursor else None),
+        'search_form': search_form,
+    }
+
+
 @login_required
 def dashboard(request):
     """
     Exibe o dashboard principal para o usuário logado.
 
     Esta view mostra uma visão geral da barbearia do usuário, incluindo contagens
-    de funcionários e serviços, bem como listas de funcionários e serviços recentes.
+    de funcionários e serviços, agendamentos e receita de hoje, da semana e do
+    mês, bem como listas de funcionários e serviços recentes.
 
     Args:
         request (HttpRequest): O objeto de requisição HTTP.
@@ -29,19 +70,63 @@ def dashboard(request):
     Returns:
         HttpResponse: A resposta renderizada com o template do dashboard.
 
+    Donos com mais de uma barbearia são levados ao painel consolidado, a
+    menos que escolham uma unidade com o parâmetro ``barbershop`` ou tenham
+    uma barbearia ativa na sessão (``switch_barbershop``).
+
     Raises:
-        Http404: Se a barbearia associada ao usuário não for encontrada.
+        Http404: Se a barbearia associada ao usuário (ou a do parâmetro
+            ``barbershop``) não for encontrada.
     """
-    barbershop = get_object_or_404(Barbershop, owner=request.user)
+    barbershops = Barbershop.objects.filter(owner=request.user)
+    if request.GET.get('barbershop'):
+        if not request.GET['barbershop'].isdecimal():
+            raise Http404('Barbearia não encontrada.')
+        barbershop = get_object_or_404(barbershops, pk=request.GET['barbershop'])
+    elif request.current_barbershop:
+        barbershop = request.current_barbershop
+    else:
+        owned = list(barbershops[:2])
+        if not owned:
+            raise Http404('Nenhuma barbearia encontrada.')
+        if len(owned) > 1:
+            # Donos com várias unidades veem o painel consolidado
+            return redirect('barbershop_management:owner_dashboard')
+        barbershop = owned[0]
+    # Snapshot em cache, invalidado quando agendamentos, funcionários ou serviços mudam
+    context = {'barbershop': barbershop, **get_dashboard_stats(barbershop.id)}
+    return render(request, 'barbearia/management/dashboard.html', context)
+
+
+@login_required
+def owner_dashboard(request):
+    """
+    Exibe o painel consolidado de todas as barbearias do usuário logado.
+
+    Mostra, para cada unidade e para o total da rede, funcionários, serviços,
+    agendamentos por status, receita e despesas do mês escolhido (parâmetro
+    ``month`` no formato AAAA-MM; por padrão, o mês atual). O número de
+    consultas não depende do número de unidades.
+
+    Args:
+        request (HttpRequest): O objeto de requisição HTTP.
+
+    Returns:
+        HttpResponse: A resposta renderizada com o template do painel consolidado.
+    """
+    try:
+        month = (datetime.strptime(request.GET['month'], '%Y-%m').date()
+                 if request.GET.get('month') else timezone.localdate())
+    except ValueError:
+        month = timezone.localdate()
+    date_range = get_periods(month)['month']
+    rows, totals = get_owner_stats(request.user, date_range)
     context = {
-        'barbershop': barbershop,
-        'employees_count': Employee.objects.filter(barbershop=barbershop).count(),
-        'services_count': Service.objects.filter(barbershop=barbershop).count(),
-        'appointments_count': Appointment.objects.filter(barbershop=barbershop).count(),
-        'recent_employees': Employee.objects.filter(barbershop=barbershop).order_by('-id')[:5],
-        'recent_services': Service.objects.filter(barbershop=barbershop).order_by('-id')[:5],
+        'rows': rows,
+        'totals': totals,
+        'month': date_range[0],
     }
-    return render(request, 'barbearia/management/dashboard.html', context)
+    return render(request, 'barbearia/management/owner_dashboard.html', context)
 
 
 @login_required
@@ -56,7 +141,11 @@ def barbershop_list(request):
         HttpResponse: A resposta renderizada com a lista de barbearias.
     """
     barbershops = Barbershop.objects.filter(owner=request.user)
-    return render(request, 'barbearia/management/barbershop_list.html', {'barbershops': barbershops})
+    current = request.current_barbershop
+    return render(request, 'barbearia/management/barbershop_list.html', {
+        'barbershops': barbershops,
+        'current_barbershop_id': current.pk if current else None,
+    })
 
 
 @login_required
@@ -89,6 +178,7 @@ def barbershop_detail(request, barbershop_id):
         'services': services,
         'expenses': expenses,
         'inventory': inventory,
+        'calendar_feed_url': request.build_absolute_uri(barbershop_feed_url(barbershop)),
     }
     return render(request, 'barbearia/management/barbershop_detail.html', context)
 
@@ -154,31 +244,45 @@ def barbershop_edit(request, barbershop_id):
 
 
 @login_required
-def employee_list(request, barbershop_id):
+@require_POST
+def switch_barbershop(request, barbershop_id):
     """
-    Lista todos os funcionários de uma barbearia específica.
+    Torna uma barbearia do usuário logado a barbearia ativa da sessão.
+
+    Redireciona para ``next``, quando é um endereço deste site, ou para o
+    dashboard da barbearia escolhida.
 
     Args:
         request (HttpRequest): O objeto de requisição HTTP.
-        barbershop_id (int): O ID da barbearia cujos funcionários serão listados.
+        barbershop_id (int): O ID da barbearia a ser ativada.
 
     Returns:
-        HttpResponse: A resposta renderizada com a lista de funcionários.
+        HttpResponseRedirect: Redirecionamento após a troca.
 
     Raises:
         Http404: Se a barbearia não for encontrada ou não pertencer ao usuário logado.
     """
-    barbershop = get_object_or_404(Barbershop, id=barbershop_id)
-    
+    barbershop = get_object_or_404(Barbershop, id=barbershop_id, owner=request.user)
+    set_current_barbershop(request, barbershop)
+    messages.success(request, f'Barbearia ativa: {barbershop.name}.')
+    next_url = request.POST.get('next')
+    if next_url and url_has_allowed_host_and_scheme(
+            next_url, allowed_hosts={request.get_host()}, require_https=request.is_secure()):
+        return redirect(next_url)
+    return redirect('barbershop_management:dashboard')
+
+
+def employee_list_query(barbershop, today):
+    """Funcionários da barbearia anotados com o próximo agendamento marcado a partir de ``today``."""
     # Subconsulta para o próximo agendamento
     next_appointment = Appointment.objects.filter(
         employee=OuterRef('pk'),
-        date__gte=timezone.now().date(),
+        date__gte=today,
         status='scheduled'  # Ajuste conforme necessário
     ).order_by('date', 'time').values('date', 'time')[:1]
 
     # Anotação para formatar a data e hora
-    employees = Employee.objects.filter(barbershop=barbershop).annotate(
+    return Employee.objects.filter(barbershop=barbershop).annotate(
         next_appointment_date=Subquery(next_appointment.values('date')),
         next_appointment_time=Subquery(next_appointment.values('time'))
     ).annotate(
@@ -189,30 +293,62 @@ def employee_list(request, barbershop_id):
             output_field=CharField()
         )
     )
-    
+
+
+@login_required
+def employee_list(request, barbershop_id):
+    """
+    Lista os funcionários de uma barbearia específica, com busca e paginação por cursor.
+
+    Args:
+        request (HttpRequest): O objeto de requisição HTTP.
+        barbershop_id (int): O ID da barbearia cujos funcionários serão listados.
+
+    Returns:
+        HttpResponse: A resposta renderizada com a lista de funcionários.
+
+    Raises:
+        Http404: Se a barbearia não for encontrada ou não pertencer ao usuário logado.
+    """
+    barbershop = get_object_or_404(
+        Barbershop, id=barbershop_id, owner=request.user)
+    employees = employee_list_query(barbershop, timezone.now().date())
+
+    listing = _paginated_list(
+        request, employees, ('name', 'id'), EmployeeSearchForm(request.GET))
     context = {
         'barbershop': barbershop,
-        'employees': employees,
+        'employees': listing['page_items'],
+        **listing,
     }
     return render(request, 'barbearia/management/employee_list.html', context)
 
 @login_required
-def employee_detail(request, employee_id):
+def employee_detail(request, barbershop_id, employee_id):
     """
     Exibe os detalhes de um funcionário específico.
 
     Args:
         request (HttpRequest): O objeto de requisição HTTP.
+        barbershop_id (int): O ID da barbearia do funcionário.
         employee_id (int): O ID do funcionário a ser exibido.
 
     Returns:
         HttpResponse: A resposta renderizada com o template de detalhes do funcionário.
 
     Raises:
-        Http404: Se o funcionário não for encontrado.
+        Http404: Se o funcionário não for encontrado ou não pertencer a uma
+            barbearia do usuário logado.
     """
-    employee = get_object_or_404(Employee, id=employee_id)
-    return render(request, 'barbearia/management/employee_detail.html', {'employee': employee})
+    employee = get_object_or_404(
+        Employee.objects.select_related('barbershop'), id=employee_id,
+        barbershop_id=barbershop_id, barbershop__owner=request.user)
+    calendar_feed_url = request.build_absolute_uri(
+        employee_feed_url(employee.barbershop, employee.id))
+    return render(request, 'barbearia/management/employee_detail.html', {
+        'employee': employee,
+        'calendar_feed_url': calendar_feed_url,
+    })
 
 
 @login_required
@@ -314,7 +450,7 @@ def employee_delete(request, barbershop_id, employee_id):
 @login_required
 def service_list(request, barbershop_id):
     """
-    Lista todos os serviços de uma barbearia específica.
+    Lista os serviços de uma barbearia específica, com busca e paginação por cursor.
 
     Args:
         request (HttpRequest): O objeto de requisição HTTP.
@@ -326,9 +462,13 @@ def service_list(request, barbershop_id):
     Raises:
         Http404: Se a barbearia não for encontrada ou não pertencer ao usuário logado.
     """
-    barbershop = get_object_or_404(Barbershop, id=barbershop_id)
-    services = Service.objects.filter(barbershop=barbershop)
-    return render(request, 'barbearia/management/service_list.html', {'barbershop': barbershop, 'services': services})
+    barbershop = get_object_or_404(
+        Barbershop, id=barbershop_id, owner=request.user)
+    listing = _paginated_list(
+        request, Service.objects.filter(barbershop=barbershop), ('name', 'id'),
+        ServiceSearchForm(request.GET))
+    return render(request, 'barbearia/management/service_list.html', {
+        'barbershop': barbershop, 'services': listing['page_items'], **listing})
 
 
 @login_required
@@ -482,7 +622,7 @@ def working_hours_create(request, barbershop_id):
 
 
 @login_required
-def working_hours_edit(request, working_hours_id):
+def working_hours_edit(request, barbershop_id, working_hours_id):
     """
     Edita um horário de trabalho existente.
 
@@ -491,6 +631,7 @@ def working_hours_edit(request, working_hours_id):
 
     Args:
         request (HttpRequest): O objeto de requisição HTTP.
+        barbershop_id (int): O ID da barbearia do horário.
         working_hours_id (int): O ID do horário de trabalho a ser editado.
 
     Returns:
@@ -500,21 +641,22 @@ def working_hours_edit(request, working_hours_id):
     Raises:
         Http404: Se o horário de trabalho não for encontrado.
     """
-    working_hours = get_object_or_404(WorkingHours, id=working_hours_id)
+    working_hours = get_object_or_404(
+        WorkingHours, id=working_hours_id, barbershop_id=barbershop_id, barbershop__owner=request.user)
     if request.method == 'POST':
         form = WorkingHoursForm(request.POST, instance=working_hours)
         if form.is_valid():
             form.save()
             messages.success(
                 request, 'Horário de trabalho atualizado com sucesso.')
-            return redirect('barbershop_management:working_hours_list', barbershop_id=working_hours.employee.barbershop.id)
+            return redirect('barbershop_management:working_hours_list', barbershop_id=barbershop_id)
     else:
         form = WorkingHoursForm(instance=working_hours)
     return render(request, 'barbearia/management/working_hours_form.html', {'form': form, 'working_hours': working_hours})
 
 
 @login_required
-def working_hours_delete(request, working_hours_id):
+def working_hours_delete(request, barbershop_id, working_hours_id):
     """
     Exclui um horário de trabalho existente.
 
@@ -523,6 +665,7 @@ def working_hours_delete(request, working_hours_id):
 
     Args:
         request (HttpRequest): O objeto de requisição HTTP.
+        barbershop_id (int): O ID da barbearia do horário.
         working_hours_id (int): O ID do horário de trabalho a ser excluído.
 
     Returns:
@@ -532,21 +675,147 @@ def working_hours_delete(request, working_hours_id):
     Raises:
         Http404: Se o horário de trabalho não for encontrado.
     """
-    working_hours = get_object_or_404(WorkingHours, id=working_hours_id)
-    barbershop = working_hours.employee.barbershop
+    working_hours = get_object_or_404(
+        WorkingHours, id=working_hours_id, barbershop_id=barbershop_id, barbershop__owner=request.user)
     if request.method == 'POST':
         working_hours.delete()
         messages.success(request, 'Horário de trabalho excluído com sucesso.')
-        return redirect('barbershop_management:working_hours_list', barbershop_id=barbershop.id)
+        return redirect('barbershop_management:working_hours_list', barbershop_id=barbershop_id)
     return render(request, 'barbearia/management/working_hours_confirm_delete.html', {'working_hours': working_hours})
 
 # Expense views
 
 
+@login_required
+def financial_report(request, barbershop_id):
+    """
+    Exibe o relatório financeiro (receitas, despesas e resultado) da barbearia.
+
+    Mostra cada mês do ano escolhido (parâmetro ``year``; por padrão, o ano
+    atual, também quando o parâmetro é inválido), o detalhamento do ano por
+    serviço, funcionário e tipo de despesa, e o histórico anual. Lê apenas os
+    consolidados diários.
+
+    Args:
+        request (HttpRequest): O objeto de requisição HTTP.
+        barbershop_id (int): O ID da barbearia.
+
+    Returns:
+        HttpResponse: A resposta renderizada com o relatório financeiro.
+
+    Raises:
+        Http404: Se a barbearia não for encontrada ou não pertencer ao usuário logado.
+    """
+    barbershop = get_object_or_404(
+        Barbershop, id=barbershop_id, owner=request.user)
+    try:
+        year = int(request.GET.get('year', timezone.localdate().year))
+    except ValueError:
+        year = timezone.localdate().year
+    if not MINYEAR <= year <= MAXYEAR:
+        year = timezone.localdate().year
+    months = monthly_report(barbershop, year)
+    context = {
+        'barbershop': barbershop,
+        'year': year,
+        'months': months,
+        'year_totals': {
+            metric: sum(month[metric] for month in months)
+            for metric in ('appointments', 'revenue', 'expenses', 'profit')
+        },
+        'breakdown': breakdown(barbershop, date(year, 1, 1), date(year, 12, 31)),
+        'years': yearly_report(barbershop),
+    }
+    return render(request, 'barbearia/management/financial_report.html', context)
+
+
+@login_required
+def import_data(request, barbershop_id):
+    """
+    Importa clientes, funcionários, serviços ou agendamentos de um arquivo CSV.
+
+    O arquivo enviado é lido em lotes (veja ``importers.py``); linhas inválidas
+    são listadas com o número da linha e não impedem a importação das demais.
+
+    Args:
+        request (HttpRequest): O objeto de requisição HTTP.
+        barbershop_id (int): O ID da barbearia que recebe os registros.
+
+    Returns:
+        HttpResponse: O formulário de importação e, após o envio, o resultado.
+
+    Raises:
+        Http404: Se a barbearia não for encontrada ou não pertencer ao usuário logado.
+    """
+    barbershop = get_object_or_404(
+        Barbershop, id=barbershop_id, owner=request.user)
+    result = None
+    if request.method == 'POST':
+        form = ImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            stream = io.TextIOWrapper(form.cleaned_data['file'].file, encoding='utf-8-sig', newline='')
+            try:
+                result = import_csv(barbershop, form.cleaned_data['kind'], stream)
+            except (ImportFileError, UnicodeDecodeError) as error:
+                message = str(error) if isinstance(error, ImportFileError) else \
+                    'O arquivo deve estar codificado em UTF-8.'
+                form.add_error('file', message)
+            else:
+                messages.success(
+                    request, f'Importação concluída: {result.created} criado(s), '
+                             f'{result.updated} atualizado(s), {result.skipped} ignorado(s).')
+    else:
+        form = ImportForm()
+    return render(request, 'barbearia/management/import_form.html', {
+        'barbershop': barbershop,
+        'form': form,
+        'result': result,
+        'errors': result.errors[:MAX_REPORTED_ERRORS] if result else [],
+    })
+
+
+@login_required
+@require_GET
+def export_data(request, barbershop_id, kind):
+    """
+    Exporta agendamentos, clientes ou despesas da barbearia em CSV.
+
+    Parâmetros GET opcionais: ``start_date`` e ``end_date`` (AAAA-MM-DD). O
+    arquivo é enviado em streaming, lido do banco em lotes, com memória
+    constante qualquer que seja o número de linhas.
+
+    Args:
+        request (HttpRequest): O objeto de requisição HTTP.
+        barbershop_id (int): O ID da barbearia.
+        kind (str): ``appointments``, ``clients`` ou ``expenses``.
+
+    Returns:
+        StreamingHttpResponse: O arquivo CSV, ou 400 se o período for inválido.
+
+    Raises:
+        Http404: Se a barbearia não for encontrada, não pertencer ao usuário
+                 logado ou ``kind`` não for um tipo de exportação.
+    """
+    barbershop = get_object_or_404(
+        Barbershop, id=barbershop_id, owner=request.user)
+    if kind not in EXPORTS:
+        raise Http404
+    form = ExportForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest(
+            ' '.join(error for errors in form.errors.values() for error in errors))
+    start_date, end_date = form.cleaned_data['start_date'], form.cleaned_data['end_date']
+    response = StreamingHttpResponse(
+        iter_csv(kind, barbershop, start_date, end_date), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = (
+        f'attachment; filename="{export_filename(kind, barbershop, start_date, end_date)}"')
+    return response
+
+
 @login_required
 def expense_list(request, barbershop_id):
     """
-    Lista todas as despesas de uma barbearia específica.
+    Lista as despesas de uma barbearia específica, com filtros e paginação por cursor.
 
     Args:
         request (HttpRequest): O objeto de requisição HTTP.
@@ -560,8 +829,10 @@ def expense_list(request, barbershop_id):
     """
     barbershop = get_object_or_404(
         Barbershop, id=barbershop_id, owner=request.user)
-    expenses = barbershop.expenses.all()
-    return render(request, 'barbearia/management/expense_list.html', {'barbershop': barbershop, 'expenses': expenses})
+    listing = _paginated_list(
+        request, barbershop.expenses.all(), EXPENSE_ORDERING, ExpenseSearchForm(request.GET))
+    return render(request, 'barbearia/management/expense_list.html', {
+        'barbershop': barbershop, 'expenses': listing['page_items'], **listing})
 
 
 @login_required
@@ -599,7 +870,7 @@ def expense_create(request, barbershop_id):
 
 
 @login_required
-def expense_edit(request, expense_id):
+def expense_edit(request, barbershop_id, expense_id):
     """
     Edita uma despesa existente.
 
@@ -608,6 +879,7 @@ def expense_edit(request, expense_id):
 
     Args:
         request (HttpRequest): O objeto de requisição HTTP.
+        barbershop_id (int): O ID da barbearia da despesa.
         expense_id (int): O ID da despesa a ser editada.
 
     Returns:
@@ -617,7 +889,8 @@ def expense_edit(request, expense_id):
     Raises:
         Http404: Se a despesa não for encontrada.
     """
-    expense = get_object_or_404(Expense, id=expense_id)
+    expense = get_object_or_404(
+        Expense, id=expense_id, barbershop_id=barbershop_id, barbershop__owner=request.user)
     if request.method == 'POST':
         form = ExpenseForm(request.POST, instance=expense)
         if form.is_valid():
@@ -630,7 +903,7 @@ def expense_edit(request, expense_id):
 
 
 @login_required
-def expense_delete(request, expense_id):
+def expense_delete(request, barbershop_id, expense_id):
     """
     Exclui uma despesa existente.
 
@@ -639,6 +912,7 @@ def expense_delete(request, expense_id):
 
     Args:
         request (HttpRequest): O objeto de requisição HTTP.
+        barbershop_id (int): O ID da barbearia da despesa.
         expense_id (int): O ID da despesa a ser excluída.
 
     Returns:
@@ -648,12 +922,12 @@ def expense_delete(request, expense_id):
     Raises:
         Http404: Se a despesa não for encontrada.
     """
-    expense = get_object_or_404(Expense, id=expense_id)
-    barbershop = expense.barbershop
+    expense = get_object_or_404(
+        Expense, id=expense_id, barbershop_id=barbershop_id, barbershop__owner=request.user)
     if request.method == 'POST':
         expense.delete()
         messages.success(request, 'Despesa excluída com sucesso.')
-        return redirect('barbershop_management:expense_list', barbershop_id=barbershop.id)
+        return redirect('barbershop_management:expense_list', barbershop_id=barbershop_id)
     return render(request, 'barbearia/management/expense_confirm_delete.html', {'expense': expense})
 
 # Inventory views
@@ -662,7 +936,7 @@ def expense_delete(request, expense_id):
 @login_required
 def inventory_list(request, barbershop_id):
     """
-    Lista todos os itens de inventário de uma barbearia específica.
+    Lista os itens de inventário de uma barbearia específica, com busca e paginação por cursor.
 
     Args:
         request (HttpRequest): O objeto de requisição HTTP.
@@ -676,8 +950,46 @@ def inventory_list(request, barbershop_id):
     """
     barbershop = get_object_or_404(
         Barbershop, id=barbershop_id, owner=request.user)
-    inventory_items = barbershop.inventory_items.all()
-    return render(request, 'barbearia/management/inventory_list.html', {'barbershop': barbershop, 'inventory_items': inventory_items})
+    listing = _paginated_list(
+        request, barbershop.inventory_items.all(), INVENTORY_ORDERING, InventorySearchForm(request.GET))
+    return render(request, 'barbearia/management/inventory_list.html', {
+        'barbershop': barbershop, 'inventory_items': listing['page_items'], **listing})
+
+
+@login_required
+@require_POST
+def inventory_adjust(request, barbershop_id):
+    """
+    Aplica ajustes de estoque em massa aos itens de inventário da barbearia.
+
+    Recebe um JSON ``{"adjustments": [{"id": 1, "delta": -2}, ...]}`` e aplica
+    todas as variações em uma única transação (veja ``stock.adjust_stock``).
+
+    Args:
+        request (HttpRequest): O objeto de requisição HTTP.
+        barbershop_id (int): O ID da barbearia dona dos itens.
+
+    Returns:
+        JsonResponse: As quantidades finais de cada item ajustado, ou o erro
+                      com status 400; nesse caso nenhum ajuste é aplicado.
+
+    Raises:
+        Http404: Se a barbearia não for encontrada ou não pertencer ao usuário logado.
+    """
+    barbershop = get_object_or_404(
+        Barbershop, id=barbershop_id, owner=request.user)
+    try:
+        payload = json.loads(request.body)
+        deltas = parse_adjustments(payload.get('adjustments') if isinstance(payload, dict) else None)
+        quantities = adjust_stock(barbershop.id, deltas)
+    except ValueError as error:
+        # StockAdjustmentError e JSONDecodeError são ValueError
+        message = str(error) if isinstance(error, StockAdjustmentError) else 'JSON inválido.'
+        return JsonResponse({'status': 'error', 'error': message}, status=400)
+    return JsonResponse({
+        'status': 'success',
+        'items': [{'id': pk, 'quantity': quantity} for pk, quantity in sorted(quantities.items())],
+    })
 
 
 @login_required
@@ -716,7 +1028,7 @@ def inventory_create(request, barbershop_id):
 
 
 @login_required
-def inventory_edit(request, inventory_id):
+def inventory_edit(request, barbershop_id, inventory_id):
     """
     Edita um item de inventário existente.
 
@@ -725,6 +1037,7 @@ def inventory_edit(request, inventory_id):
 
     Args:
         request (HttpRequest): O objeto de requisição HTTP.
+        barbershop_id (int): O ID da barbearia do item.
         inventory_id (int): O ID do item de inventário a ser editado.
 
     Returns:
@@ -734,7 +1047,8 @@ def inventory_edit(request, inventory_id):
     Raises:
         Http404: Se o item de inventário não for encontrado.
     """
-    inventory = get_object_or_404(Inventory, id=inventory_id)
+    inventory = get_object_or_404(
+        Inventory, id=inventory_id, barbershop_id=barbershop_id, barbershop__owner=request.user)
     if request.method == 'POST':
         form = InventoryForm(request.POST, instance=inventory)
         if form.is_valid():
@@ -748,7 +1062,7 @@ def inventory_edit(request, inventory_id):
 
 
 @login_required
-def inventory_delete(request, inventory_id):
+def inventory_delete(request, barbershop_id, inventory_id):
     """
     Exclui um item de inventário existente.
 
@@ -757,6 +1071,7 @@ def inventory_delete(request, inventory_id):
 
     Args:
         request (HttpRequest): O objeto de requisição HTTP.
+        barbershop_id (int): O ID da barbearia do item.
         inventory_id (int): O ID do item de inventário a ser excluído.
 
     Returns:
@@ -766,19 +1081,19 @@ def inventory_delete(request, inventory_id):
     Raises:
         Http404: Se o item de inventário não for encontrado.
     """
-    inventory = get_object_or_404(Inventory, id=inventory_id)
-    barbershop = inventory.barbershop
+    inventory = get_object_or_404(
+        Inventory, id=inventory_id, barbershop_id=barbershop_id, barbershop__owner=request.user)
     if request.method == 'POST':
         inventory.delete()
         messages.success(request, 'Item de inventário excluído com sucesso.')
-        return redirect('barbershop_management:inventory_list', barbershop_id=barbershop.id)
+        return redirect('barbershop_management:inventory_list', barbershop_id=barbershop_id)
     return render(request, 'barbearia/management/inventory_confirm_delete.html', {'inventory': inventory})
 
 
 @login_required
 def employee_service_list(request, barbershop_id):
     """
-    Lista todos os serviços de funcionários de uma barbearia específica.
+    Lista os serviços de funcionários de uma barbearia específica, com paginação por cursor.
 
     Args:
         request (HttpRequest): O objeto de requisição HTTP.
@@ -793,8 +1108,11 @@ def employee_service_list(request, barbershop_id):
     barbershop = get_object_or_404(
         Barbershop, id=barbershop_id, owner=request.user)
     employee_services = EmployeeService.objects.filter(
-        employee__barbershop=barbershop)
-    return render(request, 'barbearia/management/employee_service_list.html', {'barbershop': barbershop, 'employee_services': employee_services})
+        employee__barbershop=barbershop).select_related('employee', 'service')
+    listing = _paginated_list(
+        request, employee_services, ('employee__name', 'service__name', 'id'))
+    return render(request, 'barbearia/management/employee_service_list.html', {
+        'barbershop': barbershop, 'employee_services': listing['page_items'], **listing})
 
 
 @login_required
@@ -832,7 +1150,7 @@ def employee_service_create(request, barbershop_id):
 
 
 @login_required
-def employee_service_delete(request, employee_service_id):
+def employee_service_delete(request, barbershop_id, employee_service_id):
     """
     Exclui um serviço de funcionário existente.
 
@@ -841,6 +1159,7 @@ def employee_service_delete(request, employee_service_id):
 
     Args:
         request (HttpRequest): O objeto de requisição HTTP.
+        barbershop_id (int): O ID da barbearia do funcionário.
         employee_service_id (int): O ID do serviço de funcionário a ser excluído.
 
     Returns:
@@ -851,13 +1170,13 @@ def employee_service_delete(request, employee_service_id):
         Http404: Se o serviço de funcionário não for encontrado.
     """
     employee_service = get_object_or_404(
-        EmployeeService, id=employee_service_id)
-    barbershop = employee_service.employee.barbershop
+        EmployeeService, id=employee_service_id, employee__barbershop_id=barbershop_id,
+        employee__barbershop__owner=request.user)
     if request.method == 'POST':
         employee_service.delete()
         messages.success(
             request, 'Serviço do funcionário excluído com sucesso.')
-        return redirect('barbershop_management:employee_service_list', barbershop_id=barbershop.id)
+        return redirect('barbershop_management:employee_service_list', barbershop_id=barbershop_id)
     return render(request, 'barbearia/management/employee_service_confirm_delete.html', {'employee_service': employee_service})
 
 
@@ -0,0 +1,19 @@
+"""
+URLs do projeto sob ASGI: as mesmas de ``setup.urls``, com as rotas de
+agendamento de ``barbershop_booking.async_urls``.
+
+Selecionadas para as requisições ASGI por ``setup.middleware.AsgiUrlconfMiddleware``
+(``settings.ASGI_URLCONF``).
+"""
+from django.urls import include, path
+
+from .urls import urlpatterns as wsgi_urlpatterns
+
+
+def _asgi_pattern(pattern):
+    if getattr(pattern, 'app_name', None) == 'barbershop_booking':
+        return path(str(pattern.pattern), include('barbershop_booking.async_urls'))
+    return pattern
+
+
+urlpatterns = [_asgi_pattern(pattern) for pattern in wsgi_urlpatterns]
@@ -0,0 +1,49 @@
+"""
+Configuração do SQLite.
+
+No modo de produção (``DJANGO_SQLITE_PRODUCTION=1``), cada conexão executa
+os PRAGMAs abaixo ao abrir (``init_command``):
+
+* ``journal_mode=WAL``: leitores não bloqueiam o escritor nem são
+  bloqueados por ele; cada leitura vê o último commit.
+* ``synchronous=NORMAL``: com WAL, um commit não espera o ``fsync`` do
+  arquivo principal; uma queda de energia pode perder apenas os últimos
+  commits, sem corromper o banco.
+* ``busy_timeout``: uma conexão que encontra o banco travado espera até
+  ``SQLITE_BUSY_TIMEOUT_MS`` em vez de falhar com ``database is locked``.
+* ``mmap_size``: leituras direto do arquivo mapeado em memória.
+
+As transações de escrita começam com ``BEGIN IMMEDIATE``: o bloqueio de
+escrita é obtido no início, de modo que dois agendamentos simultâneos se
+enfileiram pelo ``busy_timeout`` em vez de um deles falhar ao tentar
+promover um bloqueio de leitura.
+
+A conexão ``read`` (usada pelo ``setup.routers.ReadWriteRouter``) abre o
+mesmo arquivo com ``query_only``.
+"""
+SQLITE_BUSY_TIMEOUT_MS = 20_000
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+
+PRODUCTION_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}',
+    f'PRAGMA mmap_size={SQLITE_MMAP_SIZE}',
+)
+
+
+def sqlite_database(name, production=False, read_only=False):
+    """Entrada de ``DATABASES`` para o arquivo SQLite ``name``."""
+    database = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name,
+    }
+    if production:
+        pragmas = list(PRODUCTION_PRAGMAS)
+        if read_only:
+            pragmas.append('PRAGMA query_only=ON')
+        database['OPTIONS'] = {
+            'init_command': '; '.join(pragmas),
+            'transaction_mode': 'DEFERRED' if read_only else 'IMMEDIATE',
+        }
+    return database
@@ -0,0 +1,30 @@
+"""
+Rotas das requisições ASGI.
+
+Sob ASGI, ``AsgiUrlconfMiddleware`` troca o URLconf da requisição
+(``request.urlconf``) por ``settings.ASGI_URLCONF``, com as versões
+``async`` das APIs de horários e agenda. A escolha é feita por requisição,
+pelo tipo do handler, e não por uma variável de ambiente lida com as
+configurações: um mesmo processo pode atender WSGI e ASGI, e a ordem de
+importação não importa.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+
+
+class AsgiUrlconfMiddleware:
+    # Não faz E/S: sob ASGI roda no event loop, sem trocar de thread
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        urlconf = getattr(settings, 'ASGI_URLCONF', None)
+        if urlconf and isinstance(request, ASGIRequest):
+            request.urlconf = urlconf
+        return self.get_response(request)
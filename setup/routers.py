@@ -0,0 +1,109 @@
+"""
+Roteadores de banco.
+
+``ShardRouter`` envia os dados de cada barbearia para o seu shard (veja
+``barbershop_management/sharding.py``).
+
+``ReadWriteRouter`` separa leitura e escrita no modo de produção do SQLite.
+Escritas vão para ``default``. Leituras fora de transações (páginas de
+apresentação, consultas de horários, relatórios) vão para a conexão
+``read``, que abre o mesmo arquivo em modo WAL: não há atraso de
+replicação, e elas não disputam a conexão de escrita. Dentro de uma
+transação em ``default``, as leituras ficam em ``default`` para enxergar as
+próprias escritas e manter ``select_for_update``.
+
+``MigrationRouter`` vem antes dos outros: durante ``migrate``, as consultas
+das migrações de dados (``RunPython``) vão para o banco migrado, e não para
+``default`` ou para o shard de cada barbearia. Assim, migrar um shard ou um
+banco temporário não lê nem altera os dados de ``default``. O comando
+``migrate`` do projeto (``barbershop_management/management/commands``) roda
+dentro de ``migrating()``.
+"""
+import contextlib
+import contextvars
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from barbershop_management.models import Barbershop
+from barbershop_management.sharding import active_shard, is_sharded, shard_for
+
+READ_DB_ALIAS = 'read'
+
+_migrating_db = contextvars.ContextVar('migrating_db', default=None)
+
+
+@contextlib.contextmanager
+def migrating(alias):
+    """Envia as consultas para ``alias`` até o fim do bloco, mesmo se uma migração falhar."""
+    token = _migrating_db.set(alias)
+    try:
+        yield
+    finally:
+        _migrating_db.reset(token)
+
+
+class MigrationRouter:
+    def db_for_read(self, model, **hints):
+        return _migrating_db.get()
+
+    def db_for_write(self, model, **hints):
+        return _migrating_db.get()
+
+
+class ReadWriteRouter:
+    def __init__(self, write_alias=DEFAULT_DB_ALIAS, read_alias=READ_DB_ALIAS):
+        # Outros pares de conexões, como os bancos temporários do benchmark_sqlite_concurrency
+        self.write_alias = write_alias
+        self.read_alias = read_alias
+
+    def db_for_read(self, model, **hints):
+        if connections[self.write_alias].in_atomic_block:
+            return self.write_alias
+        return self.read_alias
+
+    def db_for_write(self, model, **hints):
+        return self.write_alias
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # As duas conexões abrem o mesmo arquivo
+        if {obj1._state.db, obj2._state.db} <= {self.write_alias, self.read_alias}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == self.read_alias:
+            return False
+        return None
+
+
+class ShardRouter:
+    """
+    Envia os modelos particionados (``barbershop_management.sharding``) para o
+    banco da barbearia: o do objeto relacionado, quando houver, ou o shard
+    ativo. Sem shard ativo, a decisão fica com os próximos roteadores
+    (``default``). Os modelos globais seguem o roteamento normal.
+    """
+
+    def _db_for_model(self, model, instance=None):
+        if not is_sharded(model):
+            return None
+        if isinstance(instance, Barbershop) and instance.pk is not None:
+            return shard_for(instance.pk)
+        if instance is not None and is_sharded(type(instance)) and instance._state.db:
+            return instance._state.db
+        return active_shard()
+
+    def db_for_read(self, model, **hints):
+        return self._db_for_model(model, hints.get('instance'))
+
+    def db_for_write(self, model, **hints):
+        return self._db_for_model(model, hints.get('instance'))
+
+    def allow_relation(self, obj1, obj2, **hints):
+        sharded = [is_sharded(type(obj)) for obj in (obj1, obj2)]
+        if all(sharded):
+            return obj1._state.db == obj2._state.db
+        if any(sharded):
+            # Barbearias, dias da semana e donos têm cópia em todos os bancos
+            return True
+        return None
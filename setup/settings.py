@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 from pathlib import Path, os
 from dotenv import load_dotenv
 
+from .database import sqlite_database
+
 load_dotenv()
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -47,6 +49,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'setup.middleware.AsgiUrlconfMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,6 +62,10 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'setup.urls'
 
+# Requisições ASGI usam estas rotas, com as APIs de agendamento assíncronas
+# (setup/middleware.py)
+ASGI_URLCONF = 'setup.asgi_urls'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -81,12 +88,78 @@ WSGI_APPLICATION = 'setup.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Modo de produção do SQLite (DJANGO_SQLITE_PRODUCTION=1): WAL, synchronous=NORMAL,
+# busy_timeout e mmap em cada conexão, e leituras fora de transações na conexão
+# 'read'. Veja setup/database.py e setup/routers.py.
+
+SQLITE_PRODUCTION = os.getenv('DJANGO_SQLITE_PRODUCTION') == '1'
+
 DATABASES = {
+    'default': sqlite_database(BASE_DIR / 'db.sqlite3', production=SQLITE_PRODUCTION),
+}
+DATABASE_ROUTERS = ['setup.routers.MigrationRouter']
+
+if SQLITE_PRODUCTION:
+    DATABASES['read'] = {
+        **sqlite_database(BASE_DIR / 'db.sqlite3', production=True, read_only=True),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS.append('setup.routers.ReadWriteRouter')
+
+# Sharding (DJANGO_SHARDS=N): os dados de cada barbearia ficam em um dos bancos
+# shard_0 a shard_{N-1}, escolhido pelo código da barbearia; default guarda as
+# barbearias, os usuários e o diretório de shards. Migre cada shard com
+# "manage.py migrate --database shard_0" e distribua as barbearias existentes com
+# "manage.py rebalance_shards". Veja barbershop_management/sharding.py.
+
+SHARD_ALIASES = [f'shard_{index}' for index in range(int(os.getenv('DJANGO_SHARDS', '0')))]
+
+for alias in SHARD_ALIASES:
+    DATABASES[alias] = sqlite_database(BASE_DIR / f'db.{alias}.sqlite3', production=SQLITE_PRODUCTION)
+
+if SHARD_ALIASES:
+    DATABASE_ROUTERS.insert(1, 'setup.routers.ShardRouter')
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# As versões de invalidação (barbershop_management/versioning.py) ficam no cache:
+# com vários processos ele precisa ser compartilhado, senão a invalidação feita em
+# um processo não chega aos outros. O LocMemCache, por processo, é o padrão só em
+# desenvolvimento e nos testes; no modo de produção o padrão é o cache em banco
+# (crie a tabela com "manage.py createcachetable"). Redis ou Memcached via
+# CACHE_BACKEND e CACHE_LOCATION, por exemplo
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache e
+# CACHE_LOCATION=redis://127.0.0.1:6379/1 (requer o pacote redis).
+
+LOCMEM_CACHE = 'django.core.cache.backends.locmem.LocMemCache'
+DATABASE_CACHE = 'django.core.cache.backends.db.DatabaseCache'
+
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', DATABASE_CACHE if SQLITE_PRODUCTION else LOCMEM_CACHE)
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION', 'barbershop_cache' if CACHE_BACKEND == DATABASE_CACHE else 'barbershop'),
     }
 }
+if CACHE_BACKEND in (LOCMEM_CACHE, DATABASE_CACHE):
+    CACHES['default']['OPTIONS'] = {'MAX_ENTRIES': 10000}
+
+
+# Notificações
+# Enviadas pelo comando send_notifications; veja barbershop_booking/notifications.py.
+# Transportes: ConsoleTransport, FileTransport (NOTIFICATION_FILE_PATH) e
+# EmailTransport (EMAIL_BACKEND, para NOTIFICATION_EMAIL_ADDRESS).
+
+NOTIFICATION_TRANSPORT = os.getenv(
+    'NOTIFICATION_TRANSPORT', 'barbershop_booking.notifications.ConsoleTransport')
+NOTIFICATION_FILE_PATH = os.getenv('NOTIFICATION_FILE_PATH', os.path.join(BASE_DIR, 'notifications.log'))
+NOTIFICATION_EMAIL_ADDRESS = os.getenv('NOTIFICATION_EMAIL_ADDRESS', '{phone}@sms.example.com')
+NOTIFICATION_MAX_ATTEMPTS = 5
+# Antecedência dos lembretes criados pelo comando schedule_reminders
+NOTIFICATION_REMINDER_LEAD_HOURS = 24
 
 
 # Password validation
@@ -2,6 +2,7 @@ $(document).ready(function() {
     // Função para atualizar os horários disponíveis
     function updateAvailableSlots() {
         var employeeId = $('#id_employee').val();
+        var serviceId = $('#id_service').val();
         var date = $('#id_date').val();
         var barbershopName = $('#barbershop-name').data('name');
 
@@ -14,6 +15,8 @@ $(document).ready(function() {
             $.ajax({
                 url: `/booking/${barbershopName}/get-available-slots/${employeeId}/${date}/`,
                 method: 'GET',
+                // A duração do serviço escolhido define quais horários cabem na agenda
+                data: serviceId ? { service: serviceId } : {},
                 success: function(data) {
                     timeSelect.empty().prop('disabled', false);
                     timeSelect.append('<label id="id_time">Selecione um horário</label>');
@@ -38,7 +41,7 @@ $(document).ready(function() {
         }
     }
     // Atualizar horários disponíveis quando o funcionário ou a data mudar
-    $('#id_employee, #id_date').change(updateAvailableSlots);
+    $('#id_employee, #id_service, #id_date').change(updateAvailableSlots);
     // Manipular o envio do formulário de agendamento
     $('#booking-form').submit(function(e) {
         e.preventDefault();
@@ -67,6 +70,12 @@ $(document).ready(function() {
                 }
             },
             error: function(jqXHR, textStatus, errorThrown) {
+                if (jqXHR.status === 409 && jqXHR.responseJSON) {
+                    // Outro cliente reservou o horário primeiro
+                    alert(jqXHR.responseJSON.message);
+                    updateAvailableSlots();
+                    return;
+                }
                 console.error("AJAX error:", textStatus, errorThrown);
                 console.log("Response:", jqXHR.responseText);
                 alert('Erro ao realizar o agendamento. Por favor, tente novamente.');
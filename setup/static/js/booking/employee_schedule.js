@@ -6,16 +6,15 @@ document.addEventListener('DOMContentLoaded', function() {
 
     employeeCards.forEach(card => {
         card.addEventListener('click', function() {
-            const employeeId = this.dataset.employeeId;
-            fetchEmployeeSchedule(employeeId);
+            fetchEmployeeSchedule(this.dataset.scheduleUrl);
         });
     });
 
-    function fetchEmployeeSchedule(employeeId) {
-        fetch(`/booking/barbershop/employee/${employeeId}/schedule/`)
+    function fetchEmployeeSchedule(scheduleUrl) {
+        fetch(scheduleUrl)
             .then(response => response.json())
             .then(data => {
-                displaySchedule(data);
+                displaySchedule(data.appointments);
                 modal.show();
             })
             .catch(error => {